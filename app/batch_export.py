@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services import journal
+from app.services.project_index import file_stamp, get_index, project_digest
+from app.services.storage import DATA_DIR, INDEX_FILE
+
+EXPORT_DIR = DATA_DIR / "exports"
+STATE_FILE = DATA_DIR / "batch_export_state.json"
+FORMATS = ("xlsx", "pdf")
+
+
+def _read_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _targets(path: Path, out_dir: Path, formats: List[str]) -> Dict[str, Path]:
+    # Kurzer Hash des Pfads im Namen: a/projekt.json und b/projekt.json überschreiben sich nicht gegenseitig.
+    tag = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:8]
+    return {fmt: out_dir / f"{path.stem}-{tag}.{fmt}" for fmt in formats}
+
+
+def _export_one(path: str, out_dir: str, formats: List[str], checks: bool, conn) -> None:
+    # Läuft im Worker-Prozess: Exporter erst hier importieren, damit der Hauptprozess schlank bleibt.
+    result: Dict = {"timings": {}, "skipped": []}
+    try:
+        from app.services.export_cache import get_export_cache
+        from app.services.export_excel import export_project_to_excel
+        from app.services.export_pdf import export_project_to_pdf
+        from app.services.storage import load_project
+        from app.services.validation import validate_required_fields
+
+        t0 = time.perf_counter()
+        project = load_project(Path(path))
+        result["name"] = project.metadata.project_name
+        result["timings"]["load"] = time.perf_counter() - t0
+        if checks:
+            errors = validate_required_fields(project)
+            if errors:
+                raise ValueError(f"Pflichtfelder fehlen ({len(errors)}): {errors[0]}")
+        targets = _targets(Path(path), Path(out_dir), formats)
+        if "xlsx" in targets:
+            t0 = time.perf_counter()
+            export_project_to_excel(project, targets["xlsx"], streaming=True)
+            result["timings"]["xlsx"] = time.perf_counter() - t0
+        if "pdf" in targets:
+            if checks and project.metadata.status != "Freigegeben":
+                result["skipped"].append("pdf: Status nicht 'Freigegeben'")
+            else:
+                t0 = time.perf_counter()
+                export_project_to_pdf(project, targets["pdf"])
+                result["timings"]["pdf"] = time.perf_counter() - t0
+        result["cache"] = get_export_cache().stats()
+        result["status"] = "ok"
+    except Exception as exc:  # noqa: BLE001 - jeder Fehler landet in der Zusammenfassung
+        result["status"] = "failed"
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    conn.send(result)
+    conn.close()
+
+
+def _is_unchanged(entry: Optional[dict], path: Path, targets: Dict[str, Path], formats: List[str]) -> bool:
+    if not entry or sorted(entry.get("formats", [])) != sorted(formats):
+        return False
+    if not all(t.exists() for fmt, t in targets.items() if fmt not in entry.get("skipped_formats", [])):
+        return False
+    # Stempel und Hash umfassen das Journal: im Journal-Modus bleibt die Haupt-JSON bis zur Kompaktierung gleich.
+    if entry.get("stamp") == file_stamp(path):
+        return True
+    return entry.get("sha256") == project_digest(path)
+
+
+def run_batch(
+    index_file: Path = INDEX_FILE,
+    out_dir: Path = EXPORT_DIR,
+    formats: List[str] = list(FORMATS),
+    workers: int = 0,
+    timeout: float = 300.0,
+    force: bool = False,
+    checks: bool = True,
+    state_file: Path = STATE_FILE,
+) -> dict:
+    started = time.perf_counter()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state: Dict[str, dict] = _read_json(state_file, {})
+    entries = get_index(index_file).entries()
+    workers = workers or os.cpu_count() or 1
+
+    results: List[dict] = []
+    queue: List[tuple] = []
+    for e in entries:
+        path = Path(e["path"])
+        if not path.exists():
+            results.append({"path": str(path), "name": e.get("name", ""), "status": "failed", "error": "Datei fehlt"})
+            continue
+        if not force and _is_unchanged(state.get(str(path)), path, _targets(path, out_dir, formats), formats):
+            results.append({"path": str(path), "name": e.get("name", ""), "status": "unchanged"})
+            continue
+        queue.append((path, e.get("name", "")))
+
+    ctx = mp.get_context("spawn")
+    running: Dict[object, tuple] = {}
+    while queue or running:
+        while queue and len(running) < workers:
+            path, name = queue.pop(0)
+            # Stand vor dem Export festhalten: Änderungen während des Exports gelten beim nächsten Lauf als neu.
+            seen = {"stamp": file_stamp(path), "sha256": project_digest(path)}
+            recv, send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_export_one, args=(str(path), str(out_dir), formats, checks, send), daemon=True)
+            proc.start()
+            send.close()
+            running[recv] = (proc, path, name, seen, time.perf_counter())
+
+        now = time.perf_counter()
+        next_deadline = min(t0 + timeout for *_, t0 in running.values())
+        ready = wait(list(running.keys()), timeout=max(0.0, next_deadline - now))
+        now = time.perf_counter()
+        for conn in list(running.keys()):
+            proc, path, name, seen, t0 = running[conn]
+            if conn in ready:
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    result = {"status": "failed", "error": f"Worker beendet (Exit-Code {proc.exitcode})"}
+                proc.join()
+            elif now - t0 >= timeout:
+                proc.terminate()
+                proc.join()
+                result = {"status": "timeout", "error": f"Zeitlimit {timeout:g}s überschritten"}
+            else:
+                continue
+            conn.close()
+            del running[conn]
+            result.setdefault("name", name)
+            result.update(path=str(path), seconds=round(now - t0, 3))
+            results.append(result)
+            if result["status"] == "ok":
+                state[str(path)] = {
+                    **seen,
+                    "formats": list(formats),
+                    "skipped_formats": [s.split(":", 1)[0] for s in result.get("skipped", [])],
+                    "exported_at": datetime.now().isoformat(timespec="seconds"),
+                }
+            else:
+                state.pop(str(path), None)
+
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    journal.atomic_write_text(state_file, json.dumps(state, indent=2, ensure_ascii=False))
+
+    counts: Dict[str, int] = {}
+    cache = {"hits": 0, "misses": 0, "saved_seconds": 0.0, "build_seconds": 0.0, "evicted": 0}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+        for k in cache:
+            cache[k] += r.get("cache", {}).get(k, 0)
+    lookups = cache["hits"] + cache["misses"]
+    cache["hit_rate"] = round(cache["hits"] / lookups, 3) if lookups else 0.0
+    cache["saved_seconds"] = round(cache["saved_seconds"], 3)
+    cache["build_seconds"] = round(cache["build_seconds"], 3)
+    return {
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "duration": round(time.perf_counter() - started, 3),
+        "workers": workers,
+        "counts": counts,
+        "cache": cache,
+        "projects": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Exportiert alle Projekte aus dem Projektindex nach Excel/PDF.")
+    parser.add_argument("--index", type=Path, default=INDEX_FILE, help="Projektindex (projects_index.json)")
+    parser.add_argument("--out", type=Path, default=EXPORT_DIR, help="Zielordner für Exporte")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Kommagetrennt: xlsx,pdf")
+    parser.add_argument("--workers", type=int, default=0, help="Anzahl Worker-Prozesse (0 = CPU-Anzahl)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Zeitlimit pro Projekt in Sekunden")
+    parser.add_argument("--force", action="store_true", help="Auch unveränderte Projekte exportieren")
+    parser.add_argument("--no-checks", action="store_true", help="Pflichtfelder und Freigabe-Status ignorieren")
+    parser.add_argument("--state", type=Path, default=STATE_FILE, help="Datei mit Stand des letzten Laufs")
+    parser.add_argument("--summary", type=Path, default=None, help="Zusammenfassung (JSON), Standard: <out>/summary.json")
+    args = parser.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        parser.error(f"Unbekannte Formate: {', '.join(unknown)}")
+
+    summary = run_batch(
+        index_file=args.index,
+        out_dir=args.out,
+        formats=formats,
+        workers=args.workers,
+        timeout=args.timeout,
+        force=args.force,
+        checks=not args.no_checks,
+        state_file=args.state,
+    )
+    summary_file = args.summary or args.out / "summary.json"
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    summary_file.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    for r in summary["projects"]:
+        line = f"{r['status']:<9} {r.get('seconds', 0):>8.2f}s  {r['path']}"
+        if r.get("error"):
+            line += f"  ({r['error']})"
+        print(line)
+    print(f"Fertig in {summary['duration']:.2f}s: " + ", ".join(f"{k}={v}" for k, v in sorted(summary["counts"].items())))
+    cache = summary["cache"]
+    print(f"Export-Cache: {cache['hits']} Treffer, {cache['misses']} Fehlzugriffe ({cache['hit_rate']:.0%}), ~{cache['saved_seconds']:.1f}s gespart")
+    return 1 if any(r["status"] in ("failed", "timeout") for r in summary["projects"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import argparse
 import sys
 
 from PySide6.QtWidgets import QApplication
 
+from app.services import instrumentation
 from app.services.storage import ensure_storage
 from app.ui.main_window import MainWindow
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Smarthome Planungsmappe")
+    parser.add_argument("--profile", action="store_true", help=f"Laufzeitmessung einschalten (wie {instrumentation.ENV_VAR}=1)")
+    # Unbekannte Argumente gehen an Qt weiter (z. B. -platform).
+    args, qt_args = parser.parse_known_args()
     ensure_storage()
-    app = QApplication(sys.argv)
+    if args.profile:
+        instrumentation.enable()
+    else:
+        instrumentation.enable_from_env()
+    app = QApplication([sys.argv[0], *qt_args])
     app.setStyleSheet(
         "QMainWindow{background:#f3f5f8;} QGroupBox{font-weight:bold; margin-top:12px;}"
         "QGroupBox::title{subcontrol-origin: margin; left: 10px; padding:0 4px;}"
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from weakref import WeakValueDictionary
+
+from app.models.definitions import GLOBAL_TOPICS, OPTION_IDS, OPTION_SETS, ROOM_TOPICS
+from app.models.project import LazyRoomMap, Project, ProjectMetadata, RoomData, TopicState
+
+# Platzhalter-ID für Werte außerhalb des Optionskatalogs; der Text steht dann in ``extra``.
+EXTRA_ID = 255
+
+_OPTION_SET_BY_TOPIC: Dict[str, str] = {t.key: t.option_set for t in [*GLOBAL_TOPICS, *ROOM_TOPICS]}
+ROOM_KEYS: Tuple[str, ...] = tuple(t.key for t in ROOM_TOPICS)
+GLOBAL_KEYS: Tuple[str, ...] = tuple(t.key for t in GLOBAL_TOPICS)
+_KEY_LAYOUTS: Dict[Tuple[str, ...], Tuple[str, ...]] = {ROOM_KEYS: ROOM_KEYS, GLOBAL_KEYS: GLOBAL_KEYS}
+
+
+def _layout(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    # Gleiche Topic-Reihenfolgen teilen sich ein Tupel über alle Räume und Projekte.
+    return _KEY_LAYOUTS.setdefault(keys, keys)
+
+
+class CompactTopicState:
+    # Unveränderlich und dedupliziert: identische Zustände (v. a. leere) existieren nur einmal im Speicher.
+    __slots__ = ("ids", "extra", "notes", "assignee", "__weakref__")
+
+    ids: bytes
+    extra: Tuple[str, ...]
+    notes: str
+    assignee: str
+
+    _cache: "WeakValueDictionary[tuple, CompactTopicState]" = WeakValueDictionary()
+
+    def __new__(cls, ids: bytes = b"", extra: Tuple[str, ...] = (), notes: str = "", assignee: str = ""):
+        key = (ids, extra, notes, assignee)
+        cached = cls._cache.get(key)
+        if cached is not None:
+            return cached
+        obj = super().__new__(cls)
+        object.__setattr__(obj, "ids", ids)
+        object.__setattr__(obj, "extra", extra)
+        object.__setattr__(obj, "notes", notes)
+        object.__setattr__(obj, "assignee", sys.intern(assignee))
+        cls._cache[key] = obj
+        return obj
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactTopicState ist unveränderlich")
+
+    def __reduce__(self):
+        # Über __new__ wiederherstellen (Spawn-Worker): bleibt unveränderlich und nutzt den Dedup-Cache.
+        return (CompactTopicState, (self.ids, self.extra, self.notes, self.assignee))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactTopicState):
+            return NotImplemented
+        return (self.ids, self.extra, self.notes, self.assignee) == (other.ids, other.extra, other.notes, other.assignee)
+
+    def __hash__(self) -> int:
+        return hash((self.ids, self.extra, self.notes, self.assignee))
+
+    def __repr__(self) -> str:
+        return f"CompactTopicState(ids={self.ids!r}, extra={self.extra!r}, notes={self.notes!r}, assignee={self.assignee!r})"
+
+    @classmethod
+    def encode(cls, key: str, selections: List[str], notes: str = "", assignee: str = "") -> "CompactTopicState":
+        option_set = _OPTION_SET_BY_TOPIC.get(key)
+        ids = OPTION_IDS.get(option_set, {}) if option_set else {}
+        out = bytearray()
+        extra: List[str] = []
+        for value in selections:
+            idx = ids.get(value)
+            if idx is None or idx >= EXTRA_ID:
+                out.append(EXTRA_ID)
+                extra.append(value)
+            else:
+                out.append(idx)
+        return cls(bytes(out), tuple(extra), notes, assignee)
+
+    def selections(self, key: str) -> List[str]:
+        option_set = _OPTION_SET_BY_TOPIC.get(key)
+        options = OPTION_SETS[option_set] if option_set else []
+        extra = iter(self.extra)
+        return [next(extra) if idx == EXTRA_ID else options[idx] for idx in self.ids]
+
+    def mask(self) -> int:
+        result = 0
+        for idx in self.ids:
+            if idx != EXTRA_ID:
+                result |= 1 << idx
+        return result
+
+    @classmethod
+    def from_state(cls, key: str, state: TopicState) -> "CompactTopicState":
+        return cls.encode(key, state.selections, state.notes, state.assignee)
+
+    def to_state(self, key: str) -> TopicState:
+        return TopicState(selections=self.selections(key), notes=self.notes, assignee=self.assignee)
+
+    def to_dict(self, key: str) -> dict:
+        return {"selections": self.selections(key), "notes": self.notes, "assignee": self.assignee}
+
+
+def _encode_topics(topics: Dict[str, dict]) -> Tuple[Tuple[str, ...], Tuple[CompactTopicState, ...]]:
+    keys = _layout(tuple(topics))
+    states = tuple(
+        CompactTopicState.encode(k, v.get("selections", []), v.get("notes", ""), v.get("assignee", ""))
+        for k, v in topics.items()
+    )
+    return keys, states
+
+
+class CompactRoom:
+    __slots__ = ("name", "floor", "keys", "states")
+
+    def __init__(self, name: str, floor: str, keys: Tuple[str, ...], states: Tuple[CompactTopicState, ...]):
+        self.name = sys.intern(name)
+        self.floor = sys.intern(floor)
+        self.keys = keys
+        self.states = states
+
+    def state(self, key: str) -> Optional[CompactTopicState]:
+        try:
+            return self.states[self.keys.index(key)]
+        except ValueError:
+            return None
+
+    def set_state(self, key: str, state: CompactTopicState) -> None:
+        if key in self.keys:
+            idx = self.keys.index(key)
+            self.states = self.states[:idx] + (state,) + self.states[idx + 1:]
+        else:
+            self.keys = _layout(self.keys + (key,))
+            self.states = self.states + (state,)
+
+    @classmethod
+    def from_room(cls, room: RoomData) -> "CompactRoom":
+        keys = _layout(tuple(room.topics))
+        states = tuple(CompactTopicState.from_state(k, s) for k, s in room.topics.items())
+        return cls(room.name, room.floor, keys, states)
+
+    def to_room(self) -> RoomData:
+        return RoomData(name=self.name, floor=self.floor, topics={k: s.to_state(k) for k, s in zip(self.keys, self.states)})
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompactRoom":
+        keys, states = _encode_topics(data.get("topics", {}))
+        return cls(data["name"], data["floor"], keys, states)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "floor": self.floor, "topics": {k: s.to_dict(k) for k, s in zip(self.keys, self.states)}}
+
+
+class CompactProject:
+    __slots__ = ("metadata", "global_keys", "global_states", "rooms")
+
+    def __init__(
+        self,
+        metadata: ProjectMetadata,
+        global_keys: Tuple[str, ...],
+        global_states: Tuple[CompactTopicState, ...],
+        rooms: Dict[str, CompactRoom],
+    ):
+        self.metadata = metadata
+        self.global_keys = global_keys
+        self.global_states = global_states
+        self.rooms = rooms
+
+    @classmethod
+    def from_project(cls, project: Project) -> "CompactProject":
+        keys = _layout(tuple(project.global_topics))
+        states = tuple(CompactTopicState.from_state(k, s) for k, s in project.global_topics.items())
+        rooms = {name: CompactRoom.from_room(room) for name, room in project.rooms.items()}
+        # Eigene Metadaten-Kopie, damit die kompakte Form als unveränderlicher Schnappschuss taugt.
+        return cls(replace(project.metadata), keys, states, rooms)
+
+    def to_project(self) -> Project:
+        return Project(
+            metadata=replace(self.metadata),
+            global_topics={k: s.to_state(k) for k, s in zip(self.global_keys, self.global_states)},
+            rooms={name: room.to_room() for name, room in self.rooms.items()},
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompactProject":
+        metadata = ProjectMetadata(**data["metadata"])
+        keys, states = _encode_topics(data.get("global_topics", {}))
+        rooms = {name: CompactRoom.from_dict(room) for name, room in data.get("rooms", {}).items()}
+        return cls(metadata, keys, states, rooms)
+
+    def to_dict(self) -> dict:
+        m = self.metadata
+        return {
+            "metadata": {
+                "project_name": m.project_name,
+                "status": m.status,
+                "version": m.version,
+                "created_at": m.created_at,
+                "updated_at": m.updated_at,
+            },
+            "global_topics": {k: s.to_dict(k) for k, s in zip(self.global_keys, self.global_states)},
+            "rooms": {name: room.to_dict() for name, room in self.rooms.items()},
+        }
+
+
+class ProjectSnapshot:
+    # Stand für Hintergrund-Tasks, ohne im GUI-Thread alle Räume anzufassen. Kompakt kopiert werden
+    # Metadaten, Global-Topics und
+    #   - ``rooms`` (dann liest ``loader`` alle übrigen, z. B. aus der gespeicherten Datei),
+    #   - sonst bei einer LazyRoomMap die geladenen Räume; nicht geladene liest der Task aus deren Quelle,
+    #   - sonst alle Räume.
+    __slots__ = ("metadata", "global_keys", "global_states", "rooms", "base")
+
+    def __init__(
+        self,
+        project: Project,
+        rooms: Optional[Iterable[str]] = None,
+        loader: Optional[Callable[[str], RoomData]] = None,
+        source: Optional[str] = None,
+    ):
+        self.metadata = replace(project.metadata)
+        self.global_keys = _layout(tuple(project.global_topics))
+        self.global_states = tuple(CompactTopicState.from_state(k, s) for k, s in project.global_topics.items())
+        self.base: Optional[LazyRoomMap] = None
+        if rooms is not None:
+            if loader is None:
+                raise ValueError("Teil-Schnappschuss braucht einen Loader für die übrigen Räume.")
+            copied = {name: project.rooms[name] for name in rooms if name in project.rooms}
+            self.base = LazyRoomMap(project.room_floors(), loader, source=source)
+        elif isinstance(project.rooms, LazyRoomMap):
+            copied = project.rooms.loaded()
+            self.base = project.rooms.detached()
+        else:
+            copied = project.rooms
+        self.rooms = {name: CompactRoom.from_room(room) for name, room in copied.items()}
+
+    def to_project(self) -> Project:
+        global_topics = {k: s.to_state(k) for k, s in zip(self.global_keys, self.global_states)}
+        if self.base is None:
+            rooms = {name: room.to_room() for name, room in self.rooms.items()}
+        else:
+            # Kopierte Räume gelten als geladen (und damit als möglicherweise geändert), alle übrigen nicht.
+            rooms = self.base.detached()
+            for name, room in self.rooms.items():
+                rooms[name] = room.to_room()
+        return Project(metadata=replace(self.metadata), global_topics=global_topics, rooms=rooms)
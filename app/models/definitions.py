@@ -95,6 +95,10 @@ OPTION_SETS: Dict[str, List[str]] = {
     ],
 }
 
+OPTION_IDS: Dict[str, Dict[str, int]] = {
+    name: {option: idx for idx, option in enumerate(options)} for name, options in OPTION_SETS.items()
+}
+
 
 @dataclass(frozen=True)
 class TopicDefinition:
@@ -1,27 +1,115 @@
 from __future__ import annotations
 
+from collections.abc import MutableMapping
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Dict, List
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
 
 from app.models.definitions import FLOORS, GLOBAL_TOPICS, ROOM_TOPICS
 
 
-@dataclass
+@dataclass(slots=True)
 class TopicState:
     selections: List[str] = field(default_factory=list)
     notes: str = ""
     assignee: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class RoomData:
     name: str
     floor: str
     topics: Dict[str, TopicState] = field(default_factory=dict)
 
 
-@dataclass
+class LazyRoomMap(MutableMapping):
+    # Räume werden erst beim ersten Zugriff über ``loader`` geladen; Name und Etage sind vorab bekannt.
+    def __init__(
+        self,
+        floors: Dict[str, str],
+        loader: Callable[[str], RoomData],
+        bulk_loader: Optional[Callable[[List[str]], Dict[str, RoomData]]] = None,
+        source: Optional[str] = None,
+    ):
+        self._floors = dict(floors)
+        self._loader = loader
+        self._bulk_loader = bulk_loader
+        self._rooms: Dict[str, RoomData] = {}
+        # Aufgelöster Pfad der Datei, aus der ``loader`` liest (None: keine Projektdatei, z. B. Historie).
+        self.source = source
+
+    def __getitem__(self, name: str) -> RoomData:
+        room = self._rooms.get(name)
+        if room is None:
+            if name not in self._floors:
+                raise KeyError(name)
+            room = self._rooms[name] = self._loader(name)
+        return room
+
+    def __setitem__(self, name: str, room: RoomData) -> None:
+        self._floors[name] = room.floor
+        self._rooms[name] = room
+
+    def __delitem__(self, name: str) -> None:
+        del self._floors[name]
+        self._rooms.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._floors)
+
+    def __len__(self) -> int:
+        return len(self._floors)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._floors
+
+    def load_all(self) -> None:
+        missing = [name for name in self._floors if name not in self._rooms]
+        if missing and self._bulk_loader is not None:
+            self._rooms.update(self._bulk_loader(missing))
+
+    def values(self):
+        self.load_all()
+        return super().values()
+
+    def items(self):
+        self.load_all()
+        return super().items()
+
+    def floor(self, name: str) -> str:
+        return self._floors[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._rooms
+
+    def loaded(self) -> Dict[str, RoomData]:
+        return dict(self._rooms)
+
+    def detached(self) -> "LazyRoomMap":
+        # Gleiche Räume und Quelle, aber nichts geladen: für Hintergrund-Tasks, die selbst nachladen.
+        return LazyRoomMap(self._floors, self._loader, self._bulk_loader, self.source)
+
+    def peek(self, name: str) -> RoomData:
+        # Geladenen Raum liefern oder aus der Quelle lesen, ohne ihn als geladen zu behalten.
+        room = self._rooms.get(name)
+        if room is not None:
+            return room
+        if name not in self._floors:
+            raise KeyError(name)
+        return self._loader(name)
+
+    def peek_all(self) -> Dict[str, RoomData]:
+        # Alle Räume in Reihenfolge; nicht geladene werden gesammelt gelesen und ebenfalls nicht behalten.
+        missing = [name for name in self._floors if name not in self._rooms]
+        if missing and self._bulk_loader is not None:
+            read = self._bulk_loader(missing)
+        else:
+            read = {name: self._loader(name) for name in missing}
+        return {name: self._rooms.get(name) or read[name] for name in self._floors}
+
+
+@dataclass(slots=True)
 class ProjectMetadata:
     project_name: str
     status: str = "Entwurf"
@@ -30,7 +118,7 @@ class ProjectMetadata:
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Project:
     metadata: ProjectMetadata
     global_topics: Dict[str, TopicState]
@@ -39,8 +127,46 @@ class Project:
     def touch(self) -> None:
         self.metadata.updated_at = datetime.now().isoformat(timespec="seconds")
 
+    def room_floors(self) -> Dict[str, str]:
+        if isinstance(self.rooms, LazyRoomMap):
+            return {name: self.rooms.floor(name) for name in self.rooms}
+        return {name: room.floor for name, room in self.rooms.items()}
+
+    def loaded_rooms(self) -> Dict[str, RoomData]:
+        # Nur geladene Räume können seit dem Laden verändert worden sein.
+        if isinstance(self.rooms, LazyRoomMap):
+            return self.rooms.loaded()
+        return dict(self.rooms)
+
+    def is_source(self, path: Path) -> bool:
+        # Liegen die nicht geladenen Räume unverändert in ``path``? Nur dann dürfen Speichern, Indizes und
+        # Historie sie überspringen (nicht z. B. bei "Speichern unter" in eine andere Datei).
+        return isinstance(self.rooms, LazyRoomMap) and self.rooms.source == str(path.resolve())
+
+    def changed_rooms(self, path: Path) -> List[str]:
+        # Räume, die sich gegenüber ``path`` geändert haben können.
+        if self.is_source(path):
+            return list(self.rooms.loaded())
+        return list(self.rooms)
+
+    def peek_room(self, name: str) -> RoomData:
+        # Für Speichern, Indizes und Historie: liest nicht geladene Räume, ohne sie im Projekt zu halten.
+        if isinstance(self.rooms, LazyRoomMap):
+            return self.rooms.peek(name)
+        return self.rooms[name]
+
+    def peek_rooms(self) -> Dict[str, RoomData]:
+        # Wie peek_room für alle Räume, z. B. für Prüfungen im GUI-Thread.
+        if isinstance(self.rooms, LazyRoomMap):
+            return self.rooms.peek_all()
+        return dict(self.rooms)
+
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {
+            "metadata": asdict(self.metadata),
+            "global_topics": {k: asdict(v) for k, v in self.global_topics.items()},
+            "rooms": {name: asdict(self.peek_room(name)) for name in self.rooms},
+        }
 
     @staticmethod
     def from_dict(data: Dict) -> "Project":
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class RuleCondition:
+    topics: Tuple[str, ...]
+    # Teilstrings der Optionen; leer = beliebige Auswahl im Topic.
+    match: Tuple[str, ...] = ()
+    # Exakte Optionsnamen, zusätzlich zu ``match``.
+    options: Tuple[str, ...] = ()
+    negate: bool = False
+
+
+@dataclass(frozen=True)
+class ConflictRule:
+    key: str
+    message: str
+    when: Tuple[RuleCondition, ...]
+
+
+CONFLICT_RULES: List[ConflictRule] = [
+    ConflictRule(
+        "poe_without_lan",
+        "PoE gewählt, aber keine LAN-Dose berücksichtigt.",
+        (
+            RuleCondition(("room_network",), ("PoE",)),
+            RuleCondition(("room_network",), ("LAN-Dose",), negate=True),
+        ),
+    ),
+    ConflictRule(
+        "shade_without_sensors",
+        "Automatische Beschattung ohne Sensorik gewählt.",
+        (
+            RuleCondition(("room_shade",), ("Sonnenstand", "Zeitgesteuert")),
+            RuleCondition(("room_sensor_general", "room_climate_sensors"), negate=True),
+        ),
+    ),
+    ConflictRule(
+        "camera_without_network",
+        "Kamera geplant, aber kein passendes Netzwerkprofil gewählt.",
+        (
+            RuleCondition(("room_security",), ("Kamera",)),
+            RuleCondition(("room_network",), ("PoE", "LAN"), negate=True),
+        ),
+    ),
+]
+
+
+def rules_from_dicts(entries: List[dict]) -> List[ConflictRule]:
+    rules: List[ConflictRule] = []
+    for entry in entries:
+        try:
+            conditions = tuple(
+                RuleCondition(
+                    topics=tuple(c["topics"]),
+                    match=tuple(c.get("match", ())),
+                    options=tuple(c.get("options", ())),
+                    negate=bool(c.get("negate", False)),
+                )
+                for c in entry["when"]
+            )
+            rules.append(ConflictRule(key=entry["key"], message=entry["message"], when=conditions))
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"Ungültige Konfliktregel: {entry!r}") from exc
+    return rules
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.models.definitions import OPTION_IDS, OPTION_SETS, ROOM_TOPICS, topic_map
+from app.models.project import Project, RoomData
+from app.models.rules import CONFLICT_RULES, ConflictRule, rules_from_dicts
+# Hausspezifische Zusatzregeln (im Datenordner wie storage.DATA_DIR), werden beim Start zu den
+# eingebauten Regeln kompiliert. Kein Import von storage, da der Projektindex die Auswertung nutzt.
+RULES_FILE = Path("data") / "conflict_rules.json"
+
+ANY_SELECTION = -1
+
+
+class CompiledCondition(NamedTuple):
+    masks: Tuple[Tuple[str, int], ...]
+    negate: bool
+
+
+class CompiledRule(NamedTuple):
+    key: str
+    message: str
+    conditions: Tuple[CompiledCondition, ...]
+
+
+class RuleSet:
+    def __init__(self, rules: Iterable[ConflictRule]):
+        self._topics = topic_map(ROOM_TOPICS)
+        # Teilstrings aus ``match`` je Topic mit eigenem Bit oberhalb des Katalogs: Freitextwerte
+        # treffen damit wie Katalogoptionen, wenn sie den Teilstring enthalten.
+        self._patterns: Dict[str, Dict[str, int]] = {}
+        self.rules: List[CompiledRule] = [self._compile(rule) for rule in rules]
+        by_topic: Dict[str, List[int]] = {}
+        for idx, rule in enumerate(self.rules):
+            for key in {key for cond in rule.conditions for key, _ in cond.masks}:
+                by_topic.setdefault(key, []).append(idx)
+        self.by_topic: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in by_topic.items()}
+        self.topics: FrozenSet[str] = frozenset(self.by_topic)
+        # Fingerabdruck der kompilierten Regeln (inkl. Optionskatalog), für Caches von Auswertungen.
+        self.digest = hashlib.sha256(repr(self.rules).encode("utf-8")).hexdigest()
+
+    def _compile(self, rule: ConflictRule) -> CompiledRule:
+        conditions = []
+        for cond in rule.when:
+            masks = []
+            for key in cond.topics:
+                topic = self._topics.get(key)
+                if topic is None:
+                    raise ValueError(f"Regel '{rule.key}': unbekanntes Topic '{key}'.")
+                if not cond.match and not cond.options:
+                    masks.append((key, ANY_SELECTION))
+                    continue
+                unknown = [o for o in cond.options if o not in OPTION_IDS[topic.option_set]]
+                if unknown:
+                    raise ValueError(f"Regel '{rule.key}': unbekannte Option(en) {unknown} für '{key}'.")
+                mask = 0
+                for option, idx in OPTION_IDS[topic.option_set].items():
+                    if option in cond.options or any(part in option for part in cond.match):
+                        mask |= 1 << idx
+                for part in cond.match:
+                    mask |= 1 << self._pattern_bit(key, part)
+                masks.append((key, mask))
+            conditions.append(CompiledCondition(tuple(masks), cond.negate))
+        return CompiledRule(rule.key, rule.message, tuple(conditions))
+
+    def _pattern_bit(self, key: str, part: str) -> int:
+        patterns = self._patterns.setdefault(key, {})
+        if part not in patterns:
+            # Bit len(Katalog) steht für "irgendein Freitext", die Teilstrings folgen danach.
+            patterns[part] = len(OPTION_SETS[self._topics[key].option_set]) + 1 + len(patterns)
+        return patterns[part]
+
+    def selection_mask(self, key: str, selections: List[str]) -> int:
+        option_set = self._topics[key].option_set
+        ids = OPTION_IDS[option_set]
+        # Freitext außerhalb des Katalogs zählt für "beliebige Auswahl" und für enthaltene ``match``-Teilstrings.
+        unknown_bit = len(OPTION_SETS[option_set])
+        patterns = self._patterns.get(key, {})
+        mask = 0
+        for value in selections:
+            idx = ids.get(value)
+            if idx is not None:
+                mask |= 1 << idx
+                continue
+            mask |= 1 << unknown_bit
+            for part, bit in patterns.items():
+                if part in value:
+                    mask |= 1 << bit
+        return mask
+
+    def _fires(self, rule: CompiledRule, masks: Dict[str, int]) -> bool:
+        for cond in rule.conditions:
+            hit = any(masks[key] & cmask for key, cmask in cond.masks)
+            if hit == cond.negate:
+                return False
+        return True
+
+    def _masks(self, room: RoomData, keys: Iterable[str]) -> Dict[str, int]:
+        return {key: self.selection_mask(key, room.topics[key].selections) for key in keys}
+
+    def evaluate(self, room: RoomData) -> Set[int]:
+        masks = self._masks(room, self.topics)
+        return {idx for idx, rule in enumerate(self.rules) if self._fires(rule, masks)}
+
+    def recheck(self, room: RoomData, key: str, fired: Set[int]) -> Set[int]:
+        affected = self.by_topic.get(key)
+        if not affected:
+            return fired
+        keys = {k for idx in affected for cond in self.rules[idx].conditions for k, _ in cond.masks}
+        masks = self._masks(room, keys)
+        result = set(fired)
+        for idx in affected:
+            if self._fires(self.rules[idx], masks):
+                result.add(idx)
+            else:
+                result.discard(idx)
+        return result
+
+    def messages(self, fired: Set[int]) -> List[str]:
+        return [self.rules[idx].message for idx in sorted(fired)]
+
+    def check_room(self, room: RoomData) -> List[str]:
+        return self.messages(self.evaluate(room))
+
+    def check_project(self, project: Project) -> Dict[str, List[str]]:
+        conflicts: Dict[str, List[str]] = {}
+        for room_name, room in project.rooms.items():
+            fired = self.evaluate(room)
+            if fired:
+                conflicts[room_name] = self.messages(fired)
+        return conflicts
+
+
+def load_rule_catalog(path: Path) -> List[ConflictRule]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Ungültiges JSON in {path}: {exc}") from exc
+    return rules_from_dicts(data)
+
+
+_RULE_SET: Optional[RuleSet] = None
+
+
+def get_rule_set() -> RuleSet:
+    global _RULE_SET
+    if _RULE_SET is None:
+        rules = list(CONFLICT_RULES)
+        if RULES_FILE.exists():
+            rules.extend(load_rule_catalog(RULES_FILE))
+        _RULE_SET = RuleSet(rules)
+    return _RULE_SET
+
+
+def reload_rule_set() -> RuleSet:
+    global _RULE_SET
+    _RULE_SET = None
+    return get_rule_set()
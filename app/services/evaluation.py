@@ -5,6 +5,7 @@ from typing import Dict, List
 
 from app.models.definitions import ROOM_TOPICS
 from app.models.project import Project
+from app.services.instrumentation import timed
 from app.services.validation import detect_conflicts
 
 
@@ -17,6 +18,7 @@ def build_room_matrix(project: Project) -> Dict[str, Dict[str, List[str]]]:
     return matrix
 
 
+@timed("evaluation.topic_metrics")
 def topic_metrics(project: Project) -> Dict[str, dict]:
     metrics: Dict[str, dict] = {}
     room_count = len(project.rooms)
@@ -41,20 +43,24 @@ def topic_metrics(project: Project) -> Dict[str, dict]:
     return metrics
 
 
+def score_entry(filled: int, total: int, conflict_count: int) -> dict:
+    completeness = filled / total if total else 0
+    raw = max(0.0, completeness - conflict_count * 0.1)
+    if raw >= 0.8:
+        color = "grün"
+    elif raw >= 0.55:
+        color = "gelb"
+    else:
+        color = "rot"
+    return {"value": round(raw, 2), "ampel": color, "conflicts": conflict_count}
+
+
+@timed("evaluation.room_score")
 def room_score(project: Project) -> Dict[str, dict]:
     conflicts = detect_conflicts(project)
     scores: Dict[str, dict] = {}
     total = len(ROOM_TOPICS)
     for room_name, room in project.rooms.items():
         filled = sum(1 for t in ROOM_TOPICS if room.topics[t.key].selections)
-        completeness = filled / total if total else 0
-        c = len(conflicts.get(room_name, []))
-        raw = max(0.0, completeness - c * 0.1)
-        if raw >= 0.8:
-            color = "grün"
-        elif raw >= 0.55:
-            color = "gelb"
-        else:
-            color = "rot"
-        scores[room_name] = {"value": round(raw, 2), "ampel": color, "conflicts": c}
+        scores[room_name] = score_entry(filled, total, len(conflicts.get(room_name, [])))
     return scores
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models.definitions import ROOM_TOPICS
+from app.models.project import Project
+from app.services.conflict_rules import RuleSet, get_rule_set
+from app.services.evaluation import build_room_matrix, score_entry
+from app.services.instrumentation import timed
+
+
+# Hält die Kennzahlen der Auswertung inkrementell aktuell: jede Topic-Änderung kostet O(Optionen),
+# topic_metrics/room_score liefern dieselben Werte wie die Funktionen in app.services.evaluation.
+class EvaluationEngine:
+    def __init__(self, project: Project, rules: Optional[RuleSet] = None):
+        self.project = project
+        self.rules = rules or get_rule_set()
+        self.rebuild()
+
+    @timed("evaluation.engine_rebuild")
+    def rebuild(self) -> None:
+        self._freq: Dict[str, Counter] = {t.key: Counter() for t in ROOM_TOPICS}
+        self._value_count: Dict[str, int] = {t.key: 0 for t in ROOM_TOPICS}
+        self._rooms_with: Dict[str, int] = {t.key: 0 for t in ROOM_TOPICS}
+        self._filled: Dict[str, int] = {}
+        self._fired: Dict[str, Set[int]] = {}
+        self._seen: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        for room_name in self.project.rooms:
+            self.add_room(room_name)
+
+    def add_room(self, room_name: str) -> None:
+        room = self.project.rooms[room_name]
+        self._filled[room_name] = 0
+        for topic in ROOM_TOPICS:
+            self._apply(room_name, topic.key, (), tuple(room.topics[topic.key].selections))
+        self._fired[room_name] = self.rules.evaluate(room)
+
+    def remove_room(self, room_name: str) -> None:
+        for topic in ROOM_TOPICS:
+            self._apply(room_name, topic.key, self._seen.pop((room_name, topic.key), ()), ())
+        self._filled.pop(room_name, None)
+        self._fired.pop(room_name, None)
+
+    def update_topic(self, room_name: str, key: str) -> None:
+        if key not in self._freq:
+            return
+        new = tuple(self.project.rooms[room_name].topics[key].selections)
+        old = self._seen.get((room_name, key), ())
+        if new == old:
+            return
+        self._apply(room_name, key, old, new)
+        if key in self.rules.topics:
+            self._fired[room_name] = self.rules.recheck(self.project.rooms[room_name], key, self._fired[room_name])
+
+    def _apply(self, room_name: str, key: str, old: Tuple[str, ...], new: Tuple[str, ...]) -> None:
+        freq = self._freq[key]
+        for value in old:
+            freq[value] -= 1
+            if freq[value] <= 0:
+                del freq[value]
+        freq.update(new)
+        self._value_count[key] += len(new) - len(old)
+        had, has = bool(old), bool(new)
+        if had != has:
+            delta = 1 if has else -1
+            self._rooms_with[key] += delta
+            self._filled[room_name] += delta
+        self._seen[(room_name, key)] = new
+
+    def build_room_matrix(self) -> Dict[str, Dict[str, List[str]]]:
+        return build_room_matrix(self.project)
+
+    def topic_metrics(self) -> Dict[str, dict]:
+        room_count = len(self.project.rooms)
+        metrics: Dict[str, dict] = {}
+        for topic in ROOM_TOPICS:
+            freq = self._freq[topic.key]
+            total = self._value_count[topic.key]
+            metrics[topic.title] = {
+                "rooms_with_selection": self._rooms_with[topic.key],
+                "room_count": room_count,
+                "frequency": dict(freq),
+                "diversity": len(freq),
+                "dominant_ratio": (max(freq.values()) / total) if total else 0.0,
+            }
+        return metrics
+
+    def room_score(self, room_name: Optional[str] = None) -> Dict[str, dict]:
+        total = len(ROOM_TOPICS)
+        names = [room_name] if room_name is not None else list(self.project.rooms)
+        return {
+            name: score_entry(self._filled[name], total, len(self._fired[name]))
+            for name in names
+        }
+
+    def conflicts(self) -> Dict[str, List[str]]:
+        return {name: self.rules.messages(self._fired[name]) for name in self.project.rooms if self._fired[name]}
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ist optional, die reinen Python-Funktionen bleiben der Standard.
+    np = None
+
+from app.models.definitions import OPTION_IDS, OPTION_SETS, ROOM_TOPICS
+from app.models.project import Project
+from app.services import evaluation
+from app.services.conflict_rules import ANY_SELECTION, RuleSet, get_rule_set
+from app.services.evaluation import score_entry
+
+OPTION_WIDTH = max(len(options) for options in OPTION_SETS.values())
+
+
+class EncodedProject(NamedTuple):
+    rooms: List[str]
+    # bool-Array Räume × ROOM_TOPICS × Optionen
+    selected: "np.ndarray"
+    # False, wenn Werte außerhalb des Katalogs oder doppelte Auswahlen vorkommen – dann rechnet die Python-Variante.
+    exact: bool
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy ist nicht installiert (pip install numpy).")
+
+
+def encode_project(project: Project) -> EncodedProject:
+    _require_numpy()
+    rooms = list(project.rooms.keys())
+    selected = np.zeros((len(rooms), len(ROOM_TOPICS), OPTION_WIDTH), dtype=bool)
+    ids_per_topic = [(t, topic.key, OPTION_IDS[topic.option_set]) for t, topic in enumerate(ROOM_TOPICS)]
+    rs: List[int] = []
+    ts: List[int] = []
+    os_: List[int] = []
+    exact = True
+    for r, room in enumerate(project.rooms.values()):
+        for t, key, ids in ids_per_topic:
+            sels = room.topics[key].selections
+            if not sels:
+                continue
+            if len(set(sels)) != len(sels):
+                exact = False
+            for value in sels:
+                idx = ids.get(value)
+                if idx is None:
+                    exact = False
+                    continue
+                rs.append(r)
+                ts.append(t)
+                os_.append(idx)
+    selected[rs, ts, os_] = True
+    return EncodedProject(rooms, selected, exact)
+
+
+def topic_metrics(project: Project, encoded: Optional[EncodedProject] = None) -> Dict[str, dict]:
+    encoded = encoded or encode_project(project)
+    if not encoded.exact:
+        return evaluation.topic_metrics(project)
+    return _metrics_from_array(encoded.selected, len(encoded.rooms))
+
+
+def _metrics_from_array(selected: "np.ndarray", room_count: int) -> Dict[str, dict]:
+    counts = selected.sum(axis=0, dtype=np.int64)
+    rooms_with = selected.any(axis=-1).sum(axis=0)
+    totals = counts.sum(axis=-1)
+    maxima = counts.max(axis=-1)
+    diversity = (counts > 0).sum(axis=-1)
+    metrics: Dict[str, dict] = {}
+    for t, topic in enumerate(ROOM_TOPICS):
+        options = OPTION_SETS[topic.option_set]
+        total = int(totals[t])
+        metrics[topic.title] = {
+            "rooms_with_selection": int(rooms_with[t]),
+            "room_count": room_count,
+            "frequency": {options[o]: int(c) for o, c in enumerate(counts[t, : len(options)]) if c},
+            "diversity": int(diversity[t]),
+            "dominant_ratio": (int(maxima[t]) / total) if total else 0.0,
+        }
+    return metrics
+
+
+def _rule_tensors(rules: RuleSet) -> List[tuple]:
+    topic_index = {t.key: i for i, t in enumerate(ROOM_TOPICS)}
+    compiled = []
+    for rule in rules.rules:
+        conditions = []
+        for cond in rule.conditions:
+            mask = np.zeros((len(ROOM_TOPICS), OPTION_WIDTH), dtype=bool)
+            for key, cmask in cond.masks:
+                width = len(OPTION_SETS[ROOM_TOPICS[topic_index[key]].option_set])
+                for o in range(width):
+                    if cmask == ANY_SELECTION or cmask & (1 << o):
+                        mask[topic_index[key], o] = True
+            conditions.append((mask, cond.negate))
+        compiled.append(conditions)
+    return compiled
+
+
+def fired_rules(encoded: EncodedProject, rules: Optional[RuleSet] = None) -> "np.ndarray":
+    # bool-Array Räume × Regeln
+    rules = rules or get_rule_set()
+    fired = np.ones((len(encoded.rooms), len(rules.rules)), dtype=bool)
+    for r, conditions in enumerate(_rule_tensors(rules)):
+        for mask, negate in conditions:
+            hit = (encoded.selected & mask).any(axis=(1, 2))
+            fired[:, r] &= ~hit if negate else hit
+    return fired
+
+
+def room_score(project: Project, encoded: Optional[EncodedProject] = None, rules: Optional[RuleSet] = None) -> Dict[str, dict]:
+    encoded = encoded or encode_project(project)
+    if not encoded.exact:
+        return evaluation.room_score(project)
+    filled = encoded.selected.any(axis=-1).sum(axis=-1)
+    conflicts = fired_rules(encoded, rules).sum(axis=-1)
+    total = len(ROOM_TOPICS)
+    return {name: score_entry(int(filled[i]), total, int(conflicts[i])) for i, name in enumerate(encoded.rooms)}
+
+
+class ProjectStack(NamedTuple):
+    names: List[str]
+    # bool-Array Projekte × max. Räume × ROOM_TOPICS × Optionen; kürzere Projekte sind mit False aufgefüllt.
+    selected: "np.ndarray"
+    room_mask: "np.ndarray"
+
+
+def stack_projects(projects: Sequence[Project]) -> ProjectStack:
+    _require_numpy()
+    encoded = [encode_project(p) for p in projects]
+    if any(not e.exact for e in encoded):
+        raise ValueError("Projekte mit Werten außerhalb des Optionskatalogs lassen sich nicht stapeln.")
+    max_rooms = max((len(e.rooms) for e in encoded), default=0)
+    selected = np.zeros((len(encoded), max_rooms, len(ROOM_TOPICS), OPTION_WIDTH), dtype=bool)
+    room_mask = np.zeros((len(encoded), max_rooms), dtype=bool)
+    for i, e in enumerate(encoded):
+        selected[i, : len(e.rooms)] = e.selected
+        room_mask[i, : len(e.rooms)] = True
+    return ProjectStack([p.metadata.project_name for p in projects], selected, room_mask)
+
+
+def portfolio_metrics(stack: ProjectStack, rules: Optional[RuleSet] = None) -> dict:
+    rules = rules or get_rule_set()
+    flat = stack.selected.reshape(-1, len(ROOM_TOPICS), OPTION_WIDTH)[stack.room_mask.reshape(-1)]
+    room_count = int(stack.room_mask.sum())
+    filled = flat.any(axis=-1).sum(axis=-1)
+    fired = fired_rules(EncodedProject([""] * len(flat), flat, True), rules)
+    completeness = np.zeros(len(stack.names))
+    filled_per_project = stack.selected.any(axis=-1).sum(axis=(1, 2))
+    rooms_per_project = stack.room_mask.sum(axis=1)
+    np.divide(filled_per_project, rooms_per_project * len(ROOM_TOPICS), out=completeness, where=rooms_per_project > 0)
+    return {
+        "projects": len(stack.names),
+        "rooms": room_count,
+        "topic_metrics": _metrics_from_array(flat, room_count),
+        "room_completeness_mean": float(filled.mean() / len(ROOM_TOPICS)) if room_count else 0.0,
+        "project_completeness": list(zip(stack.names, completeness.round(3).tolist())),
+        "rule_rates": {
+            rule.key: (float(fired[:, i].mean()) if room_count else 0.0) for i, rule in enumerate(rules.rules)
+        },
+    }
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.models.definitions import GLOBAL_TOPICS, OPTION_SETS, ROOM_TOPICS
+
+EXPORT_CACHE_DIR = Path("data") / "export_cache"
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Beim Aufräumen bis auf diesen Anteil der Obergrenze löschen, damit nicht jeder put erneut räumt.
+EVICT_TARGET = 0.9
+# Erhöhen, wenn sich das Dateiformat der Einträge ändert: alte Einträge passen dann nicht mehr und werden verdrängt.
+CACHE_FORMAT = 2
+
+
+def _catalog_digest() -> str:
+    payload = json.dumps(
+        [[asdict(t) for t in GLOBAL_TOPICS], [asdict(t) for t in ROOM_TOPICS], OPTION_SETS],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Ändert sich der Topic-/Optionskatalog, passen alle Einträge automatisch nicht mehr.
+CATALOG_DIGEST = _catalog_digest()
+
+
+def content_key(kind: str, *parts: Any) -> str:
+    payload = json.dumps([kind, CACHE_FORMAT, CATALOG_DIGEST, *parts], sort_keys=True, ensure_ascii=False, default=asdict)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Inhaltsadressierter Dateicache für Exportfragmente (Blattzeilen, Teil-PDFs) mit LRU-Verdrängung nach Größe.
+# Einträge liegen als rohe Bytes in <key[:2]>/<key>.bin, die Erzeugungsdauer daneben in <key>.json; der
+# letzte Zugriff steht in der mtime, daher teilen sich parallele Exportprozesse denselben Cache ohne
+# zentrale Indexdatei.
+class ExportCache:
+    def __init__(self, root: Path, max_bytes: int = MAX_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.build_seconds = 0.0
+        self.evicted = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "build_seconds": round(self.build_seconds, 3),
+            "evicted": self.evicted,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bin"
+
+    def _cost(self, path: Path) -> float:
+        # Die Dauer dient nur der Statistik; fehlt oder klemmt die Begleitdatei, zählt der Treffer mit 0 s.
+        try:
+            return float(json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))["cost"])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return 0.0
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        cost = self._cost(path)
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += cost
+        return value
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def put(self, key: str, value: bytes, cost: float = 0.0) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Begleitdatei zuerst: sobald die Bytes sichtbar sind, stimmt auch die Dauer.
+        self._write(path.with_suffix(".json"), json.dumps({"cost": cost}).encode("utf-8"))
+        self._write(path, value)
+        with self._lock:
+            self.build_seconds += cost
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(value)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> bytes:
+        value = self.get(key)
+        if value is None:
+            t0 = time.perf_counter()
+            value = build()
+            self.put(key, value, time.perf_counter() - t0)
+        return value
+
+    def _scan(self):
+        for path in self.root.glob("*/*.bin"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, st.st_size, st.st_mtime_ns
+
+    def _evict(self) -> None:
+        # Älteste Zugriffe zuerst; die Größe wird dabei neu ermittelt, weil andere Prozesse mitschreiben.
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        size = sum(s for _, s, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        for path, s, _ in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            path.with_suffix(".json").unlink(missing_ok=True)
+            size -= s
+            self.evicted += 1
+        self._size = size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _, _ in self._scan():
+                path.unlink(missing_ok=True)
+                path.with_suffix(".json").unlink(missing_ok=True)
+            self._size = 0
+
+
+_CACHES: Dict[Tuple[str, int], ExportCache] = {}
+
+
+def get_export_cache(root: Optional[Path] = None, max_bytes: int = MAX_CACHE_BYTES) -> ExportCache:
+    root = root or EXPORT_CACHE_DIR
+    key = (str(root.resolve()), max_bytes)
+    if key not in _CACHES:
+        _CACHES[key] = ExportCache(root, max_bytes)
+    return _CACHES[key]
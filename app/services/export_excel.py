@@ -1,25 +1,57 @@
 from __future__ import annotations
 
+import json
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from copy import copy
+from io import BytesIO
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
 
 from app.models.definitions import GLOBAL_TOPICS, ROOM_TOPICS
-from app.models.project import Project
+from app.models.project import Project, RoomData, TopicState
 from app.services.evaluation import build_room_matrix, topic_metrics
+from app.services.export_cache import ExportCache, content_key, get_export_cache
+from app.services.instrumentation import timed
+from app.services.progress import Progress
 
 HEADER_FILL = PatternFill("solid", fgColor="1D4ED8")
 SECTION_FILL = PatternFill("solid", fgColor="E2E8F0")
 ALT_FILL = PatternFill("solid", fgColor="F8FAFC")
+HEADER_FONT = Font(color="FFFFFF", bold=True)
+SECTION_FONT = Font(bold=True)
+TOP_WRAP = Alignment(vertical="top", wrap_text=True)
+
+TOPIC_HEADER = ["Sektion", "Thema", "Auswahl(en)", "Notizen", "Verantwortlich"]
+TOPIC_WIDTHS = [22, 28, 45, 48, 20]
+# Erhöhen, sobald sich das Layout der Mappe ändert – alte Cache-Einträge passen dann nicht mehr.
+RENDER_VERSION = 1
+
+# Benannte Stile für den Streaming-Export: einmal registriert, pro Zelle nur noch referenziert.
+STYLE_HEADER = "planner_header"
+STYLE_SECTION = "planner_section"
+STYLE_BODY = "planner_body"
+STYLE_BODY_ALT = "planner_body_alt"
+STYLE_ALT = "planner_alt"
+
+# (Wert, Stilname) pro Zelle; reine Daten, damit Raumblätter in Worker-Prozessen vorbereitet werden können.
+SheetRow = List[Tuple[Any, Optional[str]]]
+SheetData = Tuple[List[SheetRow], List[str]]
 
 
 def _write_topic_sheet(ws, title: str, topics, topic_values) -> None:
     ws.title = title[:31]
-    ws.append(["Sektion", "Thema", "Auswahl(en)", "Notizen", "Verantwortlich"])
+    ws.append(TOPIC_HEADER)
     for c in ws[1]:
         c.fill = HEADER_FILL
-        c.font = Font(color="FFFFFF", bold=True)
+        c.font = HEADER_FONT
     row = 2
     current_section = None
     for topic in topics:
@@ -27,7 +59,7 @@ def _write_topic_sheet(ws, title: str, topics, topic_values) -> None:
             ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=5)
             cell = ws.cell(row=row, column=1, value=topic.section)
             cell.fill = SECTION_FILL
-            cell.font = Font(bold=True)
+            cell.font = SECTION_FONT
             row += 1
             current_section = topic.section
         state = topic_values[topic.key]
@@ -36,45 +68,195 @@ def _write_topic_sheet(ws, title: str, topics, topic_values) -> None:
             for col in range(1, 6):
                 ws.cell(row=row, column=col).fill = ALT_FILL
         row += 1
-    for col, width in zip("ABCDE", [22, 28, 45, 48, 20]):
+    for col, width in zip("ABCDE", TOPIC_WIDTHS):
         ws.column_dimensions[col].width = width
     for r in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=5):
         for c in r:
-            c.alignment = Alignment(vertical="top", wrap_text=True)
+            c.alignment = TOP_WRAP
 
 
-def export_project_to_excel(project: Project, target_file: Path) -> None:
-    wb = Workbook()
-    ws_global = wb.active
-    _write_topic_sheet(ws_global, "Global_Planung", GLOBAL_TOPICS, project.global_topics)
+def topic_sheet_data(topics, topic_values: Dict[str, TopicState]) -> SheetData:
+    rows: List[SheetRow] = [[(h, STYLE_HEADER) for h in TOPIC_HEADER]]
+    merges: List[str] = []
+    current_section = None
+    for topic in topics:
+        if topic.section != current_section:
+            row = len(rows) + 1
+            merges.append(f"A{row}:E{row}")
+            rows.append([(topic.section, STYLE_SECTION), *[(None, STYLE_BODY)] * 4])
+            current_section = topic.section
+        state = topic_values[topic.key]
+        style = STYLE_BODY_ALT if (len(rows) + 1) % 2 == 0 else STYLE_BODY
+        values = [topic.section, topic.title, ", ".join(state.selections) or "—", state.notes, state.assignee]
+        rows.append([(v, style) for v in values])
+    return rows, merges
 
-    for room_name, room in project.rooms.items():
-        ws = wb.create_sheet(title=room_name[:31])
-        _write_topic_sheet(ws, room_name, ROOM_TOPICS, room.topics)
 
-    ws_eval = wb.create_sheet("Auswertung_Raumvergleich")
-    ws_eval.append(["Topic", *project.rooms.keys(), "Räume mit Auswahl", "Diversity", "Dominanz"])
-    for c in ws_eval[1]:
-        c.fill = HEADER_FILL
-        c.font = Font(color="FFFFFF", bold=True)
+def room_sheet_data(room: RoomData) -> SheetData:
+    return topic_sheet_data(ROOM_TOPICS, room.topics)
+
+
+def _encode_room_sheet(room: RoomData) -> Tuple[bytes, float]:
+    # Läuft auch im Worker-Prozess; liefert den Cache-Eintrag (JSON-Bytes) samt Erzeugungsdauer.
+    t0 = time.perf_counter()
+    data = json.dumps(room_sheet_data(room), ensure_ascii=False).encode("utf-8")
+    return data, time.perf_counter() - t0
+
+
+def _decode_sheet(data: bytes) -> SheetData:
+    rows, merges = json.loads(data)
+    return rows, merges
+
+
+def _room_sheets(rooms: List[RoomData], workers: int, cache: Optional[ExportCache]) -> Iterator[SheetData]:
+    # Raumblätter in Mappenreihenfolge: unveränderte Räume aus dem Cache, nur die übrigen neu vorbereiten.
+    keys = [content_key("xlsx-room", RENDER_VERSION, room) for room in rooms]
+    cached: Dict[int, bytes] = {}
+    if cache is not None:
+        for i, key in enumerate(keys):
+            data = cache.get(key)
+            if data is not None:
+                cached[i] = data
+    missing = [room for i, room in enumerate(rooms) if i not in cached]
+    pool = None
+    if workers and len(missing) > 1:
+        # Zeilen parallel vorbereiten; geschrieben wird weiterhin nacheinander in eine Mappe.
+        # spawn statt fork: der Export läuft auch aus einem Thread der Qt-Oberfläche.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        built = pool.map(_encode_room_sheet, missing, chunksize=max(1, len(missing) // (workers * 4)))
+    else:
+        built = map(_encode_room_sheet, missing)
+    try:
+        for i, key in enumerate(keys):
+            data = cached.get(i)
+            if data is None:
+                data, cost = next(built)
+                if cache is not None:
+                    cache.put(key, data, cost)
+            yield _decode_sheet(data)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _register_styles(wb: Workbook) -> None:
+    wb.add_named_style(NamedStyle(STYLE_HEADER, fill=HEADER_FILL, font=HEADER_FONT))
+    wb.add_named_style(NamedStyle(STYLE_SECTION, fill=SECTION_FILL, font=SECTION_FONT, alignment=TOP_WRAP))
+    wb.add_named_style(NamedStyle(STYLE_BODY, alignment=TOP_WRAP))
+    wb.add_named_style(NamedStyle(STYLE_BODY_ALT, fill=ALT_FILL, alignment=TOP_WRAP))
+    wb.add_named_style(NamedStyle(STYLE_ALT, fill=ALT_FILL))
+
+
+def _stream_sheet(ws, data: SheetData, widths: List[int]) -> None:
+    rows, merges = data
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    styles: Dict[str, Any] = {}
+    for row in rows:
+        cells = []
+        for value, style in row:
+            cell = WriteOnlyCell(ws, value)
+            if style:
+                # Stil je Blatt nur einmal auflösen und das Ergebnis auf weitere Zellen kopieren.
+                if style not in styles:
+                    cell.style = style
+                    styles[style] = cell._style
+                else:
+                    cell._style = copy(styles[style])
+            cells.append(cell)
+        ws.append(cells)
+    for ref in merges:
+        ws.merged_cells.add(ref)
+
+
+def _evaluation_rows(project: Project) -> List[List[Any]]:
     matrix = build_room_matrix(project)
     metrics = topic_metrics(project)
-    row = 2
+    rows = [["Topic", *project.rooms.keys(), "Räume mit Auswahl", "Diversity", "Dominanz"]]
     for topic, per_room in matrix.items():
         values = [", ".join(per_room[r]) or "—" for r in project.rooms.keys()]
         m = metrics[topic]
-        ws_eval.append([
+        rows.append([
             topic,
             *values,
             f"{m['rooms_with_selection']}/{m['room_count']}",
             m["diversity"],
             round(m["dominant_ratio"], 2),
         ])
+    return rows
+
+
+def _build_streaming(project: Project, workers: int, progress: Progress, cache: Optional[ExportCache] = None) -> Workbook:
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    ws_global = wb.create_sheet("Global_Planung")
+    _stream_sheet(ws_global, topic_sheet_data(GLOBAL_TOPICS, project.global_topics), TOPIC_WIDTHS)
+
+    rooms = list(project.rooms.values())
+    with closing(_room_sheets(rooms, workers, cache)) as sheets:
+        for i, (room, sheet) in enumerate(zip(rooms, sheets), 1):
+            _stream_sheet(wb.create_sheet(title=room.name[:31]), sheet, TOPIC_WIDTHS)
+            progress.step(i, len(rooms), room.name)
+
+    eval_rows = _evaluation_rows(project)
+    ws_eval = wb.create_sheet("Auswertung_Raumvergleich")
+    data: List[SheetRow] = [[(v, STYLE_HEADER) for v in eval_rows[0]]]
+    for i, values in enumerate(eval_rows[1:], 2):
+        style = STYLE_ALT if i % 2 == 0 else None
+        data.append([(v, style) for v in values])
+    _stream_sheet(ws_eval, (data, []), [22] * len(eval_rows[0]))
+    return wb
+
+
+def _build_workbook(project: Project, progress: Progress) -> Workbook:
+    wb = Workbook()
+    ws_global = wb.active
+    _write_topic_sheet(ws_global, "Global_Planung", GLOBAL_TOPICS, project.global_topics)
+
+    for i, (room_name, room) in enumerate(project.rooms.items(), 1):
+        ws = wb.create_sheet(title=room_name[:31])
+        _write_topic_sheet(ws, room_name, ROOM_TOPICS, room.topics)
+        progress.step(i, len(project.rooms), room_name)
+
+    ws_eval = wb.create_sheet("Auswertung_Raumvergleich")
+    eval_rows = _evaluation_rows(project)
+    ws_eval.append(eval_rows[0])
+    for c in ws_eval[1]:
+        c.fill = HEADER_FILL
+        c.font = HEADER_FONT
+    row = 2
+    for values in eval_rows[1:]:
+        ws_eval.append(values)
         if row % 2 == 0:
             for col in range(1, ws_eval.max_column + 1):
                 ws_eval.cell(row=row, column=col).fill = ALT_FILL
         row += 1
     for i in range(1, ws_eval.max_column + 1):
-        ws_eval.column_dimensions[chr(64 + i)].width = 22
+        ws_eval.column_dimensions[get_column_letter(i)].width = 22
+    return wb
+
+
+@timed("export.excel")
+def export_project_to_excel(
+    project: Project,
+    target_file: Path,
+    streaming: bool = False,
+    workers: int = 0,
+    use_cache: bool = True,
+    progress: Optional[Progress] = None,
+) -> None:
+    # Die Mappe selbst lässt sich nicht aus fertigen Blättern zusammensetzen (gemeinsame Strings/Stile);
+    # gecacht werden daher die Zeilen je Raumblatt, geschrieben wird die Mappe jedes Mal neu.
+    progress = progress or Progress()
+    cache = get_export_cache() if use_cache else None
+    if streaming:
+        wb = _build_streaming(project, workers, progress, cache)
+    else:
+        wb = _build_workbook(project, progress)
+    progress.step(len(project.rooms), len(project.rooms), "Speichern")
+    buf = BytesIO()
+    wb.save(buf)
+    data = buf.getvalue()
+    progress.check()
     target_file.parent.mkdir(parents=True, exist_ok=True)
-    wb.save(target_file)
+    target_file.write_bytes(data)
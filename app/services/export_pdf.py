@@ -1,64 +1,260 @@
 from __future__ import annotations
 
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from io import BytesIO
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfgen import canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pypdf ist optional; ohne wird das PDF wie bisher in einem Durchlauf gebaut.
+    PdfReader = PdfWriter = None
+
 from app.models.definitions import GLOBAL_TOPICS, ROOM_TOPICS
-from app.models.project import Project
+from app.models.project import Project, RoomData
+from app.services.export_cache import ExportCache, content_key, get_export_cache
+from app.services.history import VersionDiff, state_text
+from app.services.instrumentation import timed
+from app.services.progress import Progress
 from app.services.evaluation import room_score
 from app.services.validation import detect_conflicts
 
+# Erhöhen, sobald sich das Layout eines Raumabschnitts ändert – alte Cache-Einträge passen dann nicht mehr.
+RENDER_VERSION = 2
+MAX_ROOM_BATCH = 50
+# Darunter lohnt sich das Starten der Worker-Prozesse nicht.
+PARALLEL_MIN_ROOMS = 40
 
-def export_project_to_pdf(project: Project, target_file: Path) -> None:
-    target_file.parent.mkdir(parents=True, exist_ok=True)
-    doc = SimpleDocTemplate(str(target_file), pagesize=A4)
-    styles = getSampleStyleSheet()
-    flow = []
+# (Hash, Raum, Score, Konflikte) – alles, was ein Raumabschnitt zum Rendern braucht.
+RoomJob = Tuple[str, RoomData, dict, List[str]]
 
-    flow.append(Paragraph(f"<b>Smarthome Planungsmappe</b>", styles["Title"]))
-    flow.append(Paragraph(f"Projekt: {project.metadata.project_name}", styles["Heading2"]))
-    flow.append(Paragraph(f"Status: {project.metadata.status} | Version: {project.metadata.version}", styles["Normal"]))
-    flow.append(Spacer(1, 12))
 
-    flow.append(Paragraph("<b>Global Planung</b>", styles["Heading3"]))
-    global_data = [["Thema", "Auswahl(en)", "Verantwortlich", "Notizen"]]
-    for t in GLOBAL_TOPICS:
-        s = project.global_topics[t.key]
-        global_data.append([t.title, ", ".join(s.selections) or "—", s.assignee or "—", s.notes or "—"])
-    gt = Table(global_data, repeatRows=1)
-    gt.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1D4ED8")),
+def _topic_table(topics, values, header_color: str) -> Table:
+    rows = [["Thema", "Auswahl(en)", "Verantwortlich", "Notizen"]]
+    for t in topics:
+        s = values[t.key]
+        rows.append([t.title, ", ".join(s.selections) or "—", s.assignee or "—", s.notes or "—"])
+    table = Table(rows, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(header_color)),
         ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
         ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
     ]))
-    flow.append(gt)
+    return table
+
+
+def _global_flow(project: Project, styles) -> list:
+    return [
+        Paragraph(f"<b>Smarthome Planungsmappe</b>", styles["Title"]),
+        Paragraph(f"Projekt: {escape(project.metadata.project_name)}", styles["Heading2"]),
+        Paragraph(f"Status: {escape(project.metadata.status)} | Version: {escape(project.metadata.version)}", styles["Normal"]),
+        Spacer(1, 12),
+        Paragraph("<b>Global Planung</b>", styles["Heading3"]),
+        _topic_table(GLOBAL_TOPICS, project.global_topics, "#1D4ED8"),
+        Spacer(1, 12),
+    ]
+
+
+_TOPIC_TITLES = {t.key: t.title for t in (*GLOBAL_TOPICS, *ROOM_TOPICS)}
+
+
+def _change_log_flow(changes: VersionDiff, styles) -> list:
+    old, new = changes.old, changes.new
+    flow = [Paragraph(
+        f"<b>Änderungsprotokoll: Version {old['id']} ({old['saved_at']}) → Version {new['id']} ({new['saved_at']})</b>",
+        styles["Heading3"],
+    )]
+    if changes.is_empty():
+        flow.append(Paragraph("Keine inhaltlichen Änderungen.", styles["Normal"]))
+    for key, before, after in changes.metadata:
+        flow.append(Paragraph(f"{key}: {escape(str(before))} → {escape(str(after))}", styles["Normal"]))
+    if changes.added_rooms:
+        flow.append(Paragraph(f"Neue Räume: {escape(', '.join(changes.added_rooms))}", styles["Normal"]))
+    if changes.removed_rooms:
+        flow.append(Paragraph(f"Entfernte Räume: {escape(', '.join(changes.removed_rooms))}", styles["Normal"]))
+    for name, before, after in changes.moved_rooms:
+        flow.append(Paragraph(f"Raum {escape(name)}: Etage {escape(str(before))} → {escape(str(after))}", styles["Normal"]))
+    # Notizen, Namen und Metadaten sind Freitext; Paragraph würde <...> und & als Markup deuten.
+    if changes.topics:
+        cell = styles["BodyText"]
+        rows = [["Bereich", "Thema", "Vorher", "Nachher"]]
+        for change in changes.topics:
+            rows.append([
+                change.room or "Global",
+                _TOPIC_TITLES.get(change.key, change.key),
+                Paragraph(escape(state_text(change.old)), cell),
+                Paragraph(escape(state_text(change.new)), cell),
+            ])
+        table = Table(rows, repeatRows=1, colWidths=[80, 110, 150, 150])
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#B45309")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]))
+        flow.append(table)
     flow.append(Spacer(1, 12))
+    return flow
+
+
+def _room_flow(room: RoomData, score: dict, conflicts: List[str], styles) -> list:
+    flow = [
+        Paragraph(f"<b>Raum: {escape(room.name)}</b>", styles["Heading3"]),
+        Paragraph(f"Ampel-Score: {score['ampel']} ({score['value']})", styles["Normal"]),
+        _topic_table(ROOM_TOPICS, room.topics, "#0F172A"),
+    ]
+    if conflicts:
+        flow.append(Paragraph("Konflikte:", styles["Normal"]))
+        for c in conflicts:
+            flow.append(Paragraph(f"• {c}", styles["Normal"]))
+    flow.append(Spacer(1, 10))
+    return flow
+
+
+def _render(flow: list) -> bytes:
+    buf = BytesIO()
+    SimpleDocTemplate(buf, pagesize=A4).build(flow)
+    return buf.getvalue()
+
+
+def _render_rooms(jobs: List[RoomJob]) -> List[Tuple[bytes, float]]:
+    # Läuft im Worker-Prozess: ein eigenständiges Teil-PDF pro Raum, damit es einzeln gecacht werden kann.
+    styles = getSampleStyleSheet()
+    out = []
+    for _, room, score, conflicts in jobs:
+        t0 = time.perf_counter()
+        out.append((_render(_room_flow(room, score, conflicts, styles)), time.perf_counter() - t0))
+    return out
+
 
+def _page_numbers(total: int) -> bytes:
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    c.setFont("Helvetica", 8)
+    for page in range(1, total + 1):
+        c.drawRightString(A4[0] - 40, 20, f"Seite {page} / {total}")
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def _merge(parts: List[bytes]) -> bytes:
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(BytesIO(part)))
+    stamps = PdfReader(BytesIO(_page_numbers(len(writer.pages))))
+    for page, stamp in zip(writer.pages, stamps.pages):
+        page.merge_page(stamp)
+    buf = BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def _render_missing(jobs: List[RoomJob], workers: int) -> Iterator[Tuple[List[RoomJob], List[Tuple[bytes, float]]]]:
+    if workers <= 1 or len(jobs) < PARALLEL_MIN_ROOMS:
+        for job in jobs:
+            yield [job], _render_rooms([job])
+        return
+    size = max(1, min(MAX_ROOM_BATCH, -(-len(jobs) // (workers * 4))))
+    batches = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    # spawn statt fork: der Aufrufer kann die Qt-Oberfläche sein.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+    try:
+        yield from zip(batches, pool.map(_render_rooms, batches))
+    finally:
+        # Bei Abbruch noch nicht gestartete Stapel verwerfen statt sie abzuarbeiten.
+        pool.shutdown(cancel_futures=True)
+
+
+def _export_chunked(
+    project: Project,
+    workers: int,
+    cache: Optional[ExportCache],
+    progress: Progress,
+    changes: Optional[VersionDiff] = None,
+) -> bytes:
     scores = room_score(project)
     conflicts = detect_conflicts(project)
+    jobs: List[RoomJob] = []
     for room_name, room in project.rooms.items():
-        flow.append(Paragraph(f"<b>Raum: {room_name}</b>", styles["Heading3"]))
-        score = scores[room_name]
-        flow.append(Paragraph(f"Ampel-Score: {score['ampel']} ({score['value']})", styles["Normal"]))
-        rows = [["Thema", "Auswahl(en)", "Verantwortlich", "Notizen"]]
-        for t in ROOM_TOPICS:
-            s = room.topics[t.key]
-            rows.append([t.title, ", ".join(s.selections) or "—", s.assignee or "—", s.notes or "—"])
-        tb = Table(rows, repeatRows=1)
-        tb.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0F172A")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ]))
-        flow.append(tb)
-        if room_name in conflicts:
-            flow.append(Paragraph("Konflikte:", styles["Normal"]))
-            for c in conflicts[room_name]:
-                flow.append(Paragraph(f"• {c}", styles["Normal"]))
-        flow.append(Spacer(1, 10))
-
-    doc.build(flow)
+        room_conflicts = conflicts.get(room_name, [])
+        key = content_key("pdf-room", RENDER_VERSION, room, scores[room_name], room_conflicts)
+        jobs.append((key, room, scores[room_name], room_conflicts))
+
+    parts: Dict[str, bytes] = {}
+    if cache is not None:
+        for key, *_ in jobs:
+            if key not in parts:
+                cached = cache.get(key)
+                if cached is not None:
+                    parts[key] = cached
+    missing = list({j[0]: j for j in jobs if j[0] not in parts}.values())
+    done = len(jobs) - len(missing)
+    progress.step(done, len(jobs), "Cache")
+    with closing(_render_missing(missing, workers)) as batches:
+        for batch, rendered in batches:
+            for (key, room, *_), (data, cost) in zip(batch, rendered):
+                parts[key] = data
+                if cache is not None:
+                    cache.put(key, data, cost)
+                done += 1
+                progress.step(done, len(jobs), room.name)
+
+    def build_head() -> bytes:
+        return _render(_global_flow(project, getSampleStyleSheet()))
+
+    if cache is not None:
+        # Nur die gedruckten Metadaten: updated_at ändert sich bei jedem Speichern und darf den Kopf nicht verfehlen lassen.
+        meta = project.metadata
+        head_key = content_key("pdf-head", RENDER_VERSION, meta.project_name, meta.status, meta.version, project.global_topics)
+        head = cache.get_or_build(head_key, build_head)
+    else:
+        head = build_head()
+    # Das Änderungsprotokoll gehört zu genau einem Versionspaar und wird nicht gecacht.
+    log = [_render(_change_log_flow(changes, getSampleStyleSheet()))] if changes is not None else []
+    progress.step(len(jobs), len(jobs), "Zusammenführen")
+    return _merge([head, *log, *(parts[j[0]] for j in jobs)])
+
+
+def _export_single(project: Project, progress: Progress, changes: Optional[VersionDiff] = None) -> bytes:
+    styles = getSampleStyleSheet()
+    flow = _global_flow(project, styles)
+    if changes is not None:
+        flow.extend(_change_log_flow(changes, styles))
+    scores = room_score(project)
+    conflicts = detect_conflicts(project)
+    for i, (room_name, room) in enumerate(project.rooms.items(), 1):
+        flow.extend(_room_flow(room, scores[room_name], conflicts.get(room_name, []), styles))
+        progress.step(i, len(project.rooms), room_name)
+    return _render(flow)
+
+
+@timed("export.pdf")
+def export_project_to_pdf(
+    project: Project,
+    target_file: Path,
+    workers: int = 0,
+    use_cache: bool = True,
+    progress: Optional[Progress] = None,
+    changes: Optional[VersionDiff] = None,
+) -> None:
+    # ``changes``: optionales Änderungsprotokoll (history.diff), steht nach der Global-Planung.
+    progress = progress or Progress()
+    if PdfWriter is not None:
+        data = _export_chunked(project, workers, get_export_cache() if use_cache else None, progress, changes)
+    else:
+        data = _export_single(project, progress, changes)
+    # Die Zieldatei entsteht erst am Ende; ein Abbruch hinterlässt keine halbe PDF.
+    progress.check()
+    target_file.parent.mkdir(parents=True, exist_ok=True)
+    target_file.write_bytes(data)
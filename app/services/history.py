@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.project import LazyRoomMap, Project, ProjectMetadata, RoomData, TopicState
+from app.services import journal
+from app.services.instrumentation import timed
+
+# Versionshistorie: jeder Speichervorgang legt eine Version an. Global-Topics und jeder Raum werden als
+# Block gehasht (sha256 über kanonisches JSON); gespeichert werden nur Blöcke, die es noch nicht gibt.
+#   objects/<h[:2]>/<h>          zlib-komprimierter Block: Topics {key: [auswahl, notizen, verantwortlich]}
+#                                oder Manifest {"global": h, "rooms": [[name, etage, h], ...]}
+#   projects/<pfad-hash>.jsonl   eine Zeile pro Version (id, Zeitpunkt, Metadaten, Manifest-Hash)
+# Der Objektspeicher ist projektübergreifend, gleiche Räume in mehreren Projekten liegen nur einmal vor.
+# Eigener Pfad wie conflict_rules, da storage selbst die Historie schreibt.
+HISTORY_DIR = Path("data") / "history"
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode
+
+# Letzte Version je Projekt: (Stempel der Versionsdatei, Eintrag, Manifest), spart das Neulesen beim Speichern.
+_LAST: Dict[str, Tuple[Optional[List[int]], dict, dict]] = {}
+
+
+@dataclass(slots=True)
+class TopicDiff:
+    room: Optional[str]
+    key: str
+    old: Optional[TopicState]
+    new: Optional[TopicState]
+
+
+@dataclass(slots=True)
+class VersionDiff:
+    old: dict
+    new: dict
+    metadata: List[Tuple[str, str, str]] = field(default_factory=list)
+    added_rooms: List[str] = field(default_factory=list)
+    removed_rooms: List[str] = field(default_factory=list)
+    # (Raum, alte Etage, neue Etage)
+    moved_rooms: List[Tuple[str, str, str]] = field(default_factory=list)
+    topics: List[TopicDiff] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.metadata or self.added_rooms or self.removed_rooms or self.moved_rooms or self.topics)
+
+
+def state_text(state: Optional[TopicState]) -> str:
+    # Einzeilige Darstellung für Änderungsprotokolle (CLI und PDF).
+    if state is None:
+        return "—"
+    parts = [", ".join(state.selections) or "—"]
+    if state.assignee:
+        parts.append(f"Verantwortlich: {state.assignee}")
+    if state.notes:
+        parts.append(f"Notiz: {state.notes}")
+    return " | ".join(parts)
+
+
+def versions_path(path: Path, root: Optional[Path] = None) -> Path:
+    key = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return (root or HISTORY_DIR) / "projects" / f"{key}.jsonl"
+
+
+def _object_path(digest: str, root: Optional[Path]) -> Path:
+    return (root or HISTORY_DIR) / "objects" / digest[:2] / digest
+
+
+def _topics_block(topics: Dict[str, TopicState]) -> bytes:
+    return _dumps({key: [s.selections, s.notes, s.assignee] for key, s in topics.items()}).encode("utf-8")
+
+
+def _digest(block: bytes) -> str:
+    return hashlib.sha256(block).hexdigest()
+
+
+def _store(digest: str, block: bytes, root: Optional[Path]) -> bool:
+    target = _object_path(digest, root)
+    if target.exists():
+        return False
+    # Inhaltsadressiert: parallele Schreiber erzeugen dieselben Bytes, das letzte os.replace gewinnt.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{digest}.{os.getpid()}.tmp")
+    tmp.write_bytes(zlib.compress(block))
+    os.replace(tmp, target)
+    return True
+
+
+def _load(digest: str, root: Optional[Path]):
+    try:
+        return json.loads(zlib.decompress(_object_path(digest, root).read_bytes()))
+    except FileNotFoundError:
+        raise ValueError(f"Versionsobjekt fehlt: {digest}") from None
+    except (zlib.error, json.JSONDecodeError) as exc:
+        raise ValueError(f"Versionsobjekt {digest} ist beschädigt: {exc}") from exc
+
+
+def _decode_topics(block: dict) -> Dict[str, TopicState]:
+    return {key: TopicState(*value) for key, value in block.items()}
+
+
+def _read_entries(log: Path) -> List[dict]:
+    try:
+        text = log.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    entries = []
+    for line in text.splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            # Abgebrochene Zeile nach einem Absturz überspringen, wie beim Journal.
+            continue
+    return entries
+
+
+def _stamp(log: Path) -> Optional[List[int]]:
+    try:
+        st = log.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _previous(log: Path, root: Optional[Path]) -> Tuple[Optional[dict], Optional[dict]]:
+    stamp = _stamp(log)
+    if stamp is None:
+        return None, None
+    cached = _LAST.get(str(log))
+    if cached is not None and cached[0] == stamp:
+        return cached[1], cached[2]
+    entries = _read_entries(log)
+    if not entries:
+        return None, None
+    manifest = _load(entries[-1]["manifest"], root)
+    _LAST[str(log)] = (stamp, entries[-1], manifest)
+    return entries[-1], manifest
+
+
+def _comparable(metadata: dict) -> dict:
+    # updated_at ändert sich bei jedem Speichern und allein keine neue Version wert.
+    return {k: v for k, v in metadata.items() if k != "updated_at"}
+
+
+@timed("history.record")
+def record(
+    project: Project,
+    path: Path,
+    changed: Optional[Iterable[Optional[str]]] = None,
+    root: Optional[Path] = None,
+) -> Optional[dict]:
+    # ``changed``: Räume (None = Global-Topics), die sich seit der letzten Version geändert haben können;
+    # ohne Angabe die Global-Topics und Project.changed_rooms. Stimmen Raumliste und Etagen mit der letzten
+    # Version überein, werden nur diese neu gehasht, sonst alle (per peek_room, ohne sie zu laden).
+    # Liefert den neuen Versionseintrag oder None, wenn sich inhaltlich nichts geändert hat.
+    if changed is None:
+        changed = [None, *project.changed_rooms(path)]
+    log = versions_path(path, root)
+    with journal.path_lock(log):
+        previous, manifest = _previous(log, root)
+        floors = project.room_floors()
+        reuse = manifest is not None and [[n, f] for n, f, _ in manifest["rooms"]] == [[n, f] for n, f in floors.items()]
+        touched: Set[Optional[str]] = set(changed) if reuse else set()
+        known = set()
+        if manifest is not None:
+            known = {manifest["global"], *(h for _, _, h in manifest["rooms"])}
+
+        written = 0
+        if reuse and None not in touched:
+            global_hash = manifest["global"]
+        else:
+            block = _topics_block(project.global_topics)
+            global_hash = _digest(block)
+            if global_hash not in known:
+                written += _store(global_hash, block, root)
+        rooms = []
+        old_hashes = {name: h for name, _, h in manifest["rooms"]} if manifest is not None else {}
+        for name, floor in floors.items():
+            if reuse and name not in touched:
+                rooms.append([name, floor, old_hashes[name]])
+                continue
+            block = _topics_block(project.peek_room(name).topics)
+            digest = _digest(block)
+            if digest not in known:
+                written += _store(digest, block, root)
+            rooms.append([name, floor, digest])
+
+        new_manifest = {"global": global_hash, "rooms": rooms}
+        manifest_block = _dumps(new_manifest).encode("utf-8")
+        manifest_hash = _digest(manifest_block)
+        metadata = asdict(project.metadata)
+        if previous is not None and previous["manifest"] == manifest_hash and _comparable(previous["metadata"]) == _comparable(metadata):
+            return None
+        _store(manifest_hash, manifest_block, root)
+
+        changed_blocks = int(manifest is None or manifest["global"] != global_hash)
+        changed_blocks += sum(1 for name, _, h in rooms if old_hashes.get(name) != h)
+        changed_blocks += len(old_hashes.keys() - floors.keys())
+        entry = {
+            "id": previous["id"] + 1 if previous is not None else 1,
+            "saved_at": project.metadata.updated_at,
+            "metadata": metadata,
+            "manifest": manifest_hash,
+            "rooms": len(rooms),
+            "changed": changed_blocks,
+            "new_blocks": written,
+        }
+        log.parent.mkdir(parents=True, exist_ok=True)
+        journal.append_bytes(log, json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        _LAST[str(log)] = (_stamp(log), entry, new_manifest)
+        return entry
+
+
+def list_versions(path: Path, root: Optional[Path] = None) -> List[dict]:
+    # Nur die Versionsdatei, kein Objekt wird gelesen.
+    return _read_entries(versions_path(path, root))
+
+
+def _entry(path: Path, version: int, root: Optional[Path]) -> dict:
+    for entry in list_versions(path, root):
+        if entry["id"] == version:
+            return entry
+    raise KeyError(f"Version {version} nicht vorhanden: {path}")
+
+
+def checkout(path: Path, version: int, root: Optional[Path] = None) -> Project:
+    # Räume werden wie beim kompakten Format erst beim Zugriff aus ihren Blöcken gelesen.
+    entry = _entry(path, version, root)
+    manifest = _load(entry["manifest"], root)
+    hashes = {name: h for name, _, h in manifest["rooms"]}
+    floors = {name: floor for name, floor, _ in manifest["rooms"]}
+
+    def load_room(name: str) -> RoomData:
+        return RoomData(name=name, floor=floors[name], topics=_decode_topics(_load(hashes[name], root)))
+
+    return Project(
+        metadata=ProjectMetadata(**entry["metadata"]),
+        global_topics=_decode_topics(_load(manifest["global"], root)),
+        rooms=LazyRoomMap(floors, load_room, lambda names: {name: load_room(name) for name in names}),
+    )
+
+
+def _topic_diffs(room: Optional[str], old: dict, new: dict) -> List[TopicDiff]:
+    diffs = []
+    for key in [*old, *(k for k in new if k not in old)]:
+        if old.get(key) != new.get(key):
+            before, after = old.get(key), new.get(key)
+            diffs.append(TopicDiff(room, key, TopicState(*before) if before else None, TopicState(*after) if after else None))
+    return diffs
+
+
+@timed("history.diff")
+def diff(path: Path, old_version: int, new_version: int, root: Optional[Path] = None) -> VersionDiff:
+    # Vergleich über die Manifeste; gelesen werden nur Blöcke, deren Hash sich unterscheidet.
+    old_entry, new_entry = _entry(path, old_version, root), _entry(path, new_version, root)
+    result = VersionDiff(old=old_entry, new=new_entry)
+    for key, value in old_entry["metadata"].items():
+        if key != "updated_at" and new_entry["metadata"].get(key) != value:
+            result.metadata.append((key, value, new_entry["metadata"].get(key)))
+    if old_entry["manifest"] == new_entry["manifest"]:
+        return result
+
+    old_manifest, new_manifest = _load(old_entry["manifest"], root), _load(new_entry["manifest"], root)
+    if old_manifest["global"] != new_manifest["global"]:
+        result.topics += _topic_diffs(None, _load(old_manifest["global"], root), _load(new_manifest["global"], root))
+    old_rooms = {name: (floor, h) for name, floor, h in old_manifest["rooms"]}
+    for name, floor, digest in new_manifest["rooms"]:
+        before = old_rooms.get(name)
+        if before is None:
+            result.added_rooms.append(name)
+            continue
+        if before[0] != floor:
+            result.moved_rooms.append((name, before[0], floor))
+        if before[1] != digest:
+            result.topics += _topic_diffs(name, _load(before[1], root), _load(digest, root))
+    new_names = {name for name, _, _ in new_manifest["rooms"]}
+    result.removed_rooms = [name for name in old_rooms if name not in new_names]
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Versionshistorie eines Projekts anzeigen, vergleichen und auschecken.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="Versionen auflisten")
+    p_list.add_argument("project", type=Path)
+    p_diff = sub.add_parser("diff", help="Änderungen zwischen zwei Versionen")
+    p_diff.add_argument("project", type=Path)
+    p_diff.add_argument("old", type=int)
+    p_diff.add_argument("new", type=int)
+    p_checkout = sub.add_parser("checkout", help="Version als Projektdatei schreiben")
+    p_checkout.add_argument("project", type=Path)
+    p_checkout.add_argument("version", type=int)
+    p_checkout.add_argument("target", type=Path, help="Endung bestimmt das Format (.json, .plan, .planz, .sqlite)")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for entry in list_versions(args.project):
+            meta = entry["metadata"]
+            print(f"{entry['id']:>4}  {entry['saved_at']}  {meta['status']:<12} v{meta['version']:<8} "
+                  f"{entry['rooms']} Räume, {entry['changed']} geändert")
+    elif args.command == "diff":
+        changes = diff(args.project, args.old, args.new)
+        for key, old, new in changes.metadata:
+            print(f"Metadaten {key}: {old} -> {new}")
+        for name in changes.added_rooms:
+            print(f"Raum neu: {name}")
+        for name in changes.removed_rooms:
+            print(f"Raum entfernt: {name}")
+        for name, old, new in changes.moved_rooms:
+            print(f"Raum {name}: Etage {old} -> {new}")
+        for change in changes.topics:
+            print(f"{change.room or 'Global'} / {change.key}: {state_text(change.old)} -> {state_text(change.new)}")
+    else:
+        # Wie ein "Speichern unter": Journal, Projekt- und Suchindex und die Historie des Ziels bleiben stimmig.
+        # Die eigene Datei wird nicht überschrieben, sonst stimmt die Historie nicht mehr mit ihr überein.
+        if args.target.resolve() == args.project.resolve():
+            parser.error("Ziel darf nicht die Projektdatei selbst sein; bitte eine neue Datei angeben")
+        from app.services.storage import save_project
+
+        save_project(checkout(args.project, args.version), args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TypeVar
+
+# Opt-in: PLANNER_PROFILE=1 (oder `python app/main.py --profile`). Ohne Aktivierung prüft jeder
+# instrumentierte Aufruf nur ein Flag. Eigener Pfad wie conflict_rules, da storage selbst instrumentiert ist.
+ENV_VAR = "PLANNER_PROFILE"
+LOG_DIR = Path("data") / "logs"
+LOG_FILE = LOG_DIR / "performance.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+F = TypeVar("F", bound=Callable)
+
+logger = logging.getLogger("planner.performance")
+
+
+class OperationStats:
+    __slots__ = ("calls", "total", "max", "last", "alloc")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        # Netto-Allokation (tracemalloc) über alle Aufrufe, in Bytes.
+        self.alloc = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+            "alloc_kb": round(self.alloc / 1024, 1),
+        }
+
+
+_enabled = False
+_lock = threading.Lock()
+_stats: Dict[str, OperationStats] = {}
+_registered: List[str] = []
+_armed: Optional[str] = None
+_last_profile: Optional[Path] = None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(log_file: Path = LOG_FILE, track_memory: bool = True) -> None:
+    global _enabled
+    if _enabled:
+        return
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def enable_from_env() -> bool:
+    if os.environ.get(ENV_VAR, "") not in ("", "0"):
+        enable()
+    return _enabled
+
+
+def _record(name: str, elapsed: float, alloc: int) -> None:
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = OperationStats()
+        entry.calls += 1
+        entry.total += elapsed
+        entry.last = elapsed
+        entry.max = max(entry.max, elapsed)
+        entry.alloc += alloc
+    logger.info("%s %.3f ms %+.1f KB", name, elapsed * 1000, alloc / 1024)
+
+
+def arm_profile(name: Optional[str]) -> None:
+    # Der nächste Aufruf von ``name`` läuft unter cProfile; das Ergebnis landet in LOG_DIR.
+    global _armed
+    _armed = name
+
+
+def armed_profile() -> Optional[str]:
+    return _armed
+
+
+def last_profile() -> Optional[Path]:
+    return _last_profile
+
+
+def _run_profiled(name: str, fn: Callable, args, kwargs):
+    global _last_profile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        target = LOG_DIR / f"{name}-{datetime.now():%Y%m%d-%H%M%S}.pstats"
+        profiler.dump_stats(target)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(40)
+        target.with_suffix(".txt").write_text(text.getvalue(), encoding="utf-8")
+        _last_profile = target
+        logger.info("Profil %s -> %s", name, target)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    def decorate(fn: F) -> F:
+        if name not in _registered:
+            _registered.append(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            global _armed
+            if not _enabled:
+                return fn(*args, **kwargs)
+            memory = tracemalloc.is_tracing()
+            before = tracemalloc.get_traced_memory()[0] if memory else 0
+            t0 = time.perf_counter()
+            try:
+                if _armed == name:
+                    _armed = None
+                    return _run_profiled(name, fn, args, kwargs)
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                after = tracemalloc.get_traced_memory()[0] if memory else 0
+                _record(name, elapsed, after - before)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def snapshot() -> Dict[str, dict]:
+    with _lock:
+        return {name: entry.as_dict() for name, entry in sorted(_stats.items())}
+
+
+def operation_names() -> List[str]:
+    return sorted(_registered)
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.models.project import Project, ProjectMetadata, TopicState
+
+# Eine Zeile pro Änderung: {"r": Raum|null, "k": Topic, "s": Auswahl, "n": Notizen, "a": Verantwortlich}
+# oder {"m": {...Metadaten...}}. Wird beim Laden nach der Haupt-JSON eingespielt.
+TopicChange = Tuple[Optional[str], str, TopicState]
+
+_LOCKS: Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def path_lock(path: Path) -> threading.Lock:
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(str(path.resolve()), threading.Lock())
+
+
+def journal_path(path: Path) -> Path:
+    return path.with_name(path.name + ".journal")
+
+
+def compacting_path(path: Path) -> Path:
+    return path.with_name(path.name + ".journal.compacting")
+
+
+def recovery_path(path: Path) -> Path:
+    return path.with_name(path.name + ".recovery")
+
+
+def recovery_saving_path(path: Path) -> Path:
+    return path.with_name(path.name + ".recovery.saving")
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    # Temp-Datei im Zielordner, erst nach fsync per Umbenennen sichtbar; bei Fehlern bleibt das Original.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            yield fh
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    with atomic_writer(path) as fh:
+        fh.write(text.encode("utf-8"))
+
+
+def topic_entry(room: Optional[str], key: str, state: TopicState) -> dict:
+    return {"r": room, "k": key, "s": state.selections, "n": state.notes, "a": state.assignee}
+
+
+def metadata_entry(metadata: ProjectMetadata) -> dict:
+    return {"m": {
+        "project_name": metadata.project_name,
+        "status": metadata.status,
+        "version": metadata.version,
+        "created_at": metadata.created_at,
+        "updated_at": metadata.updated_at,
+    }}
+
+
+def truncate_partial_line(fh: BinaryIO) -> None:
+    # Abgebrochene letzte Zeile (Absturz mitten im Anhängen) bis zum letzten Zeilenumbruch abschneiden,
+    # sonst klebt der nächste Eintrag daran und beide Zeilen wären beim Einspielen verloren.
+    end = fh.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    fh.seek(end - 1)
+    if fh.read(1) == b"\n":
+        return
+    pos = end
+    while pos > 0:
+        step = min(4096, pos)
+        pos -= step
+        fh.seek(pos)
+        cut = fh.read(step).rfind(b"\n")
+        if cut >= 0:
+            fh.truncate(pos + cut + 1)
+            return
+    fh.truncate(0)
+
+
+def append_bytes(target: Path, data: bytes) -> None:
+    # Ganze Zeilen anhängen; Aufrufer halten path_lock(target).
+    with target.open("a+b") as fh:
+        truncate_partial_line(fh)
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def _append_lines(target: Path, entries: Iterable[dict]) -> int:
+    lines = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in entries)
+    if not lines:
+        return 0
+    data = lines.encode("utf-8")
+    with path_lock(target):
+        append_bytes(target, data)
+    return len(data)
+
+
+def _change_entries(changes: Iterable[TopicChange], metadata: Optional[ProjectMetadata]) -> List[dict]:
+    entries: List[dict] = [topic_entry(room, key, state) for room, key, state in changes]
+    if metadata is not None:
+        entries.append(metadata_entry(metadata))
+    return entries
+
+
+def append_entries(path: Path, entries: Iterable[dict]) -> int:
+    with path_lock(path):
+        return _append_lines(journal_path(path), entries)
+
+
+def append_changes(path: Path, changes: Iterable[TopicChange], metadata: Optional[ProjectMetadata] = None) -> int:
+    return append_entries(path, _change_entries(changes, metadata))
+
+
+def _apply_entry(project: Project, entry: dict) -> None:
+    if "m" in entry:
+        project.metadata = ProjectMetadata(**entry["m"])
+        return
+    state = TopicState(selections=list(entry.get("s", [])), notes=entry.get("n", ""), assignee=entry.get("a", ""))
+    room = entry.get("r")
+    if room is None:
+        project.global_topics[entry["k"]] = state
+    elif room in project.rooms:
+        project.rooms[room].topics[entry["k"]] = state
+
+
+def _read_entries(segments: Iterable[Path]) -> Iterator[dict]:
+    for segment in segments:
+        if not segment.exists():
+            continue
+        for line in segment.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Abgebrochene Zeile nach einem Absturz: nur diese überspringen, spätere Einträge gelten weiter.
+                continue
+            yield entry
+
+
+def read_entries(path: Path) -> Iterator[dict]:
+    # Einträge beider Segmente in Schreibreihenfolge (auch für andere Dateien mit Journal, z. B. den Projektindex).
+    return _read_entries((compacting_path(path), journal_path(path)))
+
+
+def replay(project: Project, path: Path, include_current: bool = True) -> int:
+    # include_current=False: nur das beiseitegelegte Segment (für die Kompaktierung).
+    segments = (compacting_path(path), journal_path(path)) if include_current else (compacting_path(path),)
+    applied = 0
+    for entry in _read_entries(segments):
+        _apply_entry(project, entry)
+        applied += 1
+    return applied
+
+
+def pending_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in (compacting_path(path), journal_path(path)) if p.exists())
+
+
+def rotate(path: Path) -> None:
+    # Aktuelles Journal beiseitelegen; neue Änderungen landen ab jetzt in einem frischen Journal.
+    current, old = journal_path(path), compacting_path(path)
+    if not current.exists():
+        return
+    if old.exists():
+        append_bytes(old, current.read_bytes())
+        current.unlink()
+    else:
+        os.replace(current, old)
+
+
+def discard(path: Path, include_current: bool = False) -> None:
+    compacting_path(path).unlink(missing_ok=True)
+    if include_current:
+        journal_path(path).unlink(missing_ok=True)
+
+
+# Wiederherstellungsjournal der automatischen Sicherung: nicht gespeicherte Änderungen, gleiches Zeilenformat.
+# Beim Speichern wird es nach .recovery.saving verschoben und nach Erfolg gelöscht; was während des
+# Speicherns hinzukommt, landet wieder in einem frischen .recovery.
+def append_recovery(path: Path, changes: Iterable[TopicChange], metadata: Optional[ProjectMetadata] = None) -> int:
+    return _append_lines(recovery_path(path), _change_entries(changes, metadata))
+
+
+def has_recovery(path: Path) -> bool:
+    return recovery_path(path).exists() or recovery_saving_path(path).exists()
+
+
+def recovery_topics(path: Path) -> Set[Tuple[Optional[str], str]]:
+    return {
+        (e.get("r"), e["k"])
+        for e in _read_entries((recovery_saving_path(path), recovery_path(path)))
+        if "k" in e
+    }
+
+
+def replay_recovery(project: Project, path: Path) -> int:
+    applied = 0
+    for entry in _read_entries((recovery_saving_path(path), recovery_path(path))):
+        _apply_entry(project, entry)
+        applied += 1
+    return applied
+
+
+def rotate_recovery(path: Path) -> None:
+    current, saving = recovery_path(path), recovery_saving_path(path)
+    with path_lock(current):
+        if not current.exists():
+            return
+        if saving.exists():
+            append_bytes(saving, current.read_bytes())
+            current.unlink()
+        else:
+            os.replace(current, saving)
+
+
+def discard_recovery(path: Path, include_current: bool = False) -> None:
+    recovery_saving_path(path).unlink(missing_ok=True)
+    if include_current:
+        with path_lock(recovery_path(path)):
+            recovery_path(path).unlink(missing_ok=True)
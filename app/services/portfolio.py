@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.models.definitions import GLOBAL_TOPICS, ROOM_TOPICS
+from app.services import journal
+from app.services.project_index import file_stamp, get_index, project_digest
+from app.services.storage import DATA_DIR, INDEX_FILE
+
+CACHE_FILE = DATA_DIR / "portfolio_cache.json"
+REPORT_FILE = DATA_DIR / "portfolio.csv"
+# Erhöhen, wenn sich der Aufbau der Projektstatistik ändert: alte Cache-Einträge werden dann verworfen.
+STATS_VERSION = 1
+# Darunter lohnt der Start von Worker-Prozessen nicht.
+PARALLEL_MIN_PROJECTS = 8
+
+REPORT_COLUMNS = ["bereich", "topic", "wert", "anzahl", "basis", "anteil"]
+
+
+def project_stats(path: str) -> dict:
+    # Läuft im Worker-Prozess; das Ergebnis ist reines JSON und landet so im Cache.
+    from app.services.conflict_rules import get_rule_set
+    from app.services.evaluation import score_entry, topic_metrics
+    from app.services.storage import load_project
+    from app.services.validation import validate_required_fields
+
+    try:
+        project = load_project(Path(path))
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+    required: Dict[str, List[int]] = {}
+    for topic in GLOBAL_TOPICS:
+        if topic.required_for_export:
+            required[topic.key] = [int(bool(project.global_topics[topic.key].selections)), 1]
+    for topic in ROOM_TOPICS:
+        if topic.required_for_export:
+            filled = sum(1 for room in project.rooms.values() if room.topics[topic.key].selections)
+            required[topic.key] = [filled, len(project.rooms)]
+
+    # Regeln einmal pro Raum auswerten; gezählt wird nach Regel-Key, nicht nach Meldungstext.
+    rules = get_rule_set()
+    conflicts: Dict[str, int] = {}
+    ampel = {"grün": 0, "gelb": 0, "rot": 0}
+    for room in project.rooms.values():
+        fired = rules.evaluate(room)
+        for idx in fired:
+            key = rules.rules[idx].key
+            conflicts[key] = conflicts.get(key, 0) + 1
+        filled = sum(1 for t in ROOM_TOPICS if room.topics[t.key].selections)
+        ampel[score_entry(filled, len(ROOM_TOPICS), len(fired))["ampel"]] += 1
+
+    metrics = topic_metrics(project)
+    return {
+        "name": project.metadata.project_name,
+        "rooms": len(project.rooms),
+        "global": {t.key: list(project.global_topics[t.key].selections) for t in GLOBAL_TOPICS},
+        "room_options": {t.key: metrics[t.title]["frequency"] for t in ROOM_TOPICS},
+        "required": required,
+        "missing_required": len(validate_required_fields(project)),
+        "conflicts": conflicts,
+        "ampel": ampel,
+    }
+
+
+def _read_cache(cache_file: Path, rules: str) -> Dict[str, dict]:
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    # Geänderte Konfliktregeln (z. B. data/conflict_rules.json) verändern Konflikte und Ampel aller Projekte.
+    if data.get("version") != STATS_VERSION or data.get("rules") != rules:
+        return {}
+    return data.get("projects", {})
+
+
+def collect_stats(
+    index_file: Path = INDEX_FILE,
+    cache_file: Path = CACHE_FILE,
+    workers: int = 0,
+) -> dict:
+    # Pro Datei memoisiert: gleicher Stempel (mtime/Größe/Journal) -> Cache, sonst entscheidet der Hash.
+    from app.services.conflict_rules import get_rule_set
+
+    rules = get_rule_set().digest
+    cache = _read_cache(cache_file, rules)
+    fresh: Dict[str, dict] = {}
+    todo: List[str] = []
+    missing: List[str] = []
+    reused = 0
+    for entry in get_index(index_file).entries():
+        key = entry["path"]
+        path = Path(key)
+        stamp = file_stamp(path)
+        if stamp is None:
+            missing.append(key)
+            continue
+        cached = cache.get(key)
+        if cached and cached.get("stamp") == stamp:
+            fresh[key] = cached
+            reused += 1
+            continue
+        digest = project_digest(path)
+        if cached and cached.get("sha256") == digest:
+            fresh[key] = dict(cached, stamp=stamp)
+            reused += 1
+            continue
+        fresh[key] = {"stamp": stamp, "sha256": digest}
+        todo.append(key)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) >= PARALLEL_MIN_PROJECTS:
+        chunksize = max(1, len(todo) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            results = list(pool.map(project_stats, todo, chunksize=chunksize))
+    else:
+        results = [project_stats(key) for key in todo]
+    for key, stats in zip(todo, results):
+        fresh[key]["stats"] = stats
+
+    if fresh != cache:
+        journal.atomic_write_text(
+            cache_file, json.dumps({"version": STATS_VERSION, "rules": rules, "projects": fresh}, ensure_ascii=False)
+        )
+    return {"projects": fresh, "parsed": len(todo), "reused": reused, "missing": missing}
+
+
+def aggregate(projects: Dict[str, dict]) -> List[dict]:
+    stats = [p["stats"] for p in projects.values() if "error" not in p["stats"]]
+    total_projects = len(stats)
+    total_rooms = sum(s["rooms"] for s in stats)
+    rows: List[dict] = []
+
+    def row(section: str, topic: str, value: str, count: int, base: int) -> None:
+        rows.append({
+            "bereich": section,
+            "topic": topic,
+            "wert": value,
+            "anzahl": count,
+            "basis": base,
+            "anteil": round(count / base, 4) if base else 0.0,
+        })
+
+    row("Übersicht", "", "Projekte", total_projects, total_projects)
+    row("Übersicht", "", "Räume", total_rooms, total_rooms)
+    row("Übersicht", "", "Fehlerhafte Projekte", len(projects) - total_projects, len(projects))
+
+    for topic in GLOBAL_TOPICS:
+        counts: Dict[str, int] = {}
+        for s in stats:
+            for option in s["global"].get(topic.key, []):
+                counts[option] = counts.get(option, 0) + 1
+        for option, count in sorted(counts.items(), key=lambda item: -item[1]):
+            row("Global-Auswahl", topic.title, option, count, total_projects)
+
+    for topic in ROOM_TOPICS:
+        counts = {}
+        for s in stats:
+            for option, count in s["room_options"].get(topic.key, {}).items():
+                counts[option] = counts.get(option, 0) + count
+        for option, count in sorted(counts.items(), key=lambda item: -item[1]):
+            row("Raum-Auswahl", topic.title, option, count, total_rooms)
+
+    filled_all = 0
+    required_all = 0
+    for topic in (*GLOBAL_TOPICS, *ROOM_TOPICS):
+        if not topic.required_for_export:
+            continue
+        filled = sum(s["required"].get(topic.key, [0, 0])[0] for s in stats)
+        base = sum(s["required"].get(topic.key, [0, 0])[1] for s in stats)
+        filled_all += filled
+        required_all += base
+        row("Pflichtfelder", topic.title, "ausgefüllt", filled, base)
+    row("Pflichtfelder", "", "gesamt", filled_all, required_all)
+    complete = sum(1 for s in stats if not s["missing_required"])
+    row("Pflichtfelder", "", "Projekte vollständig", complete, total_projects)
+
+    from app.services.conflict_rules import get_rule_set
+
+    messages = {rule.key: rule.message for rule in get_rule_set().rules}
+    rule_keys = list(messages)
+    rule_keys += sorted({k for s in stats for k in s["conflicts"]} - set(messages))
+    for key in rule_keys:
+        rooms = sum(s["conflicts"].get(key, 0) for s in stats)
+        affected = sum(1 for s in stats if s["conflicts"].get(key))
+        row("Konflikte (Räume)", key, messages.get(key, ""), rooms, total_rooms)
+        row("Konflikte (Projekte)", key, messages.get(key, ""), affected, total_projects)
+
+    for color in ("grün", "gelb", "rot"):
+        row("Ampel", "", color, sum(s["ampel"].get(color, 0) for s in stats), total_rooms)
+    return rows
+
+
+def write_report(rows: List[dict], target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.suffix.lower() == ".xlsx":
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Portfolio")
+        ws.append(REPORT_COLUMNS)
+        for r in rows:
+            ws.append([r[c] for c in REPORT_COLUMNS])
+        wb.save(target)
+        return
+    with target.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=REPORT_COLUMNS, delimiter=";")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def build_report(
+    target: Path = REPORT_FILE,
+    index_file: Path = INDEX_FILE,
+    cache_file: Path = CACHE_FILE,
+    workers: int = 0,
+) -> dict:
+    result = collect_stats(index_file, cache_file, workers)
+    write_report(aggregate(result["projects"]), target)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Auswertung über alle Projekte im Projektindex.")
+    parser.add_argument("--out", type=Path, default=REPORT_FILE, help="Zieldatei (.csv oder .xlsx)")
+    parser.add_argument("--index", type=Path, default=INDEX_FILE)
+    parser.add_argument("--cache", type=Path, default=CACHE_FILE)
+    parser.add_argument("--workers", type=int, default=0, help="Anzahl Prozesse (0 = CPU-Kerne)")
+    args = parser.parse_args(argv)
+    result = build_report(args.out, args.index, args.cache, args.workers)
+    print(
+        f"{len(result['projects'])} Projekte: {result['parsed']} neu ausgewertet, "
+        f"{result['reused']} aus dem Cache, {len(result['missing'])} fehlen -> {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
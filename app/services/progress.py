@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+# (erledigt, gesamt, Beschriftung)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class Progress:
+    # Verbindet Exporter/Speichern mit dem Aufrufer: meldet Fortschritt und bricht an festen Punkten ab.
+    # Ohne Callback kostet ein Aufruf nur die Prüfung des Abbruch-Flags.
+    def __init__(self, report: Optional[ProgressCallback] = None):
+        self._report = report
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise OperationCancelled()
+
+    def step(self, done: int, total: int, label: str = "") -> None:
+        self.check()
+        if self._report is not None:
+            self._report(done, total, label)
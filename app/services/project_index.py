@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.models.definitions import GLOBAL_TOPICS, ROOM_TOPICS
+from app.models.project import Project
+from app.services import journal
+from app.services.conflict_rules import get_rule_set
+from app.services.evaluation import score_entry
+
+INDEX_VERSION = 3
+# Ab dieser Größe des Index-Journals wird die Index-Datei neu geschrieben.
+INDEX_COMPACT_BYTES = 64 * 1024
+
+# Kennzahlen je Raum: [belegte Topics, Konflikte]. Daraus entstehen Vollständigkeit, Ampel und
+# Konfliktzahl des Projekts, ohne beim Speichern unveränderte (oder nicht geladene) Räume zu lesen.
+RoomFigures = Dict[str, List[int]]
+
+
+def file_stamp(path: Path) -> Optional[List[int]]:
+    # Haupt-JSON (mtime/Größe) plus offenes Journal: ändert sich eines davon, ist der Eintrag veraltet.
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size, journal.pending_bytes(path)]
+
+
+def project_digest(path: Path) -> str:
+    # Haupt-JSON plus offene Journalsegmente, damit nur gespeicherte Änderungen einen Neulauf auslösen.
+    h = hashlib.sha256()
+    for segment in (path, journal.compacting_path(path), journal.journal_path(path)):
+        try:
+            fh = segment.open("rb")
+        except FileNotFoundError:
+            continue
+        with fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def room_figures(
+    project: Project,
+    cached: Optional[RoomFigures] = None,
+    changed: Optional[Iterable[Optional[str]]] = None,
+) -> Tuple[RoomFigures, RoomFigures]:
+    # Neu berechnet werden ``changed`` (sonst alle geladenen Räume) und Räume ohne gespeicherte Kennzahlen;
+    # gelesen wird dabei mit peek_room, nicht geladene Räume bleiben es. Liefert (alle, geänderte).
+    cached = cached or {}
+    stale = set(project.loaded_rooms()) if changed is None else {name for name in changed if name is not None}
+    rules = get_rule_set()
+    figures: RoomFigures = {}
+    fresh: RoomFigures = {}
+    for name in project.room_floors():
+        figure = cached.get(name)
+        if figure is None or name in stale:
+            room = project.peek_room(name)
+            figure = [sum(1 for t in ROOM_TOPICS if room.topics[t.key].selections), len(rules.evaluate(room))]
+            if figure != cached.get(name):
+                fresh[name] = figure
+        figures[name] = figure
+    return figures, fresh
+
+
+def _summary(project: Project, figures: RoomFigures) -> dict:
+    total = len(GLOBAL_TOPICS) + len(ROOM_TOPICS) * len(figures)
+    filled = sum(1 for t in GLOBAL_TOPICS if project.global_topics[t.key].selections)
+    ampel = {"grün": 0, "gelb": 0, "rot": 0}
+    conflicts = 0
+    for room_filled, room_conflicts in figures.values():
+        filled += room_filled
+        ampel[score_entry(room_filled, len(ROOM_TOPICS), room_conflicts)["ampel"]] += 1
+        conflicts += room_conflicts
+    return {
+        "name": project.metadata.project_name,
+        "status": project.metadata.status,
+        "version": project.metadata.version,
+        "updated_at": project.metadata.updated_at,
+        "rooms": len(figures),
+        "completeness": round(filled / total, 3) if total else 0.0,
+        "ampel": ampel,
+        "conflicts": conflicts,
+    }
+
+
+def summarize(project: Project) -> dict:
+    return _summary(project, room_figures(project)[0])
+
+
+# Index-Datei mit Journal wie die Projektdateien: jede Aktualisierung hängt eine Zeile für ein Projekt an
+# ({"p": Pfad, "e": Eintrag|null, "f": geänderte Raumkennzahlen, "r": Raumnamen bei geänderter Raumliste}),
+# erst ab INDEX_COMPACT_BYTES wird die ganze Datei neu geschrieben.
+class ProjectIndex:
+    def __init__(self, index_file: Path):
+        self.index_file = index_file
+        self._entries: Dict[str, dict] = {}
+        self._figures: Dict[str, RoomFigures] = {}
+        self._loaded_stamp: Optional[List[int]] = None
+        # Speichern läuft im Hintergrund-Thread, die Startseite liest im GUI-Thread.
+        self._lock = threading.RLock()
+
+    def _load(self) -> None:
+        stamp = file_stamp(self.index_file)
+        if stamp is not None and stamp == self._loaded_stamp:
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = []
+        if isinstance(data, list):
+            # Altes Format: Liste aus {"name", "path"} ohne Metadaten.
+            self._entries = {e["path"]: dict(e) for e in data if "path" in e}
+            self._figures = {}
+        else:
+            self._entries = dict(data.get("projects", {}))
+            self._figures = dict(data.get("figures", {}))
+        for line in journal.read_entries(self.index_file):
+            self._apply(line)
+        self._loaded_stamp = stamp
+
+    def _apply(self, line: dict) -> None:
+        key = line["p"]
+        if line.get("e") is None:
+            self._entries.pop(key, None)
+            self._figures.pop(key, None)
+            return
+        self._entries[key] = line["e"]
+        figures = self._figures.get(key, {})
+        if "r" in line:
+            figures = {name: figures[name] for name in line["r"] if name in figures}
+        figures.update(line.get("f", {}))
+        self._figures[key] = figures
+
+    def _append(self, line: dict) -> None:
+        # Aufrufer halten self._lock; Journal und Neuschreiben laufen damit nie gleichzeitig.
+        journal.append_entries(self.index_file, [line])
+        if journal.pending_bytes(self.index_file) >= INDEX_COMPACT_BYTES:
+            self._write()
+            journal.discard(self.index_file, include_current=True)
+        self._loaded_stamp = file_stamp(self.index_file)
+
+    def _write(self) -> None:
+        payload = {"version": INDEX_VERSION, "projects": self._entries, "figures": self._figures}
+        journal.atomic_write_text(self.index_file, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        self._loaded_stamp = file_stamp(self.index_file)
+
+    def entries(self) -> List[dict]:
+        with self._lock:
+            self._load()
+            return list(self._entries.values())
+
+    def get(self, path: Path) -> Optional[dict]:
+        with self._lock:
+            self._load()
+            return self._entries.get(str(path))
+
+    def _update(self, key: str, project: Project, changed: Optional[Iterable[Optional[str]]], stamp) -> dict:
+        cached = self._figures.get(key)
+        figures, fresh = room_figures(project, cached, changed)
+        entry = _summary(project, figures)
+        entry.update(path=key, stamp=stamp)
+        line = {"p": key, "e": entry, "f": fresh}
+        if cached is None or cached.keys() - figures.keys():
+            line["r"] = list(figures)
+        self._apply(line)
+        self._append(line)
+        return entry
+
+    def upsert(self, path: Path, project: Project, changed: Optional[Iterable[Optional[str]]] = None) -> dict:
+        # ``changed``: Räume (None = Global-Topics), die sich geändert haben können; ohne Angabe alle geladenen.
+        with self._lock:
+            self._load()
+            return self._update(str(path), project, changed, file_stamp(path))
+
+    def restamp(self, path: Path, before: Optional[List[int]], after: Optional[List[int]]) -> None:
+        # Nach dem Kompaktieren: gleicher Inhalt, neuer Stempel. Nur übernehmen, wenn der Eintrag aktuell war.
+        with self._lock:
+            self._load()
+            entry = self._entries.get(str(path))
+            if entry is None or entry.get("stamp") != before:
+                return
+            entry = dict(entry, stamp=after)
+            line = {"p": str(path), "e": entry}
+            self._apply(line)
+            self._append(line)
+
+    def remove(self, path: Path) -> None:
+        with self._lock:
+            self._load()
+            if str(path) in self._entries:
+                line = {"p": str(path), "e": None}
+                self._apply(line)
+                self._append(line)
+
+    def refresh(self, loader: Callable[[Path], Project]) -> List[dict]:
+        # Nur Dateien neu einlesen, deren Stempel sich außerhalb von upsert/restamp geändert hat. Der Inhalt
+        # ist dann unbekannt, alle Räume werden gelesen (peek_room, das geladene Projekt wird verworfen).
+        with self._lock:
+            self._load()
+            for key, entry in list(self._entries.items()):
+                path = Path(key)
+                stamp = file_stamp(path)
+                if stamp is None:
+                    if not entry.get("missing"):
+                        line = {"p": key, "e": dict(entry, missing=True)}
+                        self._apply(line)
+                        self._append(line)
+                    continue
+                if stamp == entry.get("stamp") and not entry.get("missing"):
+                    continue
+                try:
+                    project = loader(path)
+                    self._figures.pop(key, None)
+                    self._update(key, project, [], stamp)
+                except (ValueError, KeyError, TypeError) as exc:
+                    line = {"p": key, "e": dict(entry, error=str(exc), stamp=stamp)}
+                    self._apply(line)
+                    self._append(line)
+            return list(self._entries.values())
+
+
+_INDEXES: Dict[str, ProjectIndex] = {}
+
+
+def get_index(index_file: Path) -> ProjectIndex:
+    key = str(index_file.resolve())
+    if key not in _INDEXES:
+        _INDEXES.setdefault(key, ProjectIndex(index_file))
+    return _INDEXES[key]
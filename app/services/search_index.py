@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import argparse
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.project import Project, TopicState
+from app.services.project_index import file_stamp
+from app.services.storage_sqlite import GLOBAL_SCOPE
+
+# Invertierter Index über Auswahlen, Notizen und Verantwortliche aller Projekte, je Projekt/Raum/Topic.
+# postings: (token, feld, eintrag) mit Feld s = Wort aus einer Auswahl, o = ganze Option, n = Notiz,
+# a = Verantwortlich. Ein Präfix ist ein Bereichsscan über den Primärschlüssel.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, name TEXT NOT NULL, stamp TEXT);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    project INTEGER NOT NULL,
+    room TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    content TEXT NOT NULL,
+    UNIQUE (project, room, topic)
+);
+CREATE TABLE IF NOT EXISTS postings (token TEXT NOT NULL, field TEXT NOT NULL, entry INTEGER NOT NULL, PRIMARY KEY (token, field, entry)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry);
+"""
+
+# Feldnamen in Suchanfragen, z. B. ``verantwortlich:elektriker`` oder ``option:"Kamera (lokal)"``.
+FIELDS = {
+    "auswahl": "s",
+    "notiz": "n",
+    "notizen": "n",
+    "verantwortlich": "a",
+    "option": "o",
+}
+LEVELS = ("topic", "room", "project")
+MAX_HITS = 200
+
+_TOKEN = re.compile(r"\w+")
+_TERM = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+Key = Tuple[str, str]
+# (Feld oder None, Token, Präfix?)
+Term = Tuple[Optional[str], str, bool]
+
+
+@dataclass(slots=True)
+class SearchHit:
+    path: str
+    project: str
+    # None = Global-Topics
+    room: Optional[str]
+    topics: List[str] = field(default_factory=list)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+def _content(state: TopicState) -> str:
+    # Vergleichswert für inkrementelle Updates; leerer Zustand wird nicht indiziert.
+    if not state.selections and not state.notes and not state.assignee:
+        return ""
+    return "\x1e".join(("\x1f".join(state.selections), state.notes, state.assignee))
+
+
+def _postings(state: TopicState) -> Set[Tuple[str, str]]:
+    out = set()
+    for option in state.selections:
+        out.add((option.casefold(), "o"))
+        out.update((token, "s") for token in tokenize(option))
+    out.update((token, "n") for token in tokenize(state.notes))
+    out.update((token, "a") for token in tokenize(state.assignee))
+    return out
+
+
+def parse_query(query: str, options: Iterable[str] = ()) -> List[Term]:
+    # Wörter werden UND-verknüpft; ``wort*`` sucht als Präfix, Text in Anführungszeichen ist eine
+    # exakte Option. Unbekannte Feldnamen gelten als Teil des Suchworts.
+    terms: List[Term] = [("o", option.casefold(), False) for option in options]
+    for name, quoted, word in _TERM.findall(query):
+        fld = FIELDS.get(name.casefold()) if name else None
+        if name and fld is None:
+            word = f"{name}:{quoted or word}"
+            quoted = ""
+        if quoted and fld in (None, "o"):
+            terms.append(("o", quoted.casefold(), False))
+            continue
+        text = quoted or word
+        prefix = not quoted and text.endswith("*")
+        tokens = tokenize(text)
+        for i, token in enumerate(tokens):
+            terms.append((fld, token, prefix and i == len(tokens) - 1))
+    return terms
+
+
+class SearchIndex:
+    def __init__(self, index_file: Path):
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.index_file), timeout=10)
+        if not self._ready:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            # WAL: Suchanfragen im GUI-Thread warten nicht auf Speichervorgänge im Hintergrund.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def _project_id(self, conn: sqlite3.Connection, path: Path, name: str) -> int:
+        conn.execute(
+            "INSERT INTO projects (path, name) VALUES (?, ?) ON CONFLICT(path) DO UPDATE SET name = excluded.name",
+            (str(path), name),
+        )
+        return conn.execute("SELECT id FROM projects WHERE path = ?", (str(path),)).fetchone()[0]
+
+    def update(
+        self,
+        path: Path,
+        project: Project,
+        changed: Optional[Iterable[Tuple[Optional[str], str]]] = None,
+        full: bool = False,
+    ) -> int:
+        # ``changed``: (Raum oder None, Topic) seit dem letzten Update; sonst werden Global-Topics und alle
+        # geladenen Räume abgeglichen. Nicht geladene Räume sind unverändert und werden nur bei ``full`` oder
+        # einem noch nicht indizierten Projekt gelesen (peek_room, ohne sie zu laden).
+        # Geschrieben werden nur Einträge, deren Inhalt sich geändert hat. Liefert deren Anzahl.
+        wanted: Dict[Key, TopicState] = {}
+        floors = project.room_floors()
+        skip: Set[str] = set()
+        if changed is None:
+            if not full:
+                with closing(self._connect()) as conn:
+                    row = conn.execute("SELECT stamp FROM projects WHERE path = ?", (str(path),)).fetchone()
+                full = row is None or row[0] is None
+            wanted.update(((GLOBAL_SCOPE, key), state) for key, state in project.global_topics.items())
+            if full:
+                rooms = {name: project.peek_room(name) for name in floors}
+            else:
+                rooms = project.loaded_rooms()
+                skip = floors.keys() - rooms.keys()
+            for name, room in rooms.items():
+                wanted.update(((name, key), state) for key, state in room.topics.items())
+            keys = None
+        else:
+            keys = set()
+            for room, key in changed:
+                scope = GLOBAL_SCOPE if room is None else room
+                keys.add((scope, key))
+                topics = project.global_topics if room is None else (project.rooms[room].topics if room in project.rooms else {})
+                if key in topics:
+                    wanted[(scope, key)] = topics[key]
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            project_id = self._project_id(conn, path, project.metadata.project_name)
+            existing: Dict[Key, Tuple[int, str]] = {}
+            for entry_id, room, topic, content in conn.execute(
+                "SELECT id, room, topic, content FROM entries WHERE project = ?", (project_id,)
+            ):
+                if (keys is None and room not in skip) or (keys is not None and (room, topic) in keys):
+                    existing[(room, topic)] = (entry_id, content)
+
+            stale = []
+            fresh = []
+            updated = 0
+            for key, state in wanted.items():
+                content = _content(state)
+                old = existing.pop(key, None)
+                if (old[1] if old is not None else "") == content:
+                    continue
+                updated += 1
+                if old is not None:
+                    stale.append(old[0])
+                if content:
+                    fresh.append((key, content, state))
+            # Übrig sind Einträge, deren Raum oder Topic es nicht mehr gibt.
+            stale += [entry_id for entry_id, _ in existing.values()]
+            updated += len(existing)
+
+            conn.executemany("DELETE FROM postings WHERE entry = ?", [(i,) for i in stale])
+            conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in stale])
+            rows = []
+            for (room, topic), content, state in fresh:
+                entry_id = conn.execute(
+                    "INSERT INTO entries (project, room, topic, content) VALUES (?, ?, ?, ?)",
+                    (project_id, room, topic, content),
+                ).lastrowid
+                rows.extend((token, fld, entry_id) for token, fld in _postings(state))
+            conn.executemany("INSERT INTO postings (token, field, entry) VALUES (?, ?, ?)", rows)
+            conn.execute("UPDATE projects SET stamp = ? WHERE id = ?", (repr(file_stamp(path)), project_id))
+        return updated
+
+    def restamp(self, path: Path, before: Optional[List[int]], after: Optional[List[int]]) -> None:
+        # Nach dem Kompaktieren: gleicher Inhalt, neuer Stempel; sonst würde sync das Projekt neu lesen.
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE projects SET stamp = ? WHERE path = ? AND stamp = ?", (repr(after), str(path), repr(before))
+            )
+
+    def remove(self, path: Path) -> None:
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT id FROM projects WHERE path = ?", (str(path),)).fetchone()
+            if row is None:
+                return
+            conn.execute("DELETE FROM postings WHERE entry IN (SELECT id FROM entries WHERE project = ?)", row)
+            conn.execute("DELETE FROM entries WHERE project = ?", row)
+            conn.execute("DELETE FROM projects WHERE id = ?", row)
+
+    def sync(self, paths: Iterable[Path], loader: Callable[[Path], Project]) -> int:
+        # Projekte nachziehen, die außerhalb von save_project geändert wurden oder noch fehlen;
+        # Projekte, die nicht mehr in ``paths`` stehen, fliegen raus. Liefert die Zahl neu gelesener Projekte.
+        paths = list(paths)
+        with closing(self._connect()) as conn:
+            stamps = dict(conn.execute("SELECT path, stamp FROM projects").fetchall())
+        wanted = {str(p) for p in paths}
+        for stale in stamps.keys() - wanted:
+            self.remove(Path(stale))
+        loaded = 0
+        for path in paths:
+            stamp = file_stamp(path)
+            if stamp is None or stamps.get(str(path)) == repr(stamp):
+                continue
+            try:
+                project = loader(path)
+            except (ValueError, KeyError, TypeError):
+                continue
+            self.update(path, project, full=True)
+            loaded += 1
+        return loaded
+
+    def _matches(self, conn: sqlite3.Connection, term: Term) -> List[Tuple[int, str, str]]:
+        fld, token, prefix = term
+        if prefix:
+            where, args = "p.token >= ? AND p.token < ?", [token, token + "\U0010ffff"]
+        else:
+            where, args = "p.token = ?", [token]
+        if fld is not None:
+            where += " AND p.field = ?"
+            args.append(fld)
+        return conn.execute(
+            f"SELECT e.project, e.room, e.topic FROM postings p JOIN entries e ON e.id = p.entry WHERE {where}", args
+        ).fetchall()
+
+    def search(self, query: str, options: Iterable[str] = (), level: str = "room", limit: int = MAX_HITS) -> List[SearchHit]:
+        # Alle Begriffe müssen innerhalb derselben Einheit (Topic, Raum oder Projekt) vorkommen.
+        if level not in LEVELS:
+            raise ValueError(f"Unbekannte Ebene: {level}")
+        terms = parse_query(query, options)
+        if not terms:
+            return []
+        groups: Optional[Dict[tuple, Set[str]]] = None
+        with closing(self._connect()) as conn:
+            for term in terms:
+                found: Dict[tuple, Set[str]] = {}
+                for project_id, room, topic in self._matches(conn, term):
+                    if level == "topic":
+                        key = (project_id, room, topic)
+                    elif level == "room":
+                        key = (project_id, room)
+                    else:
+                        key = (project_id,)
+                    if groups is None or key in groups:
+                        found.setdefault(key, set()).add(topic if level != "project" or room == GLOBAL_SCOPE else f"{room}: {topic}")
+                if groups is not None:
+                    for key, topics in found.items():
+                        topics |= groups[key]
+                groups = found
+                if not groups:
+                    return []
+            projects = {pid: (path, name) for pid, path, name in conn.execute("SELECT id, path, name FROM projects")}
+
+        hits = []
+        for key, topics in groups.items():
+            path, name = projects[key[0]]
+            room = key[1] if level != "project" else None
+            hits.append(SearchHit(path=path, project=name, room=room or None, topics=sorted(topics)))
+        hits.sort(key=lambda h: (h.project.casefold(), h.path, h.room or "", h.topics))
+        return hits[:limit]
+
+
+_INDEXES: Dict[str, SearchIndex] = {}
+
+
+def get_search_index(index_file: Path) -> SearchIndex:
+    key = str(index_file.resolve())
+    if key not in _INDEXES:
+        _INDEXES.setdefault(key, SearchIndex(index_file))
+    return _INDEXES[key]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Volltextsuche über Auswahlen, Notizen und Verantwortliche aller Projekte.")
+    parser.add_argument("query", nargs="?", default="", help='z. B. \'"Kamera (lokal)" "NAS-Aufzeichnung" verantwortlich:elektr*\'')
+    parser.add_argument("--option", action="append", default=[], help="Exakte Option als Filter (mehrfach möglich)")
+    parser.add_argument("--level", choices=LEVELS, default="room", help="Einheit, in der alle Begriffe vorkommen müssen")
+    parser.add_argument("--sync", action="store_true", help="Vorher alle Projekte aus dem Projektindex abgleichen")
+    args = parser.parse_args(argv)
+    from app.services.storage import SEARCH_INDEX_FILE, list_projects
+
+    if args.sync:
+        # list_projects gleicht den Suchindex mit ab.
+        list_projects()
+    for hit in get_search_index(SEARCH_INDEX_FILE).search(args.query, args.option, args.level):
+        where = "" if args.level == "project" else f" / {hit.room or 'Global'}"
+        print(f"{hit.project}{where}: {', '.join(hit.topics)}  ({hit.path})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from app.models.compact import CompactProject
 from app.models.project import Project
+from app.services import history, journal, storage_compact, storage_sqlite
+from app.services.instrumentation import timed
+from app.services.project_index import file_stamp, get_index
+from app.services.search_index import SearchHit, get_search_index
 
 DATA_DIR = Path("data")
 PROJECTS_DIR = DATA_DIR / "projects"
 INDEX_FILE = DATA_DIR / "projects_index.json"
+SEARCH_INDEX_FILE = DATA_DIR / "search_index.sqlite"
+# Ab dieser Journalgröße wird die Haupt-JSON im Hintergrund neu geschrieben.
+JOURNAL_COMPACT_BYTES = 256 * 1024
 
 
 def ensure_storage() -> None:
@@ -19,27 +28,139 @@ def ensure_storage() -> None:
 
 def list_projects() -> List[dict]:
     ensure_storage()
-    try:
-        return json.loads(INDEX_FILE.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return []
+    entries = get_index(INDEX_FILE).refresh(load_project)
+    # Liest nur Projekte, deren Datei sich seit der letzten Indizierung geändert hat.
+    get_search_index(SEARCH_INDEX_FILE).sync([Path(e["path"]) for e in entries if not e.get("missing")], load_project)
+    return entries
+
+
+def search_projects(query: str, level: str = "room") -> List[SearchHit]:
+    return get_search_index(SEARCH_INDEX_FILE).search(query, level=level)
+
+
+def update_index(project: Project, path: Path, changed: Optional[Iterable[Tuple[Optional[str], str]]] = None) -> None:
+    # ``changed``: (Raum oder None, Topic); ohne Angabe gelten Project.changed_rooms als geändert, nicht
+    # geladene Räume aus derselben Datei werden weder gelesen noch geladen.
+    if changed is None:
+        get_index(INDEX_FILE).upsert(path, project, project.changed_rooms(path))
+        get_search_index(SEARCH_INDEX_FILE).update(path, project, full=not project.is_source(path))
+        return
+    changed = list(changed)
+    get_index(INDEX_FILE).upsert(path, project, {room for room, _ in changed})
+    get_search_index(SEARCH_INDEX_FILE).update(path, project, changed)
 
 
-def update_index(name: str, path: Path) -> None:
-    entries = [e for e in list_projects() if e.get("path") != str(path)]
-    entries.append({"name": name, "path": str(path)})
-    INDEX_FILE.write_text(json.dumps(entries, indent=2, ensure_ascii=False), encoding="utf-8")
+def _serialize(project: Project) -> str:
+    return json.dumps(project.to_dict(), indent=2, ensure_ascii=False)
 
 
+def write_project_file(project: Project, path: Path) -> None:
+    # Schreibt nur die Datei im Format der Endung (JSON, .plan/.planz, SQLite); Index und Journal bleiben unberührt.
+    if storage_sqlite.is_sqlite_path(path):
+        storage_sqlite.save_project(project, path)
+    elif storage_compact.is_compact_path(path):
+        # Direkt in die Temp-Datei streamen, ohne den ganzen Inhalt vorher im Speicher aufzubauen.
+        with journal.atomic_writer(path) as fh:
+            storage_compact.write_stream(project, fh, storage_compact.is_compressed_path(path))
+    else:
+        journal.atomic_write_text(path, _serialize(project))
+
+
+@timed("storage.save_project")
 def save_project(project: Project, path: Path) -> None:
     ensure_storage()
+    if storage_sqlite.is_sqlite_path(path):
+        project.touch()
+        storage_sqlite.save_project(project, path)
+        journal.discard_recovery(path)
+        update_index(project, path)
+        history.record(project, path)
+        return
+    wait_for_compaction(path)
     project.touch()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(project.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
-    update_index(project.metadata.project_name, path)
+    with journal.path_lock(path):
+        write_project_file(project, path)
+        journal.discard(path, include_current=True)
+    journal.discard_recovery(path)
+    update_index(project, path)
+    history.record(project, path)
+
+
+@timed("storage.save_changes")
+def save_changes(project: Project, path: Path, changes: Iterable[journal.TopicChange]) -> int:
+    # Journal-Modus: nur geänderte Topics anhängen, die Haupt-JSON bleibt bis zur Kompaktierung unverändert.
+    ensure_storage()
+    if storage_sqlite.is_sqlite_path(path):
+        # SQLite schreibt ohnehin nur geänderte Zeilen.
+        save_project(project, path)
+        return 0
+    changes = list(changes)
+    project.touch()
+    written = journal.append_changes(path, changes, project.metadata)
+    journal.discard_recovery(path)
+    update_index(project, path, [(room, key) for room, key, _ in changes])
+    # Nur die Blöcke der geänderten Räume neu hashen.
+    history.record(project, path, {room for room, _, _ in changes})
+    if journal.pending_bytes(path) >= JOURNAL_COMPACT_BYTES:
+        compact_project(path)
+    return written
+
+
+_COMPACTIONS: Dict[str, threading.Thread] = {}
+
+
+def wait_for_compaction(path: Path) -> None:
+    running = _COMPACTIONS.pop(str(path.resolve()), None)
+    if running is not None:
+        running.join()
+
+
+def compact_project(path: Path, background: bool = True) -> Optional[threading.Thread]:
+    key = str(path.resolve())
+    running = _COMPACTIONS.get(key)
+    if running is not None and running.is_alive():
+        # Eine Kompaktierung pro Datei; das restliche Journal wird beim nächsten Mal übernommen.
+        return running
+    with journal.path_lock(path):
+        journal.rotate(path)
 
+    def run() -> None:
+        # Gespeicherter Stand = Datei + beiseitegelegtes Journal; das Projekt im Speicher wird nicht gebraucht
+        # (nicht geladene Räume bleiben es). Gleicher Inhalt, neuer Stempel: Indizes nur umstempeln.
+        with journal.path_lock(path):
+            project = _read_file(path)
+            journal.replay(project, path, include_current=False)
+            before = file_stamp(path)
+            write_project_file(project, path)
+            journal.discard(path)
+            after = file_stamp(path)
+        get_index(INDEX_FILE).restamp(path, before, after)
+        get_search_index(SEARCH_INDEX_FILE).restamp(path, before, after)
 
-def load_project(path: Path) -> Project:
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name=f"compact:{path.name}", daemon=False)
+    _COMPACTIONS[key] = thread
+    thread.start()
+    return thread
+
+
+def unsaved_path() -> Path:
+    # Platzhalter für noch nie gespeicherte Projekte: es gibt nur die Sicherung daneben, nie die Datei selbst.
+    return DATA_DIR / "unsaved_project.json"
+
+
+def has_recovery(path: Path) -> bool:
+    return journal.has_recovery(path)
+
+
+def _read_file(path: Path) -> Project:
+    # Nur die Projektdatei, ohne Journal.
+    if storage_sqlite.is_sqlite_path(path):
+        return storage_sqlite.load_project(path)
+    if storage_compact.is_compact_path(path):
+        return storage_compact.load_project(path)
     if not path.exists():
         raise FileNotFoundError(f"Projektdatei nicht gefunden: {path}")
     try:
@@ -47,3 +168,27 @@ def load_project(path: Path) -> Project:
     except json.JSONDecodeError as exc:
         raise ValueError(f"Ungültiges JSON: {exc}") from exc
     return Project.from_dict(data)
+
+
+@timed("storage.load_project")
+def load_project(path: Path, recover: bool = False) -> Project:
+    # recover=True spielt zusätzlich die automatische Sicherung nicht gespeicherter Änderungen ein.
+    project = _read_file(path)
+    if not storage_sqlite.is_sqlite_path(path):
+        journal.replay(project, path)
+    if recover:
+        journal.replay_recovery(project, path)
+    return project
+
+
+def load_compact_project(path: Path) -> CompactProject:
+    # Für Werkzeuge, die viele Projekte gleichzeitig im Speicher halten.
+    if storage_sqlite.is_sqlite_path(path) or storage_compact.is_compact_path(path) or journal.pending_bytes(path):
+        return CompactProject.from_project(load_project(path))
+    if not path.exists():
+        raise FileNotFoundError(f"Projektdatei nicht gefunden: {path}")
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Ungültiges JSON: {exc}") from exc
+    return CompactProject.from_dict(data)
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+import threading
+from dataclasses import fields
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd ist optional, ohne das Paket wird gzip geschrieben.
+    zstandard = None
+
+from app.models.definitions import GLOBAL_TOPICS, OPTION_SETS, ROOM_TOPICS
+from app.models.project import LazyRoomMap, Project, ProjectMetadata, RoomData, TopicState
+
+# Kompaktes Projektformat: eine JSON-Zeile pro Datensatz, Auswahlen als Options-IDs.
+#   1. Kopf: {"format", "version", "global": [[key, optionset|null], ...], "room": [...], "options": {set: [...]},
+#      "rooms": n, "directory": [[name, etage, offset, länge], ...]} (ab Version 2; Offsets ab Ende von 3.)
+#   2. Metadaten als Objekt
+#   3. Global-Topics: [topic, ...] in der Reihenfolge aus dem Kopf
+#   4. je Raum: [name, etage, topic, ...]
+# Topic: 0 = leer, null = nicht vorhanden, sonst [auswahl, notizen?, verantwortlich?] mit Auswahl als
+# Options-ID (int) bzw. Freitext (str). Die Optionstabellen stehen im Kopf, damit alte Dateien auch nach
+# Katalogänderungen lesbar bleiben.
+COMPACT_SUFFIX = ".plan"
+COMPRESSED_SUFFIX = ".planz"
+FORMAT_NAME = "planner-compact"
+FORMAT_VERSION = 2
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+Layout = List[Tuple[str, Optional[str]]]
+
+
+def is_compact_path(path: Path) -> bool:
+    return path.suffix.lower() in (COMPACT_SUFFIX, COMPRESSED_SUFFIX)
+
+
+def is_compressed_path(path: Path) -> bool:
+    return path.suffix.lower() == COMPRESSED_SUFFIX
+
+
+def _layout(catalog: Layout, present: Dict[str, None]) -> Layout:
+    # Katalog-Topics zuerst; Schlüssel, die nur in der Datei vorkommen, hängen ohne Optionstabelle an.
+    known = {key for key, _ in catalog}
+    return catalog + [(key, None) for key in present if key not in known]
+
+
+_GLOBAL_LAYOUT: Layout = [(t.key, t.option_set) for t in GLOBAL_TOPICS]
+_ROOM_LAYOUT: Layout = [(t.key, t.option_set) for t in ROOM_TOPICS]
+
+
+def _encode_state(state: Optional[TopicState], ids: Optional[Dict[str, int]]):
+    if state is None:
+        return None
+    if not state.selections and not state.notes and not state.assignee:
+        return 0
+    if ids is None:
+        selections = list(state.selections)
+    else:
+        selections = [ids.get(value, value) for value in state.selections]
+    if state.assignee:
+        return [selections, state.notes, state.assignee]
+    if state.notes:
+        return [selections, state.notes]
+    return [selections]
+
+
+def _decode_state(value, options: Optional[List[str]]) -> TopicState:
+    # Heißer Pfad beim Laden (Räume × Topics): positionale Argumente, Freitext nur im Ausnahmefall.
+    if value == 0:
+        return TopicState([], "", "")
+    if options is not None:
+        try:
+            value[0] = list(map(options.__getitem__, value[0]))
+        except TypeError:
+            value[0] = [options[v] if type(v) is int else v for v in value[0]]
+    return TopicState(*value)
+
+
+def _encode(project: Project) -> Tuple[bytes, List[bytes]]:
+    # Raumzeilen zuerst kodieren, damit das Verzeichnis mit den Byte-Offsets in den Kopf passt.
+    # peek_room: nicht geladene Räume eines Projekts werden gelesen, aber nicht im Projekt gehalten.
+    rooms = {name: project.peek_room(name) for name in project.rooms}
+    global_layout = _layout(_GLOBAL_LAYOUT, dict.fromkeys(project.global_topics))
+    extra: Dict[str, None] = {}
+    for room in rooms.values():
+        if len(room.topics) != len(_ROOM_LAYOUT) or any(k not in room.topics for k, _ in _ROOM_LAYOUT):
+            extra.update(dict.fromkeys(room.topics))
+    room_layout = _layout(_ROOM_LAYOUT, extra)
+    used_sets = {s for _, s in global_layout + room_layout if s is not None}
+    ids = {name: {option: idx for idx, option in enumerate(OPTION_SETS[name])} for name in used_sets}
+
+    room_ids = [(key, ids.get(s)) for key, s in room_layout]
+    lines: List[bytes] = []
+    directory = []
+    offset = 0
+    for name, room in rooms.items():
+        topics = room.topics
+        line = _dumps([name, room.floor, *[_encode_state(topics.get(key), i) for key, i in room_ids]]).encode("utf-8") + b"\n"
+        lines.append(line)
+        directory.append([name, room.floor, offset, len(line)])
+        offset += len(line)
+
+    topics = project.global_topics
+    head = "\n".join((
+        _dumps({
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "global": global_layout,
+            "room": room_layout,
+            "options": {name: OPTION_SETS[name] for name in sorted(used_sets)},
+            "rooms": len(rooms),
+            "directory": directory,
+        }),
+        _dumps({f.name: getattr(project.metadata, f.name) for f in fields(ProjectMetadata)}),
+        _dumps([_encode_state(topics.get(key), ids.get(s)) for key, s in global_layout]),
+    )) + "\n"
+    return head.encode("utf-8"), lines
+
+
+def dump(project: Project, fh: BinaryIO) -> None:
+    # Schreibt Zeile für Zeile ohne Zwischen-Dict; ``fh`` ist eine binäre Datei oder ein Kompressor-Strom.
+    head, lines = _encode(project)
+    fh.write(head)
+    for line in lines:
+        fh.write(line)
+
+
+def dumps(project: Project, compressed: bool = False) -> bytes:
+    buf = io.BytesIO()
+    write_stream(project, buf, compressed)
+    return buf.getvalue()
+
+
+def write_stream(project: Project, fh: BinaryIO, compressed: bool = False) -> None:
+    if not compressed:
+        dump(project, fh)
+    elif zstandard is not None:
+        with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(fh, closefd=False) as out:
+            dump(project, out)
+    else:
+        # mtime=0: gleicher Inhalt ergibt dieselben Bytes (wichtig für Hash-Vergleiche).
+        with gzip.GzipFile(fileobj=fh, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as out:
+            dump(project, out)
+
+
+def _open_lines(fh: BinaryIO) -> io.TextIOBase:
+    if hasattr(fh, "peek"):
+        magic = fh.peek(4)[:4]
+    else:
+        magic = fh.read(4)
+        fh.seek(-len(magic), io.SEEK_CUR)
+    if magic.startswith(GZIP_MAGIC):
+        raw = gzip.GzipFile(fileobj=fh, mode="rb")
+    elif magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("Datei ist mit zstd komprimiert, das Paket 'zstandard' ist nicht installiert.")
+        raw = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fh, closefd=False))
+    else:
+        raw = fh
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def _check_header(header: dict) -> None:
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError("Keine kompakte Projektdatei.")
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"Dateiversion {header['version']} ist neuer als unterstützt ({FORMAT_VERSION}).")
+
+
+def _layouts(header: dict) -> Tuple[List[Tuple[str, Optional[List[str]]]], List[Tuple[str, Optional[List[str]]]]]:
+    option_sets = header["options"]
+    return (
+        [(key, option_sets.get(s) if s else None) for key, s in header["global"]],
+        [(key, option_sets.get(s) if s else None) for key, s in header["room"]],
+    )
+
+
+def _decode_topics(layout, values) -> Dict[str, TopicState]:
+    return {key: _decode_state(value, options) for (key, options), value in zip(layout, values) if value is not None}
+
+
+def _decode_room(record, layout) -> RoomData:
+    name, floor, *values = record
+    return RoomData(name=name, floor=floor, topics=_decode_topics(layout, values))
+
+
+_DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, IndexError, EOFError)
+
+
+def read_stream(fh: BinaryIO) -> Project:
+    # Liest Datensatz für Datensatz; es liegt nie die ganze Datei als ein JSON-Baum im Speicher.
+    lines = _open_lines(fh)
+    try:
+        header = json.loads(next(lines))
+        _check_header(header)
+        global_layout, room_layout = _layouts(header)
+        metadata = ProjectMetadata(**json.loads(next(lines)))
+        global_topics = _decode_topics(global_layout, json.loads(next(lines)))
+        rooms: Dict[str, RoomData] = {}
+        for line in lines:
+            room = _decode_room(json.loads(line), room_layout)
+            rooms[room.name] = room
+    except StopIteration:
+        raise ValueError("Kompakte Projektdatei ist unvollständig.") from None
+    except (*_DECODE_ERRORS, gzip.BadGzipFile) as exc:
+        raise ValueError(f"Ungültige kompakte Projektdatei: {exc}") from exc
+    if len(rooms) != header.get("rooms", len(rooms)):
+        raise ValueError("Kompakte Projektdatei ist unvollständig.")
+    return Project(metadata=metadata, global_topics=global_topics, rooms=rooms)
+
+
+def _lazy_head(fh: BinaryIO, size: int):
+    # Kopf, Metadaten und Global-Topics; None bei Dateien ohne Verzeichnis (Version 1).
+    lines = [fh.readline() for _ in range(3)]
+    if not lines[-1].endswith(b"\n"):
+        raise ValueError("Kompakte Projektdatei ist unvollständig.")
+    try:
+        header = json.loads(lines[0])
+        _check_header(header)
+        directory = header.get("directory")
+        if directory is None:
+            return None
+        global_layout, room_layout = _layouts(header)
+        metadata = ProjectMetadata(**json.loads(lines[1]))
+        global_topics = _decode_topics(global_layout, json.loads(lines[2]))
+    except _DECODE_ERRORS as exc:
+        raise ValueError(f"Ungültige kompakte Projektdatei: {exc}") from exc
+    body = sum(len(line) for line in lines)
+    if body + sum(length for *_, length in directory) != size:
+        raise ValueError("Kompakte Projektdatei ist unvollständig.")
+    floors = {name: floor for name, floor, _, _ in directory}
+    spans = {name: (body + offset, length) for name, _, offset, length in directory}
+    return metadata, global_topics, floors, room_layout, spans
+
+
+def _file_id(st: os.stat_result) -> Tuple[int, int, int]:
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def read_lazy(path: Path) -> Project:
+    # Nur Kopf, Metadaten und Global-Topics werden gelesen; ein Raum erst beim Zugriff, per seek auf seinen
+    # Offset aus dem Verzeichnis. Die Datei bleibt dazwischen nicht geöffnet (kein mmap), sonst ließe sie
+    # sich unter Windows beim Speichern nicht atomar ersetzen. Wurde sie ersetzt (Speichern, Kompaktierung),
+    # wird das Verzeichnis neu gelesen; nicht geladene Räume stehen dort unverändert, nur an anderer Stelle.
+    with path.open("rb") as fh:
+        st = os.fstat(fh.fileno())
+        head = _lazy_head(fh, st.st_size)
+        if head is None:
+            fh.seek(0)
+            return read_stream(fh)
+    metadata, global_topics, floors, room_layout, spans = head
+    current = {"id": _file_id(st), "layout": room_layout, "spans": spans}
+    lock = threading.Lock()
+
+    def read_rooms(names: List[str]) -> Dict[str, RoomData]:
+        with lock, path.open("rb") as fh:
+            st = os.fstat(fh.fileno())
+            if _file_id(st) != current["id"]:
+                head = _lazy_head(fh, st.st_size)
+                if head is None:
+                    raise ValueError(f"{path.name} hat kein Raumverzeichnis mehr.")
+                current.update(id=_file_id(st), layout=head[3], spans=head[4])
+            rooms: Dict[str, RoomData] = {}
+            for name in names:
+                span = current["spans"].get(name)
+                if span is None:
+                    raise ValueError(f"Raum '{name}' fehlt in {path.name}.")
+                fh.seek(span[0])
+                try:
+                    rooms[name] = _decode_room(json.loads(fh.read(span[1])), current["layout"])
+                except _DECODE_ERRORS as exc:
+                    raise ValueError(f"Raum '{name}' in kompakter Projektdatei ungültig: {exc}") from exc
+            return rooms
+
+    return Project(
+        metadata=metadata,
+        global_topics=global_topics,
+        rooms=LazyRoomMap(floors, lambda name: read_rooms([name])[name], read_rooms, str(path.resolve())),
+    )
+
+
+def load_project(path: Path, lazy: bool = True) -> Project:
+    # Unkomprimierte Dateien raumweise bei Bedarf, komprimierte als Strom (kein wahlfreier Zugriff).
+    if not path.exists():
+        raise FileNotFoundError(f"Projektdatei nicht gefunden: {path}")
+    if lazy and not is_compressed_path(path):
+        with path.open("rb") as fh:
+            compressed = fh.read(4).startswith((GZIP_MAGIC, ZSTD_MAGIC))
+        if not compressed:
+            return read_lazy(path)
+    with path.open("rb") as fh:
+        return read_stream(fh)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Projekte zwischen JSON und dem kompakten Format (.plan/.planz) umwandeln.")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("target", type=Path, help="Endung bestimmt das Zielformat (.json, .plan, .planz, .sqlite)")
+    args = parser.parse_args(argv)
+    from app.services.storage import load_project as load_any, write_project_file
+
+    write_project_file(load_any(args.source), args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.models.project import LazyRoomMap, Project, ProjectMetadata, RoomData, TopicState
+from app.services.journal import atomic_write_text
+
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+SCHEMA_VERSION = 1
+GLOBAL_SCOPE = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS rooms (name TEXT PRIMARY KEY, floor TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS topic_states (
+    room TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    selections TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    assignee TEXT NOT NULL,
+    PRIMARY KEY (room, topic)
+) WITHOUT ROWID;
+"""
+
+Row = Tuple[str, str, str]
+# Auswahlen werden mit dem ASCII-Unit-Separator verbunden; schneller als JSON pro Zeile.
+SEPARATOR = "\x1f"
+
+
+def is_sqlite_path(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _row(state: TopicState) -> Row:
+    return SEPARATOR.join(state.selections), state.notes, state.assignee
+
+
+def _state(selections: str, notes: str, assignee: str) -> TopicState:
+    return TopicState(selections=selections.split(SEPARATOR) if selections else [], notes=notes, assignee=assignee)
+
+
+def _load_room(path: Path, name: str, floor: str) -> RoomData:
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT topic, selections, notes, assignee FROM topic_states WHERE room = ?", (name,)
+        ).fetchall()
+    return RoomData(name=name, floor=floor, topics={topic: _state(*rest) for topic, *rest in rows})
+
+
+def _load_rooms(path: Path, floors: Dict[str, str], names: List[str]) -> Dict[str, RoomData]:
+    wanted = set(names)
+    rooms = {name: RoomData(name=name, floor=floors[name]) for name in names}
+    with closing(_connect(path)) as conn:
+        for room, topic, *rest in conn.execute(
+            "SELECT room, topic, selections, notes, assignee FROM topic_states WHERE room != ?", (GLOBAL_SCOPE,)
+        ):
+            if room in wanted:
+                rooms[room].topics[topic] = _state(*rest)
+    return rooms
+
+
+def load_project(path: Path, lazy: bool = True) -> Project:
+    if not path.exists():
+        raise FileNotFoundError(f"Projektdatei nicht gefunden: {path}")
+    try:
+        with closing(_connect(path)) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            floors = dict(conn.execute("SELECT name, floor FROM rooms ORDER BY position").fetchall())
+            global_rows = conn.execute(
+                "SELECT topic, selections, notes, assignee FROM topic_states WHERE room = ?", (GLOBAL_SCOPE,)
+            ).fetchall()
+    except sqlite3.DatabaseError as exc:
+        raise ValueError(f"Ungültige SQLite-Datei: {exc}") from exc
+    if "metadata" not in meta:
+        raise ValueError(f"Keine Projektdaten in {path}")
+
+    metadata = ProjectMetadata(**json.loads(meta["metadata"]))
+    global_topics = {topic: _state(*rest) for topic, *rest in global_rows}
+    if lazy:
+        rooms = LazyRoomMap(
+            floors,
+            lambda name: _load_room(path, name, floors[name]),
+            lambda names: _load_rooms(path, floors, names),
+            source=str(path.resolve()),
+        )
+    else:
+        rooms = _load_rooms(path, floors, list(floors))
+    return Project(metadata=metadata, global_topics=global_topics, rooms=rooms)
+
+
+def save_project(project: Project, path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    floors = project.room_floors()
+    # Nicht geladene Räume aus derselben Datei können nicht verändert worden sein und werden übersprungen.
+    loaded = {name: project.peek_room(name) for name in project.changed_rooms(path)}
+    wanted: Dict[Tuple[str, str], Row] = {(GLOBAL_SCOPE, k): _row(v) for k, v in project.global_topics.items()}
+    for name, room in loaded.items():
+        for key, state in room.topics.items():
+            wanted[(name, key)] = _row(state)
+
+    with closing(_connect(path)) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('metadata', ?)",
+            (json.dumps(asdict(project.metadata), ensure_ascii=False),),
+        )
+        stored_rooms = dict(conn.execute("SELECT name, floor FROM rooms").fetchall())
+        removed = [name for name in stored_rooms if name not in floors]
+        conn.executemany("DELETE FROM rooms WHERE name = ?", [(n,) for n in removed])
+        conn.executemany("DELETE FROM topic_states WHERE room = ?", [(n,) for n in removed])
+        conn.executemany(
+            "INSERT OR REPLACE INTO rooms (name, floor, position) VALUES (?, ?, ?)",
+            [(name, floor, pos) for pos, (name, floor) in enumerate(floors.items())],
+        )
+
+        scopes = [GLOBAL_SCOPE, *loaded.keys()]
+        existing: Dict[Tuple[str, str], Row] = {}
+        for i in range(0, len(scopes), 500):
+            chunk = scopes[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for room, topic, *rest in conn.execute(
+                f"SELECT room, topic, selections, notes, assignee FROM topic_states WHERE room IN ({marks})", chunk
+            ):
+                existing[(room, topic)] = tuple(rest)
+
+        changed = [(*key, *row) for key, row in wanted.items() if existing.get(key) != row]
+        stale = [key for key in existing if key not in wanted]
+        conn.executemany(
+            "INSERT OR REPLACE INTO topic_states (room, topic, selections, notes, assignee) VALUES (?, ?, ?, ?, ?)",
+            changed,
+        )
+        conn.executemany("DELETE FROM topic_states WHERE room = ? AND topic = ?", stale)
+    return len(changed) + len(stale)
+
+
+def import_json(json_path: Path, db_path: Path) -> Project:
+    try:
+        data = json.loads(json_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Ungültiges JSON: {exc}") from exc
+    project = Project.from_dict(data)
+    save_project(project, db_path)
+    return project
+
+
+def export_json(db_path: Path, json_path: Path) -> Project:
+    project = load_project(db_path, lazy=False)
+    atomic_write_text(json_path, json.dumps(project.to_dict(), indent=2, ensure_ascii=False))
+    return project
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Projekte zwischen JSON und SQLite umwandeln.")
+    parser.add_argument("direction", choices=["import", "export"], help="import: JSON -> SQLite, export: SQLite -> JSON")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("target", type=Path)
+    args = parser.parse_args(argv)
+    if args.direction == "import":
+        import_json(args.source, args.target)
+    else:
+        export_json(args.source, args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
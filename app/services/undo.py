@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+from app.models.project import TopicState
+
+# Rückgängig/Wiederholen über kompakte Befehle statt Projekt-Schnappschüssen: je Änderung nur Raum, Topic,
+# alte/neue Auswahl und für Texte ein Diff (Position, entfernt, eingefügt).
+# Obergrenze für alle Befehle zusammen; die ältesten fallen zuerst heraus.
+MAX_UNDO_BYTES = 512 * 1024
+# Textänderungen am selben Feld innerhalb dieses Abstands ergeben einen Befehl (Tipp-Folge).
+COALESCE_SECONDS = 1.5
+# Grobe Kosten eines Befehls ohne Texte (Objekt, Tupel, Verweise).
+COMMAND_OVERHEAD = 160
+
+# (Position, entfernter Text, eingefügter Text)
+TextDiff = Tuple[int, str, str]
+Selections = Tuple[str, ...]
+
+
+def text_diff(old: str, new: str) -> Optional[TextDiff]:
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    return start, old[start:len(old) - end], new[start:len(new) - end]
+
+
+def apply_diff(text: str, diff: TextDiff, reverse: bool = False) -> str:
+    pos, removed, inserted = diff
+    if reverse:
+        removed, inserted = inserted, removed
+    return text[:pos] + inserted + text[pos + len(removed):]
+
+
+def compose_diffs(first: TextDiff, second: TextDiff, between: str) -> Optional[TextDiff]:
+    # ``first`` führt T0 -> T1, ``second`` T1 -> T2; ``between`` ist T1. Betrachtet wird nur der Bereich
+    # von T1, den einer der beiden Diffs berührt – der Speicher bleibt proportional zur Änderung.
+    p1, _, i1 = first
+    p2, r2, _ = second
+    lo = min(p1, p2)
+    hi = max(p1 + len(i1), p2 + len(r2))
+    region = between[lo:hi]
+    before = apply_diff(region, (p1 - lo, *first[1:]), reverse=True)
+    after = apply_diff(region, (p2 - lo, *second[1:]))
+    diff = text_diff(before, after)
+    if diff is None:
+        return None
+    return lo + diff[0], diff[1], diff[2]
+
+
+def _text_size(diff: Optional[TextDiff]) -> int:
+    return 0 if diff is None else len(diff[1]) + len(diff[2])
+
+
+@dataclass(slots=True)
+class TopicEdit:
+    room: Optional[str]
+    key: str
+    selections: Optional[Tuple[Selections, Selections]]
+    notes: Optional[TextDiff]
+    assignee: Optional[TextDiff]
+    at: float
+
+    def text_only(self) -> bool:
+        return self.selections is None
+
+    def is_empty(self) -> bool:
+        return self.selections is None and self.notes is None and self.assignee is None
+
+    def size(self) -> int:
+        size = COMMAND_OVERHEAD + _text_size(self.notes) + _text_size(self.assignee)
+        if self.selections is not None:
+            size += sum(sys.getsizeof(v) for side in self.selections for v in side)
+        return size
+
+    def apply(self, state: TopicState, reverse: bool = False) -> TopicState:
+        # Liefert den Zustand nach (reverse=False) bzw. vor (reverse=True) dieser Änderung.
+        selections = list(state.selections)
+        if self.selections is not None:
+            selections = list(self.selections[0] if reverse else self.selections[1])
+        notes = apply_diff(state.notes, self.notes, reverse) if self.notes is not None else state.notes
+        assignee = apply_diff(state.assignee, self.assignee, reverse) if self.assignee is not None else state.assignee
+        return TopicState(selections=selections, notes=notes, assignee=assignee)
+
+
+class UndoLog:
+    def __init__(self, max_bytes: int = MAX_UNDO_BYTES, coalesce_seconds: float = COALESCE_SECONDS):
+        self.max_bytes = max_bytes
+        self.coalesce_seconds = coalesce_seconds
+        self._undo: Deque[TopicEdit] = deque()
+        self._redo: List[TopicEdit] = []
+        self._bytes = 0
+        # Anzahl wegen der Obergrenze verworfener Befehle.
+        self.dropped = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    def record(
+        self,
+        room: Optional[str],
+        key: str,
+        old: TopicState,
+        new: TopicState,
+        now: Optional[float] = None,
+    ) -> Optional[TopicEdit]:
+        now = time.monotonic() if now is None else now
+        selections = None
+        if old.selections != new.selections:
+            selections = (tuple(old.selections), tuple(new.selections))
+        edit = TopicEdit(room, key, selections, text_diff(old.notes, new.notes), text_diff(old.assignee, new.assignee), now)
+        if edit.is_empty():
+            return None
+        for undone in self._redo:
+            self._bytes -= undone.size()
+        self._redo.clear()
+
+        top = self._undo[-1] if self._undo else None
+        if (
+            top is not None
+            and top.room == room
+            and top.key == key
+            and top.text_only()
+            and edit.text_only()
+            and now - top.at <= self.coalesce_seconds
+        ):
+            self._bytes -= top.size()
+            top.notes = self._merge(top.notes, edit.notes, old.notes)
+            top.assignee = self._merge(top.assignee, edit.assignee, old.assignee)
+            top.at = now
+            if top.is_empty():
+                # Getippt und wieder gelöscht: nichts mehr rückgängig zu machen.
+                self._undo.pop()
+                return None
+            self._bytes += top.size()
+            edit = top
+        else:
+            self._undo.append(edit)
+            self._bytes += edit.size()
+        self._trim()
+        return edit
+
+    @staticmethod
+    def _merge(first: Optional[TextDiff], second: Optional[TextDiff], between: str) -> Optional[TextDiff]:
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return compose_diffs(first, second, between)
+
+    def _trim(self) -> None:
+        while self._bytes > self.max_bytes and self._undo:
+            self._bytes -= self._undo.popleft().size()
+            self.dropped += 1
+
+    def undo(self) -> Optional[TopicEdit]:
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        if self._undo:
+            # Nach einem Rückgängig beginnt die nächste Eingabe einen neuen Befehl.
+            self._undo[-1].at = float("-inf")
+        return edit
+
+    def redo(self) -> Optional[TopicEdit]:
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        # Wiederholte Befehle nicht mit der nächsten Eingabe verschmelzen.
+        edit.at = float("-inf")
+        self._undo.append(edit)
+        return edit
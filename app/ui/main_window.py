@@ -1,31 +1,92 @@
 from __future__ import annotations
 
+import os
+from collections import OrderedDict
+from dataclasses import replace
 from pathlib import Path
+from typing import Callable
 
+from PySide6.QtCore import QThreadPool, QTimer, Signal
+from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QFileDialog,
     QHBoxLayout,
     QListWidget,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QStackedWidget,
     QVBoxLayout,
     QWidget,
 )
 
-from app.models.definitions import FLOORS, GLOBAL_TOPICS, ROOM_TOPICS
-from app.models.project import Project, create_empty_project
-from app.services.export_excel import export_project_to_excel
-from app.services.export_pdf import export_project_to_pdf
-from app.services.storage import PROJECTS_DIR, list_projects, load_project, save_project
+from app.models.compact import ProjectSnapshot
+from app.models.definitions import GLOBAL_TOPICS, ROOM_TOPICS
+from app.models.project import Project, RoomData, create_empty_project
+from app.services.evaluation_engine import EvaluationEngine
+from app.services import history, journal
+from app.services.instrumentation import timed
+from app.services.undo import UndoLog
+from app.services.storage import (
+    PROJECTS_DIR,
+    has_recovery,
+    list_projects,
+    load_project,
+    save_changes,
+    save_project,
+    unsaved_path,
+)
 from app.services.validation import validate_required_fields
+from app.ui.pages.diagnostics_page import DiagnosticsPage
 from app.ui.pages.evaluation_page import EvaluationPage
 from app.ui.pages.start_page import StartPage
 from app.ui.pages.topic_page import TopicPage
+from app.ui.workers import BackgroundTask
+
+
+def _saved_rooms(path: Path) -> Callable[[str], RoomData]:
+    # Loader für Räume, die ein Teil-Schnappschuss nicht kopiert: ihr gespeicherter Stand (Datei + Journal)
+    # ist der aktuelle. Die Datei wird erst gelesen, wenn ein Raum gebraucht wird, und nur einmal.
+    saved: list[Project] = []
+
+    def load(name: str) -> RoomData:
+        if not saved:
+            saved.append(load_project(path))
+        return saved[0].rooms[name]
+
+    return load
+
+
+def _export_excel(project: Project, target: Path, progress) -> None:
+    # Exporter (openpyxl/reportlab) erst beim ersten Export laden, im Hintergrund-Thread statt beim Start.
+    from app.services.export_excel import export_project_to_excel
+
+    export_project_to_excel(project, target, streaming=True, progress=progress)
+
+
+def _export_pdf(project: Project, target: Path, progress, source: Path | None = None) -> None:
+    from app.services.export_pdf import export_project_to_pdf
+
+    # Änderungsprotokoll zwischen den letzten beiden gespeicherten Versionen der Projektdatei.
+    changes = None
+    versions = history.list_versions(source) if source is not None else []
+    if len(versions) >= 2:
+        changes = history.diff(source, versions[-2]["id"], versions[-1]["id"])
+    export_project_to_pdf(project, target, workers=os.cpu_count() or 1, progress=progress, changes=changes)
 
 
 class MainWindow(QMainWindow):
+    # Erster Paint des Fensters bzw. Ende des verzögerten Aufbaus (für die Startzeitmessung).
+    painted = Signal()
+    ready = Signal()
+    # Anzahl Raumseiten, die nach dem letzten Besuch im Speicher bleiben (LRU).
+    MAX_ROOM_PAGES = 6
+    # Ruhezeit nach der letzten Änderung, bevor die automatische Sicherung schreibt (0 = aus).
+    AUTOSAVE_DELAY_MS = 2000
+    # Ruhezeit, nach der eine Eingabefolge als Rückgängig-Befehl erfasst wird.
+    UNDO_FLUSH_MS = 400
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Smarthome Planungsmappe")
@@ -41,6 +102,8 @@ class MainWindow(QMainWindow):
         self.btn_new = QPushButton("Neues Projekt")
         self.btn_save = QPushButton("Speichern")
         self.btn_save_as = QPushButton("Speichern unter")
+        self.btn_undo = QPushButton("Rückgängig")
+        self.btn_redo = QPushButton("Wiederholen")
         self.btn_export_xlsx = QPushButton("Export Excel")
         self.btn_export_pdf = QPushButton("Export PDF")
         self.btn_status = QPushButton("Status: Entwurf")
@@ -49,6 +112,8 @@ class MainWindow(QMainWindow):
         nav_layout.addWidget(self.btn_new)
         nav_layout.addWidget(self.btn_save)
         nav_layout.addWidget(self.btn_save_as)
+        nav_layout.addWidget(self.btn_undo)
+        nav_layout.addWidget(self.btn_redo)
         nav_layout.addWidget(self.btn_export_xlsx)
         nav_layout.addWidget(self.btn_export_pdf)
         nav_layout.addWidget(self.btn_status)
@@ -61,88 +126,374 @@ class MainWindow(QMainWindow):
 
         self.start_page = StartPage()
         self.start_page.load_requested.connect(self._load_from_start)
-        self.eval_page = EvaluationPage()
+        self.start_page.room_requested.connect(self._open_search_hit)
+        self.stack.addWidget(self.start_page)
+        # Global-, Auswertungs- und Diagnoseseite entstehen erst nach dem ersten Paint (_finish_startup).
+        self.global_page: TopicPage | None = None
+        self.eval_page: EvaluationPage | None = None
+        self.diagnostics_page: DiagnosticsPage | None = None
+        self._started = False
+        self._startup_scheduled = False
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self._toggle_diagnostics)
+        QShortcut(QKeySequence.Undo, self, activated=self._undo)
+        QShortcut(QKeySequence.Redo, self, activated=self._redo)
+
+        self.room_pages: OrderedDict[str, TopicPage] = OrderedDict()
+        self.engine: EvaluationEngine | None = None
+        # (Raum oder None für Global, Topic-Key) seit dem letzten Speichern geändert.
+        self._dirty_topics: set[tuple[str | None, str]] = set()
+
+        # Export und Speichern laufen im Thread-Pool auf Schnappschüssen; hier nur Status und Abbruch.
+        self.pool = QThreadPool(self)
+        self.tasks: list[BackgroundTask] = []
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(240)
+        self.btn_cancel = QPushButton("Abbrechen")
+        self.btn_cancel.clicked.connect(self._cancel_tasks)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.btn_cancel)
+        self.progress_bar.hide()
+        self.btn_cancel.hide()
+
+        # Automatische Sicherung: Änderungsschübe sammeln, dann nur diese Topics ins Wiederherstellungsjournal.
+        self._autosave_topics: set[tuple[str | None, str]] = set()
+        self._autosave_metadata = False
+        self._autosave_task: BackgroundTask | None = None
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.timeout.connect(self._autosave)
 
-        self.room_pages: dict[str, TopicPage] = {}
+        # Rückgängig: Änderungen einer Zeile werden erst nach einer Eingabepause als Befehl erfasst.
+        self.undo_log = UndoLog()
+        self._pending_edit: tuple[str | None, str] | None = None
+        self._edit_timer = QTimer(self)
+        self._edit_timer.setSingleShot(True)
+        self._edit_timer.setInterval(self.UNDO_FLUSH_MS)
+        self._edit_timer.timeout.connect(self._flush_edit)
 
         self._build_navigation()
-        self._build_pages()
         self._bind_events()
+        self._update_undo_buttons()
+
+    def paintEvent(self, event) -> None:
+        super().paintEvent(event)
+        if not self._started and not self._startup_scheduled:
+            # Restlicher Aufbau erst, wenn das Fenster einmal gezeichnet ist, und dann in der Leerlaufzeit.
+            self._startup_scheduled = True
+            self.painted.emit()
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        self._build_pages()
         self.refresh_start()
+        self.ready.emit()
+        QTimer.singleShot(0, self._offer_unsaved_recovery)
+
+    def _offer_unsaved_recovery(self) -> None:
+        # Sicherung eines nie gespeicherten Projekts aus einer abgebrochenen Sitzung.
+        target = unsaved_path()
+        if self.current_path is not None or not has_recovery(target):
+            return
+        answer = QMessageBox.question(
+            self,
+            "Wiederherstellung",
+            "Es gibt nicht gespeicherte Änderungen an einem neuen Projekt aus der automatischen Sicherung.\n"
+            "Sollen sie wiederhergestellt werden?",
+        )
+        if answer != QMessageBox.Yes:
+            journal.discard_recovery(target, include_current=True)
+            return
+        recovered = journal.recovery_topics(target)
+        project = create_empty_project("Projekt Neu")
+        journal.replay_recovery(project, target)
+        self.current_project = project
+        self._rebuild_for_project()
+        self._dirty_topics |= recovered
 
     def _build_navigation(self) -> None:
         self.nav.clear()
         self.nav.addItem("Start")
         self.nav.addItem("Global")
         self.nav.addItem("Auswertung")
-        for floor, rooms in FLOORS.items():
+        floors: dict[str, list[str]] = {}
+        for room_name, floor in self.current_project.room_floors().items():
+            floors.setdefault(floor, []).append(room_name)
+        for floor, rooms in floors.items():
             self.nav.addItem(f"-- {floor} --")
             for room in rooms:
                 self.nav.addItem(room)
         self.nav.setCurrentRow(0)
 
+    @timed("ui.build_pages")
     def _build_pages(self) -> None:
-        self.stack.addWidget(self.start_page)
         self.global_page = TopicPage("Global_Planung", GLOBAL_TOPICS, self.current_project.global_topics)
         self.global_page.changed.connect(self._on_project_changed)
+        self.global_page.topic_changed.connect(lambda key: self._mark_dirty(None, key))
         self.stack.addWidget(self.global_page)
+        self.eval_page = EvaluationPage()
         self.stack.addWidget(self.eval_page)
-        for room_name in self.current_project.rooms.keys():
-            page = TopicPage(room_name, ROOM_TOPICS, self.current_project.rooms[room_name].topics)
-            page.changed.connect(self._on_project_changed)
-            self.room_pages[room_name] = page
-            self.stack.addWidget(page)
-        self.eval_page.refresh(self.current_project)
+        # Nicht in der Navigation: nur über Strg+Umschalt+D erreichbar.
+        self.diagnostics_page = DiagnosticsPage()
+        self.stack.addWidget(self.diagnostics_page)
+
+    def _toggle_diagnostics(self) -> None:
+        self._finish_startup()
+        if self.stack.currentWidget() is self.diagnostics_page:
+            self._navigate(self.nav.currentRow())
+        else:
+            self.stack.setCurrentWidget(self.diagnostics_page)
+
+    def _room_page(self, room_name: str) -> TopicPage:
+        # Raumseiten entstehen erst beim ersten Besuch; selten besuchte werden wieder freigegeben.
+        page = self.room_pages.get(room_name)
+        if page is not None:
+            self.room_pages.move_to_end(room_name)
+            return page
+        page = TopicPage(room_name, ROOM_TOPICS, self.current_project.rooms[room_name].topics)
+        page.changed.connect(self._on_project_changed)
+        page.topic_changed.connect(lambda key, room=room_name: self._mark_dirty(room, key))
+        self.room_pages[room_name] = page
+        self.stack.addWidget(page)
+        while len(self.room_pages) > self.MAX_ROOM_PAGES:
+            oldest = next(iter(self.room_pages))
+            self._release_room_page(oldest)
+        return page
+
+    def _release_room_page(self, room_name: str) -> None:
+        if self._pending_edit is not None and self._pending_edit[0] == room_name:
+            self._flush_edit()
+        page = self.room_pages.pop(room_name)
+        page.persist()
+        self.stack.removeWidget(page)
+        page.deleteLater()
+
+    def _evaluation_engine(self) -> EvaluationEngine:
+        if self.engine is None:
+            self.engine = EvaluationEngine(self.current_project)
+        return self.engine
+
+    def _mark_dirty(self, room_name: str | None, key: str, record: bool = True) -> None:
+        self._dirty_topics.add((room_name, key))
+        self._autosave_topics.add((room_name, key))
+        self._schedule_autosave()
+        if record:
+            self._track_edit(room_name, key)
+
+    def _page_for(self, room_name: str | None) -> TopicPage | None:
+        return self.global_page if room_name is None else self.room_pages.get(room_name)
+
+    def _track_edit(self, room_name: str | None, key: str) -> None:
+        # Wechsel auf eine andere Zeile schließt die laufende Eingabefolge sofort ab.
+        if self._pending_edit is not None and self._pending_edit != (room_name, key):
+            self._flush_edit()
+        self._pending_edit = (room_name, key)
+        self._edit_timer.start()
+
+    def _flush_edit(self) -> None:
+        self._edit_timer.stop()
+        pending, self._pending_edit = self._pending_edit, None
+        if pending is None:
+            return
+        page = self._page_for(pending[0])
+        change = page.take_change(pending[1]) if page is not None else None
+        if change is not None:
+            self.undo_log.record(pending[0], pending[1], *change)
+            self._update_engine(pending[0], pending[1])
+        self._update_undo_buttons()
+
+    def _update_engine(self, room_name: str | None, key: str) -> None:
+        # Einmal pro Eingabefolge statt pro Tastendruck: Zeile auslesen und die Auswertung nachführen.
+        if room_name is None or self.engine is None:
+            return
+        page = self.room_pages.get(room_name)
+        if page is not None:
+            page.persist_topic(key)
+        self.engine.update_topic(room_name, key)
+        self.eval_page.topic_changed(room_name, key)
+
+    def _update_undo_buttons(self) -> None:
+        self.btn_undo.setEnabled(self.undo_log.can_undo() or self._pending_edit is not None)
+        self.btn_redo.setEnabled(self.undo_log.can_redo() and self._pending_edit is None)
+
+    def _reset_undo(self) -> None:
+        self._edit_timer.stop()
+        self._pending_edit = None
+        self.undo_log.clear()
+        self._update_undo_buttons()
+
+    def _undo(self) -> None:
+        self._flush_edit()
+        self._apply_edit(self.undo_log.undo(), reverse=True)
+
+    def _redo(self) -> None:
+        self._flush_edit()
+        self._apply_edit(self.undo_log.redo(), reverse=False)
+
+    def _apply_edit(self, edit, reverse: bool) -> None:
+        # Nur die betroffene Zeile und die Auswertungs-Aggregate aktualisieren, keine Seiten neu aufbauen.
+        if edit is None:
+            return
+        room_name, key = edit.room, edit.key
+        if room_name is None:
+            topics = self.current_project.global_topics
+        elif room_name in self.current_project.rooms:
+            topics = self.current_project.rooms[room_name].topics
+        else:
+            return
+        page = self._page_for(room_name)
+        if page is not None:
+            page.persist_topic(key)
+        state = edit.apply(topics[key], reverse)
+        topics[key] = state
+        if page is not None:
+            page.set_topic_state(key, state)
+        self.current_project.touch()
+        self._mark_dirty(room_name, key, record=False)
+        if room_name is not None and self.engine is not None:
+            self.engine.update_topic(room_name, key)
+            if self.eval_page is not None:
+                self.eval_page.topic_changed(room_name, key)
+        definitions = GLOBAL_TOPICS if room_name is None else ROOM_TOPICS
+        title = next((t.title for t in definitions if t.key == key), key)
+        action = "Rückgängig" if reverse else "Wiederholt"
+        self.statusBar().showMessage(f"{action}: {room_name or 'Global'} / {title}", 3000)
+        self._update_undo_buttons()
+
+    def _recovery_target(self) -> Path:
+        # Nie gespeicherte Projekte sichern in eine feste Datei im Datenordner.
+        return self.current_path or unsaved_path()
+
+    def _schedule_autosave(self) -> None:
+        # Jede Änderung startet das Zeitfenster neu; geschrieben wird erst nach einer Tipp-Pause.
+        if self.AUTOSAVE_DELAY_MS > 0:
+            self._autosave_timer.start(self.AUTOSAVE_DELAY_MS)
+
+    def _autosave(self) -> None:
+        if not (self._autosave_topics or self._autosave_metadata):
+            return
+        self._persist_all_pages()
+        if self._autosave_task is not None:
+            # Sicherungen nacheinander schreiben, damit die Reihenfolge im Journal stimmt.
+            self._schedule_autosave()
+            return
+        path = self._recovery_target()
+        topics = self._autosave_topics
+        self._autosave_topics = set()
+        self._autosave_metadata = False
+        changes = self._topic_changes(topics)
+        metadata = replace(self.current_project.metadata)
+        task = BackgroundTask("Automatische Sicherung", lambda progress: journal.append_recovery(path, changes, metadata), cancellable=False)
+
+        def ended() -> None:
+            if self._autosave_task is task:
+                self._autosave_task = None
+
+        def failed(error: str) -> None:
+            if self._recovery_target() == path:
+                self._autosave_topics |= topics
+            self.statusBar().showMessage(f"Automatische Sicherung fehlgeschlagen: {error}", 5000)
+            ended()
+
+        task.signals.finished.connect(lambda _: ended())
+        task.signals.failed.connect(failed)
+        self._autosave_task = task
+        self.pool.start(task)
+
+    def _stop_autosave(self) -> None:
+        self._autosave_timer.stop()
+        self._autosave_topics.clear()
+        self._autosave_metadata = False
+
+    def _finish_autosave(self) -> None:
+        # Eine noch wartende Sicherung aus dem Pool nehmen, eine laufende abwarten. Sonst landen ihre
+        # Einträge nach dem Beiseitelegen im neuen Journal und überleben das Speichern.
+        task = self._autosave_task
+        if task is None:
+            return
+        if not self.pool.tryTake(task):
+            task.wait()
+        self._autosave_task = None
 
     def _bind_events(self) -> None:
         self.nav.currentRowChanged.connect(self._navigate)
         self.btn_new.clicked.connect(self._new_project)
         self.btn_save.clicked.connect(self._save_project)
         self.btn_save_as.clicked.connect(self._save_project_as)
+        self.btn_undo.clicked.connect(self._undo)
+        self.btn_redo.clicked.connect(self._redo)
         self.btn_export_xlsx.clicked.connect(self._export_excel)
         self.btn_export_pdf.clicked.connect(self._export_pdf)
         self.btn_status.clicked.connect(self._cycle_status)
 
     def _navigate(self, row: int) -> None:
-        text = self.nav.item(row).text()
+        item = self.nav.item(row)
+        if item is None:
+            return
+        text = item.text()
         if text.startswith("--"):
             return
         if text == "Start":
             self.stack.setCurrentWidget(self.start_page)
             return
+        self._finish_startup()
         if text == "Global":
             self.stack.setCurrentWidget(self.global_page)
             return
         if text == "Auswertung":
+            # Die laufende Eingabefolge abschließen; ältere sind bei bestehender Engine bereits übernommen.
+            self._flush_edit()
             self._persist_all_pages()
-            self.eval_page.refresh(self.current_project)
+            self.eval_page.refresh(self.current_project, self._evaluation_engine())
             self.stack.setCurrentWidget(self.eval_page)
             return
-        page = self.room_pages.get(text)
-        if page:
-            self.stack.setCurrentWidget(page)
+        if text in self.current_project.rooms:
+            self.stack.setCurrentWidget(self._room_page(text))
 
     def _new_project(self) -> None:
+        self._discard_unsaved_recovery()
         self.current_project = create_empty_project("Projekt Neu")
         self.current_path = None
         self._rebuild_for_project()
 
+    def _discard_unsaved_recovery(self) -> None:
+        # Das bisherige, nie gespeicherte Projekt wird verworfen und mit ihm seine Sicherung.
+        if self.current_path is None:
+            self._stop_autosave()
+            self._finish_autosave()
+            journal.discard_recovery(unsaved_path(), include_current=True)
+
+    @timed("ui.rebuild_for_project")
     def _rebuild_for_project(self) -> None:
-        while self.stack.count() > 0:
-            widget = self.stack.widget(0)
-            self.stack.removeWidget(widget)
-            widget.deleteLater()
+        # Start- und Auswertungsseite bleiben bestehen, nur projektbezogene Seiten werden ersetzt.
+        self._finish_startup()
+        # Befehle beziehen sich auf das bisherige Projekt.
+        self._reset_undo()
+        for page in self.room_pages.values():
+            self.stack.removeWidget(page)
+            page.deleteLater()
         self.room_pages.clear()
-        self.start_page = StartPage()
-        self.start_page.load_requested.connect(self._load_from_start)
-        self.eval_page = EvaluationPage()
-        self._build_pages()
+        self.stack.removeWidget(self.global_page)
+        self.global_page.deleteLater()
+        self.global_page = TopicPage("Global_Planung", GLOBAL_TOPICS, self.current_project.global_topics)
+        self.global_page.changed.connect(self._on_project_changed)
+        self.global_page.topic_changed.connect(lambda key: self._mark_dirty(None, key))
+        self.stack.insertWidget(1, self.global_page)
+        self.engine = None
+        self._dirty_topics.clear()
+        self._stop_autosave()
+        self._build_navigation()
+        self.stack.setCurrentWidget(self.start_page)
         self.refresh_start()
 
+    @timed("ui.persist_all_pages")
     def _persist_all_pages(self) -> None:
-        self.global_page.persist()
-        for page in self.room_pages.values():
-            page.persist()
+        # Nur Seiten mit geänderten Zeilen; unberührte Seiten kosten nichts.
+        for page in (self.global_page, *self.room_pages.values()):
+            if page is not None and page.dirty:
+                page.persist()
 
     def _on_project_changed(self) -> None:
         # Kein Full-Reload: Änderungen bleiben lokal auf der aktiven Seite.
@@ -153,26 +504,202 @@ class MainWindow(QMainWindow):
         if self.current_path is None:
             self._save_project_as()
             return
-        save_project(self.current_project, self.current_path)
-        self.refresh_start()
+        path = self.current_path
+        pending = set(self._dirty_topics)
+        changes = self._changed_topics()
+        if path.exists():
+            # Nur die Räume der geänderten Topics kopieren; alle übrigen stehen so in der Datei.
+            rooms = {room for room, _, _ in changes if room is not None}
+            snapshot = ProjectSnapshot(self.current_project, rooms, _saved_rooms(path), str(path.resolve()))
+        else:
+            snapshot = ProjectSnapshot(self.current_project)
+
+        def run(progress) -> Project:
+            project = snapshot.to_project()
+            if path.exists():
+                # Nur geänderte Topics ins Journal; die Haupt-JSON wird im Hintergrund kompaktiert.
+                save_changes(project, path, changes)
+            else:
+                save_project(project, path)
+            return project
+
+        self._start_save(f"Speichern: {path.name}", run, pending, path)
+
+    def _changed_topics(self) -> list:
+        return self._topic_changes(self._dirty_topics)
+
+    def _topic_changes(self, topics: set) -> list:
+        changes = []
+        for room_name, key in topics:
+            if room_name is None:
+                state = self.current_project.global_topics[key]
+            elif room_name in self.current_project.rooms:
+                state = self.current_project.rooms[room_name].topics[key]
+            else:
+                continue
+            # Kopie, weil die Oberfläche den Zustand während des Speicherns weiter ändern kann.
+            changes.append((room_name, key, replace(state, selections=list(state.selections))))
+        return changes
 
     def _save_project_as(self) -> None:
         self._persist_all_pages()
-        target, _ = QFileDialog.getSaveFileName(self, "Projekt speichern", str(PROJECTS_DIR / "projekt.json"), "JSON (*.json)")
+        target, _ = QFileDialog.getSaveFileName(self, "Projekt speichern", str(PROJECTS_DIR / "projekt.json"), "JSON (*.json);;Kompakt (*.plan);;Kompakt, komprimiert (*.planz);;SQLite (*.sqlite)")
         if not target:
             return
-        self.current_path = Path(target)
-        save_project(self.current_project, self.current_path)
-        self.refresh_start()
+        path = Path(target)
+        pending = set(self._dirty_topics)
+        # Geladene Räume kopieren, nicht geladene liest der Task aus der bisherigen Quelle.
+        snapshot = ProjectSnapshot(self.current_project)
+
+        def run(progress) -> Project:
+            project = snapshot.to_project()
+            save_project(project, path)
+            return project
+
+        self._start_save(f"Speichern: {path.name}", run, pending, path)
+
+    def _start_save(self, label: str, run: Callable, pending: set, path: Path) -> None:
+        # Änderungen ab jetzt gelten als neu; schlägt das Speichern fehl, werden sie wieder vorgemerkt.
+        self._dirty_topics.difference_update(pending)
+        # Der Schnappschuss enthält alles Bisherige: offene Sicherung verwerfen, das Journal beiseitelegen.
+        self._stop_autosave()
+        self._finish_autosave()
+        journal.rotate_recovery(path)
+        self.btn_save.setEnabled(False)
+        self.btn_save_as.setEnabled(False)
+        project = self.current_project
+
+        def done(saved: Project) -> None:
+            if self.current_project is project:
+                self.current_project.metadata.updated_at = saved.metadata.updated_at
+                if self.current_path != path:
+                    # Erst nach erfolgreichem "Speichern unter" gehört das Projekt zur neuen Datei. Die
+                    # Sicherung der alten Datei ist damit erledigt; spätere Änderungen sichern in die neue.
+                    journal.discard_recovery(self._recovery_target(), include_current=True)
+                    self.current_path = path
+                    self._autosave_topics |= self._dirty_topics
+                    self._schedule_autosave()
+            self.refresh_start()
+
+        def ended() -> None:
+            self.btn_save.setEnabled(True)
+            self.btn_save_as.setEnabled(True)
+
+        def failed() -> None:
+            if self.current_project is project:
+                self._dirty_topics |= pending
+
+        # Speichern ist nicht abbrechbar: eine halb geschriebene Projektdatei darf es nicht geben.
+        self._start_task(BackgroundTask(label, run, cancellable=False), done, ended, failed)
+
+    def _start_task(
+        self,
+        task: BackgroundTask,
+        on_done: Callable[[object], None] | None = None,
+        on_end: Callable[[], None] | None = None,
+        on_failed: Callable[[], None] | None = None,
+    ) -> None:
+        def finish(message: str) -> None:
+            self.tasks.remove(task)
+            if on_end:
+                on_end()
+            self.statusBar().showMessage(message, 5000)
+            self._update_task_status()
+
+        def succeeded(result: object) -> None:
+            if on_done:
+                on_done(result)
+            finish(f"{task.label} – fertig")
+
+        def failed(error: str) -> None:
+            if on_failed:
+                on_failed()
+            finish(f"{task.label} – fehlgeschlagen")
+            QMessageBox.critical(self, "Fehler", f"{task.label}\n{error}")
+
+        def cancelled() -> None:
+            if on_failed:
+                on_failed()
+            finish(f"{task.label} – abgebrochen")
+
+        task.signals.progress.connect(lambda done, total, label: self._on_task_progress(task, done, total, label))
+        task.signals.finished.connect(succeeded)
+        task.signals.failed.connect(failed)
+        task.signals.cancelled.connect(cancelled)
+        self.tasks.append(task)
+        self._update_task_status()
+        self.pool.start(task)
+
+    def _on_task_progress(self, task: BackgroundTask, done: int, total: int, label: str) -> None:
+        if task not in self.tasks:
+            return
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        self.statusBar().showMessage(f"{task.label}: {label} ({done}/{total})")
+
+    def _update_task_status(self) -> None:
+        busy = bool(self.tasks)
+        self.progress_bar.setVisible(busy)
+        self.btn_cancel.setVisible(any(t.cancellable for t in self.tasks))
+        if busy:
+            self.progress_bar.setRange(0, 0)
+            self.statusBar().showMessage(", ".join(t.label for t in self.tasks))
+
+    def _cancel_tasks(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+    def closeEvent(self, event) -> None:
+        # Exporte abbrechen, laufende Speichervorgänge und die letzte Sicherung noch abschließen.
+        self._cancel_tasks()
+        self._autosave_timer.stop()
+        self.pool.waitForDone()
+        self._autosave()
+        self.pool.waitForDone()
+        super().closeEvent(event)
 
     def _load_from_start(self, path: str) -> None:
+        target = Path(path)
+        recover = False
+        if has_recovery(target):
+            answer = QMessageBox.question(
+                self,
+                "Wiederherstellung",
+                "Für dieses Projekt gibt es nicht gespeicherte Änderungen aus der automatischen Sicherung.\n"
+                "Sollen sie wiederhergestellt werden?",
+            )
+            recover = answer == QMessageBox.Yes
+        recovered = journal.recovery_topics(target) if recover else set()
         try:
-            self.current_project = load_project(Path(path))
+            project = load_project(target, recover=recover)
         except (FileNotFoundError, ValueError) as exc:
             QMessageBox.critical(self, "Fehler", str(exc))
             return
-        self.current_path = Path(path)
+        if has_recovery(target) and not recover:
+            journal.discard_recovery(target, include_current=True)
+        self._discard_unsaved_recovery()
+        self.current_project = project
+        self.current_path = target
         self._rebuild_for_project()
+        # Wiederhergestellte Topics sind noch nicht gespeichert.
+        self._dirty_topics |= recovered
+
+    def _open_search_hit(self, path: str, room: str) -> None:
+        # Suchtreffer: Projekt bei Bedarf laden, dann direkt zur Raumseite bzw. Global-Planung springen.
+        if self.current_path != Path(path):
+            self._load_from_start(path)
+            if self.current_path != Path(path):
+                return
+        label = room or "Global"
+        if room and room not in self.current_project.rooms:
+            return
+        for row in range(self.nav.count()):
+            if self.nav.item(row).text() == label:
+                if self.nav.currentRow() == row:
+                    self._navigate(row)
+                else:
+                    self.nav.setCurrentRow(row)
+                return
 
     def refresh_start(self) -> None:
         self.start_page.set_projects(list_projects())
@@ -185,23 +712,33 @@ class MainWindow(QMainWindow):
         idx = order.index(cur) if cur in order else 0
         self.current_project.metadata.status = order[(idx + 1) % len(order)]
         self.btn_status.setText(f"Status: {self.current_project.metadata.status}")
+        self._autosave_metadata = True
+        self._schedule_autosave()
 
-    def _export_excel(self) -> None:
-        self._persist_all_pages()
+    def _required_fields_ok(self) -> bool:
+        # Vor der Dateiauswahl prüfen; liest nicht geladene Räume, ohne sie im Projekt zu halten.
         errors = validate_required_fields(self.current_project)
         if errors:
             QMessageBox.warning(self, "Pflichtfelder fehlen", "\n".join(errors[:20]))
+            return False
+        return True
+
+    def _export_excel(self) -> None:
+        self._persist_all_pages()
+        if not self._required_fields_ok():
             return
         target, _ = QFileDialog.getSaveFileName(self, "Excel exportieren", "export.xlsx", "Excel (*.xlsx)")
         if not target:
             return
-        export_project_to_excel(self.current_project, Path(target))
+        snapshot = ProjectSnapshot(self.current_project)
+        self._start_task(BackgroundTask(
+            f"Excel-Export: {Path(target).name}",
+            lambda progress: _export_excel(snapshot.to_project(), Path(target), progress),
+        ))
 
     def _export_pdf(self) -> None:
         self._persist_all_pages()
-        errors = validate_required_fields(self.current_project)
-        if errors:
-            QMessageBox.warning(self, "Pflichtfelder fehlen", "\n".join(errors[:20]))
+        if not self._required_fields_ok():
             return
         if self.current_project.metadata.status != "Freigegeben":
             QMessageBox.warning(self, "Status", "PDF Export nur im Status 'Freigegeben'.")
@@ -209,4 +746,9 @@ class MainWindow(QMainWindow):
         target, _ = QFileDialog.getSaveFileName(self, "PDF exportieren", "report.pdf", "PDF (*.pdf)")
         if not target:
             return
-        export_project_to_pdf(self.current_project, Path(target))
+        snapshot = ProjectSnapshot(self.current_project)
+        source = self.current_path
+        self._start_task(BackgroundTask(
+            f"PDF-Export: {Path(target).name}",
+            lambda progress: _export_pdf(snapshot.to_project(), Path(target), progress, source),
+        ))
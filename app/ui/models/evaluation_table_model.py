@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PySide6.QtGui import QColor
+
+from app.models.definitions import ROOM_TOPICS
+from app.models.project import Project
+from app.services.evaluation_engine import EvaluationEngine
+
+AMPEL_COLORS = {"grün": QColor("#16a34a"), "gelb": QColor("#ca8a04"), "rot": QColor("#dc2626")}
+
+SECTION_ROLE = Qt.UserRole + 1
+DOMAINS_ROLE = Qt.UserRole + 2
+AMPEL_ROLE = Qt.UserRole + 3
+
+
+class EvaluationTableModel(QAbstractTableModel):
+    # Zeilen = Raum-Topics, Spalte 0 = Topic, danach je Raum eine Spalte. Gelesen wird direkt aus dem Projekt.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project: Project | None = None
+        self.engine: EvaluationEngine | None = None
+        self.rooms: List[str] = []
+        self._room_cols: Dict[str, int] = {}
+        self._topic_rows = {t.key: row for row, t in enumerate(ROOM_TOPICS)}
+        self._ampel: Dict[str, str] = {}
+
+    def set_project(self, project: Project, engine: EvaluationEngine) -> None:
+        self.beginResetModel()
+        self.project = project
+        self.engine = engine
+        self.rooms = list(project.rooms.keys())
+        self._room_cols = {name: col for col, name in enumerate(self.rooms, 1)}
+        self._ampel = {name: s["ampel"] for name, s in engine.room_score().items()}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() or self.project is None else len(ROOM_TOPICS)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() or self.project is None else len(self.rooms) + 1
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or self.project is None:
+            return None
+        topic = ROOM_TOPICS[index.row()]
+        if role == SECTION_ROLE:
+            return topic.section
+        if role == DOMAINS_ROLE:
+            return topic.domains
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        if index.column() == 0:
+            return topic.title if role == Qt.DisplayRole else topic.description
+        room = self.rooms[index.column() - 1]
+        return ", ".join(self.project.rooms[room].topics[topic.key].selections) or "—"
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if self.project is None:
+            return None
+        if orientation == Qt.Vertical:
+            return ROOM_TOPICS[section].section if role == Qt.DisplayRole else None
+        if section == 0:
+            return "Topic" if role == Qt.DisplayRole else None
+        room = self.rooms[section - 1]
+        ampel = self._ampel.get(room, "")
+        if role == Qt.DisplayRole:
+            return f"{room} ({ampel})"
+        if role == Qt.ForegroundRole:
+            return AMPEL_COLORS.get(ampel)
+        if role == AMPEL_ROLE:
+            return ampel
+        return None
+
+    def topic_changed(self, room: str, key: str) -> None:
+        row = self._topic_rows.get(key)
+        col = self._room_cols.get(room)
+        if row is None or col is None or self.engine is None:
+            return
+        idx = self.index(row, col)
+        self.dataChanged.emit(idx, idx, [Qt.DisplayRole, Qt.ToolTipRole])
+        ampel = self.engine.room_score(room)[room]["ampel"]
+        if ampel != self._ampel.get(room):
+            self._ampel[room] = ampel
+            self.headerDataChanged.emit(Qt.Horizontal, col, col)
+
+
+class EvaluationFilterProxy(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.section: str | None = None
+        self.domain: str | None = None
+        self.ampel: str | None = None
+
+    def set_filters(self, section: str | None, domain: str | None, ampel: str | None) -> None:
+        self.section, self.domain, self.ampel = section, domain, ampel
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        model = self.sourceModel()
+        idx = model.index(source_row, 0, source_parent)
+        if self.section and model.data(idx, SECTION_ROLE) != self.section:
+            return False
+        if self.domain and self.domain not in model.data(idx, DOMAINS_ROLE):
+            return False
+        return True
+
+    def filterAcceptsColumn(self, source_column: int, source_parent: QModelIndex) -> bool:
+        if source_column == 0 or not self.ampel:
+            return True
+        return self.sourceModel().headerData(source_column, Qt.Horizontal, AMPEL_ROLE) == self.ampel
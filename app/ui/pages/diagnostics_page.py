@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from app.services import instrumentation
+
+COLUMNS = [("Operation", None), ("Aufrufe", "calls"), ("Summe ms", "total_ms"), ("Mittel ms", "mean_ms"),
+           ("Max ms", "max_ms"), ("Letzter ms", "last_ms"), ("Allokation KB", "alloc_kb")]
+
+
+class DiagnosticsPage(QWidget):
+    # Versteckte Seite (Strg+Umschalt+D): Messwerte der Instrumentierung und Einzelprofil per cProfile.
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("<h2>Diagnose</h2>"))
+        self.state = QLabel()
+        layout.addWidget(self.state)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in COLUMNS])
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.btn_refresh = QPushButton("Aktualisieren")
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.btn_reset = QPushButton("Zurücksetzen")
+        self.btn_reset.clicked.connect(self._reset)
+        self.profile_target = QComboBox()
+        self.profile_target.addItems(instrumentation.operation_names())
+        self.btn_profile = QPushButton("Nächsten Aufruf profilieren")
+        self.btn_profile.clicked.connect(self._arm_profile)
+        for widget in (self.btn_refresh, self.btn_reset, QLabel("cProfile für"), self.profile_target, self.btn_profile):
+            buttons.addWidget(widget)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        # Nur aktualisieren, solange die Seite sichtbar ist.
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def refresh(self) -> None:
+        enabled = instrumentation.enabled()
+        names = instrumentation.operation_names()
+        if names != [self.profile_target.itemText(i) for i in range(self.profile_target.count())]:
+            # Exporter melden ihre Operationen erst beim ersten Import an.
+            current = self.profile_target.currentText()
+            self.profile_target.clear()
+            self.profile_target.addItems(names)
+            self.profile_target.setCurrentText(current)
+        for widget in (self.btn_reset, self.profile_target, self.btn_profile):
+            widget.setEnabled(enabled)
+        if not enabled:
+            self.state.setText(
+                f"Messung aus. Start mit <code>{instrumentation.ENV_VAR}=1</code> oder <code>python app/main.py --profile</code>."
+            )
+        else:
+            armed = instrumentation.armed_profile()
+            last = instrumentation.last_profile()
+            parts = [f"Log: {instrumentation.LOG_FILE}"]
+            if armed:
+                parts.append(f"wartet auf Aufruf von {armed}")
+            if last:
+                parts.append(f"letztes Profil: {last} (+ .txt)")
+            self.state.setText(" | ".join(parts))
+
+        stats = instrumentation.snapshot()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(stats))
+        for row, (name, values) in enumerate(stats.items()):
+            for col, (_, key) in enumerate(COLUMNS):
+                item = QTableWidgetItem()
+                if key is None:
+                    item.setText(name)
+                else:
+                    item.setData(Qt.DisplayRole, values[key])
+                self.table.setItem(row, col, item)
+        self.table.setSortingEnabled(True)
+
+    def _reset(self) -> None:
+        instrumentation.reset()
+        self.refresh()
+
+    def _arm_profile(self) -> None:
+        instrumentation.arm_profile(self.profile_target.currentText())
+        self.refresh()
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from PySide6.QtWidgets import QLabel, QTableWidget, QTableWidgetItem, QTextEdit, QVBoxLayout, QWidget
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QTableView, QTextEdit, QVBoxLayout, QWidget
 
+from app.models.definitions import DOMAINS, ROOM_TOPICS
 from app.models.project import Project
-from app.services.evaluation import build_room_matrix, room_score, topic_metrics
-from app.services.validation import detect_conflicts
+from app.services.evaluation_engine import EvaluationEngine
+from app.services.instrumentation import timed
+from app.ui.models.evaluation_table_model import EvaluationFilterProxy, EvaluationTableModel
+
+ALL = "Alle"
 
 
 class EvaluationPage(QWidget):
@@ -12,29 +17,54 @@ class EvaluationPage(QWidget):
         super().__init__()
         self.layout = QVBoxLayout(self)
         self.layout.addWidget(QLabel("<h2>Auswertung</h2>"))
-        self.table = QTableWidget()
+
+        filters = QHBoxLayout()
+        self.section_filter = QComboBox()
+        self.section_filter.addItems([ALL, *dict.fromkeys(t.section for t in ROOM_TOPICS)])
+        self.domain_filter = QComboBox()
+        self.domain_filter.addItems([ALL, *DOMAINS])
+        self.ampel_filter = QComboBox()
+        self.ampel_filter.addItems([ALL, "grün", "gelb", "rot"])
+        for label, combo in (("Sektion", self.section_filter), ("Domain", self.domain_filter), ("Ampel", self.ampel_filter)):
+            filters.addWidget(QLabel(label))
+            filters.addWidget(combo)
+            combo.currentTextChanged.connect(self._apply_filters)
+        filters.addStretch()
+        self.layout.addLayout(filters)
+
+        self.model = EvaluationTableModel(self)
+        self.proxy = EvaluationFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.model.headerDataChanged.connect(lambda *_: self.proxy.ampel and self._apply_filters())
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
         self.summary = QTextEdit()
         self.summary.setReadOnly(True)
         self.layout.addWidget(self.table)
         self.layout.addWidget(self.summary)
 
-    def refresh(self, project: Project) -> None:
-        matrix = build_room_matrix(project)
-        metrics = topic_metrics(project)
-        rooms = list(project.rooms.keys())
-        topics = list(matrix.keys())
-
-        self.table.setRowCount(len(topics))
-        self.table.setColumnCount(len(rooms) + 1)
-        self.table.setHorizontalHeaderLabels(["Topic", *rooms])
-        for row_idx, topic in enumerate(topics):
-            self.table.setItem(row_idx, 0, QTableWidgetItem(topic))
-            for col_idx, room in enumerate(rooms, 1):
-                text = ", ".join(matrix[topic][room]) or "—"
-                self.table.setItem(row_idx, col_idx, QTableWidgetItem(text))
-
-        scores = room_score(project)
-        conflicts = detect_conflicts(project)
+    def _apply_filters(self) -> None:
+        def value(combo: QComboBox) -> str | None:
+            text = combo.currentText()
+            return None if text == ALL else text
+
+        self.proxy.set_filters(value(self.section_filter), value(self.domain_filter), value(self.ampel_filter))
+
+    def topic_changed(self, room: str, key: str) -> None:
+        self.model.topic_changed(room, key)
+
+    @timed("ui.evaluation_refresh")
+    def refresh(self, project: Project, engine: EvaluationEngine | None = None) -> None:
+        engine = engine or EvaluationEngine(project)
+        # Einzelne Zellen werden über topic_changed aktualisiert; ein Reset nur bei neuem Projekt.
+        if self.model.project is not project or self.model.engine is not engine:
+            self.model.set_project(project, engine)
+
+        metrics = engine.topic_metrics()
+        scores = engine.room_score()
+        conflicts = engine.conflicts()
         lines = ["Kennzahlen / Konflikte:"]
         for topic, m in metrics.items():
             lines.append(f"- {topic}: Räume {m['rooms_with_selection']}/{m['room_count']} | Diversity {m['diversity']} | Dominanz {m['dominant_ratio']:.2f}")
@@ -48,4 +78,6 @@ class EvaluationPage(QWidget):
             for room, items in conflicts.items():
                 for item in items:
                     lines.append(f"- {room}: {item}")
-        self.summary.setPlainText("\n".join(lines))
+        text = "\n".join(lines)
+        if text != self.summary.toPlainText():
+            self.summary.setPlainText(text)
@@ -1,31 +1,127 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QLabel, QListWidget, QPushButton, QVBoxLayout, QWidget
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import QLabel, QLineEdit, QPushButton, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+
+from app.models.definitions import GLOBAL_TOPICS, ROOM_TOPICS
+from app.services.storage import search_projects
+
+COLUMNS = ["Projekt", "Status", "Version", "Geändert", "Räume", "Vollständigkeit", "Ampel (grün/gelb/rot)", "Konflikte", "Pfad"]
+SEARCH_COLUMNS = ["Projekt", "Raum", "Themen", "Pfad"]
+SORT_ROLE = Qt.UserRole + 1
+# Suche erst nach einer kurzen Tipp-Pause.
+SEARCH_DELAY_MS = 250
+TOPIC_TITLES = {t.key: t.title for t in (*GLOBAL_TOPICS, *ROOM_TOPICS)}
+
+
+class _ProjectItem(QTreeWidgetItem):
+    def __lt__(self, other: QTreeWidgetItem) -> bool:
+        col = self.treeWidget().sortColumn() if self.treeWidget() else 0
+        mine, theirs = self.data(col, SORT_ROLE), other.data(col, SORT_ROLE)
+        if mine is None or theirs is None:
+            return super().__lt__(other)
+        return mine < theirs
 
 
 class StartPage(QWidget):
     load_requested = Signal(str)
+    # Pfad, Raum ("" = Global-Planung)
+    room_requested = Signal(str, str)
 
     def __init__(self):
         super().__init__()
         layout = QVBoxLayout(self)
         layout.addWidget(QLabel("<h2>Start</h2>"))
+
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText('Suche in allen Projekten: Wörter, wort*, "Option", verantwortlich:name, notiz:text')
+        self.search_box.setClearButtonEnabled(True)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.refresh_search)
+        self.search_box.textChanged.connect(lambda _: self._search_timer.start())
+        self.search_box.returnPressed.connect(self.refresh_search)
+        self.search_results = QTreeWidget()
+        self.search_results.setColumnCount(len(SEARCH_COLUMNS))
+        self.search_results.setHeaderLabels(SEARCH_COLUMNS)
+        self.search_results.setRootIsDecorated(False)
+        self.search_results.setUniformRowHeights(True)
+        self.search_results.itemActivated.connect(lambda item, _: self._emit_room(item))
+        self.search_results.hide()
+        layout.addWidget(self.search_box)
+        layout.addWidget(self.search_results)
+
         layout.addWidget(QLabel("Gespeicherte Projekte"))
-        self.project_list = QListWidget()
+        self.project_list = QTreeWidget()
+        self.project_list.setColumnCount(len(COLUMNS))
+        self.project_list.setHeaderLabels(COLUMNS)
+        self.project_list.setRootIsDecorated(False)
+        self.project_list.setUniformRowHeights(True)
+        self.project_list.setSortingEnabled(True)
+        self.project_list.itemDoubleClicked.connect(lambda *_: self._emit_open())
         self.open_btn = QPushButton("Projekt laden")
         self.open_btn.clicked.connect(self._emit_open)
         layout.addWidget(self.project_list)
         layout.addWidget(self.open_btn)
 
     def set_projects(self, entries: list[dict]) -> None:
+        # Alle Angaben kommen aus dem Projektindex, es wird keine Projektdatei geöffnet.
+        self.project_list.setSortingEnabled(False)
         self.project_list.clear()
+        items = []
         for e in entries:
-            self.project_list.addItem(f"{e['name']}|{e['path']}")
+            ampel = e.get("ampel") or {}
+            completeness = e.get("completeness")
+            values = [
+                (e.get("name", ""), e.get("name", "").lower()),
+                (e.get("status", "—"), None),
+                (e.get("version", "—"), None),
+                (e.get("updated_at", "—"), None),
+                (str(e["rooms"]) if "rooms" in e else "—", e.get("rooms", -1)),
+                (f"{completeness:.0%}" if completeness is not None else "—", completeness if completeness is not None else -1.0),
+                (f"{ampel.get('grün', 0)}/{ampel.get('gelb', 0)}/{ampel.get('rot', 0)}", (ampel.get("rot", 0), ampel.get("gelb", 0))),
+                (str(e.get("conflicts", "—")), e.get("conflicts", -1)),
+                (e["path"] + (" (fehlt)" if e.get("missing") else ""), None),
+            ]
+            item = _ProjectItem([text for text, _ in values])
+            for col, (_, key) in enumerate(values):
+                if key is not None:
+                    item.setData(col, SORT_ROLE, key)
+            item.setData(0, Qt.UserRole, e["path"])
+            items.append(item)
+        self.project_list.addTopLevelItems(items)
+        self.project_list.setSortingEnabled(True)
+        # Nach dem Speichern können sich Treffer geändert haben.
+        self.refresh_search()
+
+    def refresh_search(self) -> None:
+        self._search_timer.stop()
+        query = self.search_box.text().strip()
+        self.search_results.clear()
+        if not query:
+            self.search_results.hide()
+            return
+        items = []
+        for hit in search_projects(query):
+            topics = ", ".join(TOPIC_TITLES.get(key, key) for key in hit.topics)
+            item = QTreeWidgetItem([hit.project, hit.room or "Global", topics, hit.path])
+            item.setData(0, Qt.UserRole, hit.path)
+            item.setData(1, Qt.UserRole, hit.room or "")
+            items.append(item)
+        if not items:
+            items.append(QTreeWidgetItem(["Keine Treffer", "", "", ""]))
+        self.search_results.addTopLevelItems(items)
+        self.search_results.show()
+
+    def _emit_room(self, item: QTreeWidgetItem) -> None:
+        path, room = item.data(0, Qt.UserRole), item.data(1, Qt.UserRole)
+        if path:
+            # Verzögert: das Laden aktualisiert die Trefferliste, das aktivierte Element wäre dann schon gelöscht.
+            QTimer.singleShot(0, lambda: self.room_requested.emit(path, room))
 
     def _emit_open(self) -> None:
         current = self.project_list.currentItem()
         if not current:
             return
-        path = current.text().split("|", 1)[1]
-        self.load_requested.emit(path)
+        self.load_requested.emit(current.data(0, Qt.UserRole))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, List, Set
 
 from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QFrame, QGroupBox, QLabel, QScrollArea, QVBoxLayout, QWidget
@@ -13,12 +13,17 @@ from app.ui.widgets.topic_row_widget import TopicRowWidget
 
 class TopicPage(QWidget):
     changed = Signal()
+    topic_changed = Signal(str)
 
     def __init__(self, title: str, topics: List[TopicDefinition], states: Dict[str, TopicState]):
         super().__init__()
         self.topics = topics
         self.states = states
         self.rows: Dict[str, TopicRowWidget] = {}
+        # Zeilen, deren Widgets seit dem letzten Abgleich geändert wurden; nur diese werden ausgelesen.
+        self._dirty: Set[str] = set()
+        # Anzahl tatsächlich ausgelesener Zeilen (für Tests/Messungen).
+        self.rows_read = 0
 
         root = QVBoxLayout(self)
         head = QLabel(f"<h2>{title}</h2>")
@@ -38,7 +43,7 @@ class TopicPage(QWidget):
             box_layout = QVBoxLayout(box)
             for topic in section_topics:
                 row = TopicRowWidget(topic, states[topic.key])
-                row.changed.connect(lambda key=topic.key, widget=row: self._update_state(key, widget))
+                row.changed.connect(lambda key=topic.key: self._update_state(key))
                 row.setFrameStyle(QFrame.NoFrame) if hasattr(row, "setFrameStyle") else None
                 self.rows[topic.key] = row
                 box_layout.addWidget(row)
@@ -48,10 +53,31 @@ class TopicPage(QWidget):
         scroll.setWidget(body)
         root.addWidget(scroll)
 
-    def _update_state(self, key: str, row: TopicRowWidget) -> None:
-        self.states[key] = row.get_state()
+    def _update_state(self, key: str) -> None:
+        # Pro Tastendruck nur markieren; ausgelesen wird beim nächsten persist/persist_topic.
+        self._dirty.add(key)
+        self.topic_changed.emit(key)
         self.changed.emit()
 
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def persist_topic(self, key: str) -> None:
+        if key in self._dirty:
+            self._dirty.discard(key)
+            self.states[key] = self.rows[key].get_state()
+            self.rows_read += 1
+
+    def take_change(self, key: str):
+        return self.rows[key].take_change()
+
+    def set_topic_state(self, key: str, state: TopicState) -> None:
+        # Nur diese Zeile neu setzen; der Zustand ist bereits im Projekt, daher nicht als geändert markieren.
+        self.rows[key].set_state(state)
+        self.states[key] = state
+        self._dirty.discard(key)
+
     def persist(self) -> None:
-        for key, row in self.rows.items():
-            self.states[key] = row.get_state()
+        for key in list(self._dirty):
+            self.persist_topic(key)
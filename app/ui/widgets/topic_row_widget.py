@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Callable, List
+from dataclasses import replace
+from typing import Callable, List, Optional, Tuple
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QEvent, QObject, Signal
+from PySide6.QtGui import QKeySequence
 from PySide6.QtWidgets import (
     QComboBox,
     QGridLayout,
@@ -27,6 +29,8 @@ class TopicRowWidget(QWidget):
         self.definition = definition
         self.state = state
         self.combos: List[QComboBox] = []
+        # Stand beim letzten take_change; Grundlage für die Rückgängig-Befehle.
+        self._baseline = replace(state, selections=list(state.selections))
 
         main = QVBoxLayout(self)
         title = QLabel(f"<b>{definition.title}</b>")
@@ -57,6 +61,10 @@ class TopicRowWidget(QWidget):
         self.notes.setPlaceholderText("Notizen")
         self.notes.setPlainText(state.notes)
         self.notes.textChanged.connect(self._emit)
+        # Rückgängig/Wiederholen übernimmt das Hauptfenster für alle Felder gemeinsam.
+        self.notes.setUndoRedoEnabled(False)
+        self.assignee.installEventFilter(self)
+        self.notes.installEventFilter(self)
         main.addWidget(self.assignee)
         main.addWidget(self.notes)
 
@@ -112,5 +120,45 @@ class TopicRowWidget(QWidget):
                 selections.append(value)
         return TopicState(selections=selections, notes=self.notes.toPlainText().strip(), assignee=self.assignee.text().strip())
 
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        # Strg+Z/Strg+Y nicht von den Textfeldern schlucken lassen, damit der Fenster-Shortcut greift.
+        if event.type() == QEvent.ShortcutOverride and (
+            event.matches(QKeySequence.Undo) or event.matches(QKeySequence.Redo)
+        ):
+            event.ignore()
+            return True
+        return super().eventFilter(watched, event)
+
+    def take_change(self) -> Optional[Tuple[TopicState, TopicState]]:
+        # (alt, neu) seit dem letzten Aufruf oder None; liest die Widgets genau einmal.
+        current = self.get_state()
+        if current == self._baseline:
+            return None
+        previous, self._baseline = self._baseline, current
+        return previous, current
+
+    def set_state(self, state: TopicState) -> None:
+        # Setzt die Zeile ohne changed-Signal (Rückgängig/Wiederholen).
+        self.blockSignals(True)
+        try:
+            wanted = max(1, len(state.selections))
+            while len(self.combos) < min(wanted, self.definition.max_selections):
+                self.add_combo(emit=False)
+            while len(self.combos) > wanted:
+                self.combos.pop().setParent(None)
+            # Erst leeren, sonst setzt die Duplikatprüfung beim Vertauschen einen Wert zurück.
+            for combo in self.combos:
+                combo.setCurrentIndex(0)
+            for combo, value in zip(self.combos, state.selections):
+                combo.setCurrentText(value)
+            if self.assignee.text() != state.assignee:
+                self.assignee.setText(state.assignee)
+            if self.notes.toPlainText() != state.notes:
+                self.notes.setPlainText(state.notes)
+            self._update_buttons()
+        finally:
+            self.blockSignals(False)
+        self._baseline = replace(state, selections=list(state.selections))
+
     def _emit(self) -> None:
         self.changed.emit()
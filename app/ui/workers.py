@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from app.services.progress import OperationCancelled, Progress
+
+
+class TaskSignals(QObject):
+    # Lebt im GUI-Thread; Emits aus dem Worker kommen dort als Queued-Connection an.
+    progress = Signal(int, int, str)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+
+class BackgroundTask(QRunnable):
+    # Führt ``fn(progress)`` im Thread-Pool aus. ``fn`` darf nur auf Schnappschüsse zugreifen,
+    # nie auf Objekte, die die Oberfläche weiter verändert.
+    def __init__(self, label: str, fn: Callable[[Progress], object], cancellable: bool = True):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.label = label
+        self.cancellable = cancellable
+        self.signals = TaskSignals()
+        self.progress = Progress(self.signals.progress.emit)
+        self._fn = fn
+        self._done = threading.Event()
+
+    def cancel(self) -> None:
+        if self.cancellable:
+            self.progress.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # Blockiert, bis run() durchgelaufen ist; nur für Aufgaben, die der Pool bereits übernommen hat.
+        return self._done.wait(timeout)
+
+    def run(self) -> None:
+        try:
+            result = self._fn(self.progress)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+        except Exception as exc:  # noqa: BLE001 - Fehler werden im GUI-Thread angezeigt
+            self.signals.failed.emit(f"{type(exc).__name__}: {exc}")
+        else:
+            self.signals.finished.emit(result)
+        finally:
+            self._done.set()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+from app.models.definitions import OPTION_SETS, ROOM_TOPICS
+from app.models.rules import CONFLICT_RULES, ConflictRule, RuleCondition
+from app.services.conflict_rules import RuleSet
+from benchmarks.synthetic import generate_project
+
+
+def random_rules(count: int, seed: int = 0) -> List[ConflictRule]:
+    rng = random.Random(seed)
+    rules = list(CONFLICT_RULES)
+    while len(rules) < count:
+        conditions = []
+        for negate in (False, True):
+            topic = rng.choice(ROOM_TOPICS)
+            options = rng.sample(OPTION_SETS[topic.option_set], 2)
+            conditions.append(RuleCondition((topic.key,), options=tuple(options), negate=negate))
+        rules.append(ConflictRule(f"synthetic_{len(rules)}", f"Synthetische Regel {len(rules)}", tuple(conditions)))
+    return rules
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-Benchmark der Konfliktregeln")
+    parser.add_argument("--rules", default="3,30,100,300")
+    parser.add_argument("--rooms", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Regeln':>7} {'Räume':>6} {'Kompilieren ms':>15} {'Projekt ms':>11} {'Raum µs':>9} {'Änderung µs':>12}")
+    for rule_count in (int(x) for x in args.rules.split(",")):
+        rules = random_rules(rule_count)
+        t0 = time.perf_counter()
+        rule_set = RuleSet(rules)
+        compile_ms = (time.perf_counter() - t0) * 1000
+        for room_count in (int(x) for x in args.rooms.split(",")):
+            project = generate_project(room_count)
+            full = _best(lambda: rule_set.check_project(project), args.repeat)
+            rooms = list(project.rooms.values())
+            fired = [rule_set.evaluate(r) for r in rooms]
+            keys = [t.key for t in ROOM_TOPICS]
+
+            def incremental() -> None:
+                for i, room in enumerate(rooms):
+                    rule_set.recheck(room, keys[i % len(keys)], fired[i])
+
+            inc = _best(incremental, args.repeat)
+            print(
+                f"{rule_count:>7} {room_count:>6} {compile_ms:>15.2f} {full * 1000:>11.2f}"
+                f" {full / room_count * 1e6:>9.1f} {inc / room_count * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
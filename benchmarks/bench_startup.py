@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.bench_suite import RESULTS_DIR, git_revision
+
+ROOT = Path(__file__).resolve().parent.parent
+# Diese Bibliotheken dürfen bis zum ersten Paint nicht geladen sein.
+HEAVY_MODULES = ("openpyxl", "reportlab", "pypdf", "numpy")
+
+
+def _child() -> None:
+    # Läuft im frischen Interpreter: misst Import, Fensteraufbau, ersten Paint und Ende des Leerlauf-Aufbaus.
+    t0 = time.perf_counter()
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from app.services.storage import ensure_storage
+    from app.ui.main_window import MainWindow
+
+    result = {"import_ms": (time.perf_counter() - t0) * 1000}
+    ensure_storage()
+    app = QApplication([sys.argv[0]])
+    t1 = time.perf_counter()
+    window = MainWindow()
+    result["construct_ms"] = (time.perf_counter() - t1) * 1000
+
+    def painted() -> None:
+        result["first_paint_ms"] = (time.perf_counter() - t0) * 1000
+        result["first_paint_epoch"] = time.time()
+        result["heavy_modules"] = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    def ready() -> None:
+        result["ready_ms"] = (time.perf_counter() - t0) * 1000
+        QTimer.singleShot(0, app.quit)
+
+    window.painted.connect(painted)
+    window.ready.connect(ready)
+    window.show()
+    app.exec()
+    print(json.dumps(result))
+
+
+def run_once(workdir: Path, platform_name: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    if platform_name:
+        env["QT_QPA_PLATFORM"] = platform_name
+    launched = time.time()
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    # Inklusive Interpreterstart: vom Prozessstart bis zum ersten gezeichneten Fenster.
+    result["launch_to_paint_ms"] = (result.pop("first_paint_epoch") - launched) * 1000
+    return {k: round(v, 1) if isinstance(v, float) else v for k, v in result.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Startzeit: Importe, erster Paint, verzögerter Aufbau")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--platform", default="offscreen", help="QT_QPA_PLATFORM für die Messläufe ('' = System)")
+    parser.add_argument("--max-paint-ms", type=float, default=0.0, help="Grenze für launch_to_paint_ms (Median), 0 = keine")
+    parser.add_argument("--out", type=Path, help="Ergebnisdatei (Standard: benchmarks/results/startup_<Zeit>_<Revision>.json)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child()
+        return 0
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Leerer Datenordner, damit die Messung nicht von lokalen Projekten abhängt.
+        for _ in range(args.repeat):
+            runs.append(run_once(Path(tmp), args.platform))
+    keys = ["import_ms", "construct_ms", "first_paint_ms", "ready_ms", "launch_to_paint_ms"]
+    median = {k: round(statistics.median(r[k] for r in runs), 1) for k in keys}
+    heavy = sorted({m for r in runs for m in r["heavy_modules"]})
+    for k in keys:
+        print(f"{k:<20} {median[k]:>9.1f} ms")
+    print(f"{'heavy_modules':<20} {', '.join(heavy) or '-'}")
+
+    revision = git_revision()
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": revision,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "qt_platform": args.platform,
+        },
+        "median": median,
+        "heavy_modules": heavy,
+        "runs": runs,
+    }
+    out = args.out or RESULTS_DIR / f"startup_{datetime.now():%Y%m%d-%H%M%S}_{revision}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Ergebnisse: {out}")
+
+    failed = bool(heavy)
+    if args.max_paint_ms and median["launch_to_paint_ms"] > args.max_paint_ms:
+        print(f"Erster Paint nach {median['launch_to_paint_ms']} ms, Grenze {args.max_paint_ms} ms")
+        failed = True
+    if heavy:
+        print(f"Vor dem ersten Paint geladen: {', '.join(heavy)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.storage import load_project, save_project
+from benchmarks.synthetic import generate_project
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def bench(room_count: int, workdir: Path) -> dict:
+    project = generate_project(room_count)
+    json_path = workdir / f"bench_{room_count}.json"
+    db_path = workdir / f"bench_{room_count}.sqlite"
+    first_room = next(iter(project.rooms))
+    results = {}
+    for backend, path in (("json", json_path), ("sqlite", db_path)):
+        row = {"save_full": _timed(lambda: save_project(project, path))}
+        loaded = {}
+        row["load"] = _timed(lambda: loaded.setdefault("p", load_project(path)))
+        row["open_room"] = _timed(lambda: loaded["p"].rooms[first_room])
+        row["load_all_rooms"] = _timed(lambda: [r.topics for r in loaded["p"].rooms.values()])
+        fresh = load_project(path)
+        fresh.rooms[first_room].topics["room_light"].notes = "geändert"
+        row["save_one_change"] = _timed(lambda: save_project(fresh, path))
+        # SQLite lädt Räume bei Bedarf: Speichern, Index und Historie dürfen keine weiteren Räume nachladen.
+        row["rooms_loaded"] = len(fresh.loaded_rooms())
+        if backend == "sqlite" and row["rooms_loaded"] > 1:
+            raise RuntimeError(f"save_project hat {row['rooms_loaded']} Räume geladen (erwartet: 1)")
+        row["file_kb"] = path.stat().st_size / 1024
+        results[backend] = row
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vergleich JSON- und SQLite-Speicher")
+    parser.add_argument("--rooms", default="10,100,1000")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        import app.services.history as history
+        import app.services.storage as storage
+
+        # Index und Projekte im Temp-Ordner, damit data/ unberührt bleibt.
+        storage.DATA_DIR = Path(tmp)
+        storage.PROJECTS_DIR = Path(tmp) / "projects"
+        storage.INDEX_FILE = Path(tmp) / "projects_index.json"
+        storage.SEARCH_INDEX_FILE = Path(tmp) / "search_index.sqlite"
+        history.HISTORY_DIR = Path(tmp) / "history"
+        cols = ["save_full", "load", "open_room", "load_all_rooms", "save_one_change", "rooms_loaded", "file_kb"]
+        print(f"{'Räume':>6} {'Backend':>7} " + " ".join(f"{c:>15}" for c in cols))
+        report = {}
+        for room_count in (int(x) for x in args.rooms.split(",")):
+            report[room_count] = bench(room_count, Path(tmp))
+            for backend, row in report[room_count].items():
+                print(f"{room_count:>6} {backend:>7} " + " ".join(f"{row[c]:>15.2f}" for c in cols))
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
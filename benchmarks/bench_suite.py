@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import generate_realistic_project
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# Ab diesem Faktor gegenüber der Vergleichsdatei gilt eine Messung als Regression.
+REGRESSION_FACTOR = 1.2
+
+OPERATIONS = ["save_project", "load_project", "detect_conflicts", "validate_required_fields",
+              "topic_metrics", "room_score", "export_excel", "export_pdf"]
+
+
+def _operations(project, workdir: Path) -> List[Tuple[str, Callable[[], object]]]:
+    from app.services.evaluation import room_score, topic_metrics
+    from app.services.export_excel import export_project_to_excel
+    from app.services.export_pdf import export_project_to_pdf
+    from app.services.storage import load_project, save_project
+    from app.services.validation import detect_conflicts, validate_required_fields
+
+    path = workdir / f"bench_{len(project.rooms)}.json"
+    # Datei vorab anlegen, damit load_project auch ohne save_project in --only messbar ist.
+    save_project(project, path)
+    # Exporte ohne Cache, sonst misst ab der zweiten Wiederholung nur noch der Cache-Treffer.
+    ops = {
+        "save_project": lambda: save_project(project, path),
+        "load_project": lambda: load_project(path),
+        "detect_conflicts": lambda: detect_conflicts(project),
+        "validate_required_fields": lambda: validate_required_fields(project),
+        "topic_metrics": lambda: topic_metrics(project),
+        "room_score": lambda: room_score(project),
+        "export_excel": lambda: export_project_to_excel(project, workdir / "bench.xlsx", streaming=True, use_cache=False),
+        "export_pdf": lambda: export_project_to_pdf(project, workdir / "bench.pdf", use_cache=False),
+    }
+    return [(name, ops[name]) for name in OPERATIONS]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    # Spitzenspeicher in einem eigenen Lauf, da tracemalloc die Laufzeit verfälscht.
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "best_ms": round(min(times) * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_suite(room_counts: List[int], repeat: int, seed: int = 0, only: Optional[List[str]] = None) -> Dict[str, Dict[str, dict]]:
+    import app.services.history as history
+    import app.services.storage as storage
+
+    results: Dict[str, Dict[str, dict]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Index und Projekte im Temp-Ordner, damit data/ unberührt bleibt.
+        storage.DATA_DIR = Path(tmp)
+        storage.PROJECTS_DIR = Path(tmp) / "projects"
+        storage.INDEX_FILE = Path(tmp) / "projects_index.json"
+        storage.SEARCH_INDEX_FILE = Path(tmp) / "search_index.sqlite"
+        history.HISTORY_DIR = Path(tmp) / "history"
+        for room_count in room_counts:
+            project = generate_realistic_project(room_count, seed=seed)
+            row: Dict[str, dict] = {}
+            for name, fn in _operations(project, Path(tmp)):
+                if only and name not in only:
+                    continue
+                row[name] = measure(fn, repeat)
+                print(f"{room_count:>6} {name:<26} {row[name]['best_ms']:>11.2f} {row[name]['median_ms']:>11.2f} "
+                      f"{row[name]['peak_kb']:>11.1f}", flush=True)
+            results[str(room_count)] = row
+    return results
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unbekannt"
+    return out.stdout.strip()
+
+
+def compare(current: Dict[str, Dict[str, dict]], baseline: Dict[str, Dict[str, dict]], factor: float) -> List[str]:
+    regressions = []
+    for rooms, row in current.items():
+        for name, values in row.items():
+            old = baseline.get(rooms, {}).get(name)
+            if not old:
+                continue
+            for metric in ("best_ms", "peak_kb"):
+                if old[metric] and values[metric] > old[metric] * factor:
+                    regressions.append(f"{rooms} Räume, {name}: {metric} {old[metric]} -> {values[metric]}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Zeit und Spitzenspeicher der Kernoperationen bei wachsender Projektgröße")
+    parser.add_argument("--rooms", default="10,100,500,2000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default="", help=f"Kommagetrennte Auswahl aus {','.join(OPERATIONS)}")
+    parser.add_argument("--out", type=Path, help="Ergebnisdatei (Standard: benchmarks/results/<Zeit>_<Revision>.json)")
+    parser.add_argument("--compare", type=Path, help="Frühere Ergebnisdatei; Regressionen führen zu Exit-Code 1")
+    parser.add_argument("--factor", type=float, default=REGRESSION_FACTOR)
+    args = parser.parse_args(argv)
+
+    room_counts = [int(x) for x in args.rooms.split(",")]
+    only = [x for x in args.only.split(",") if x]
+    print(f"{'Räume':>6} {'Operation':<26} {'Bestzeit ms':>11} {'Median ms':>11} {'Spitze KB':>11}")
+    results = run_suite(room_counts, args.repeat, args.seed, only)
+
+    revision = git_revision()
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": revision,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}_{revision}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Ergebnisse: {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline["results"], args.factor)
+        print(f"Vergleich mit {args.compare} ({baseline['meta'].get('revision', '?')}): "
+              f"{len(regressions)} Regression(en) über Faktor {args.factor}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import random
+
+from app.models.definitions import FLOORS, GLOBAL_TOPICS, OPTION_SETS, ROOM_TOPICS
+from app.models.project import Project, ProjectMetadata, RoomData, TopicState
+
+MIN_ROOMS = 10
+MAX_ROOMS = 2000
+
+SYNTHETIC_FLOORS = ["KG", *FLOORS, "DG"]
+ROOM_NAMES = [name for names in FLOORS.values() for name in names] + ["Küche", "Gäste", "Technik", "Garage", "Hobbyraum"]
+ASSIGNEES = ["Elektriker", "IT", "Bauherr", "Planer", "Sanitär", "Schreiner"]
+NOTE_PARTS = [
+    "Abstimmung mit Elektriker offen", "Leerrohr vorsehen", "Position vor Ort prüfen", "Budget klären",
+    "nach Möbelplanung festlegen", "Reserve für Nachrüstung", "Kabelweg über Decke", "mit Bauherr besprochen",
+]
+
+
+def random_state(
+    rng: random.Random,
+    option_set: str,
+    max_selections: int,
+    fill_ratio: float = 1.0,
+    note_ratio: float = 0.0,
+    assignee_ratio: float = 0.0,
+) -> TopicState:
+    options = OPTION_SETS[option_set]
+    state = TopicState()
+    if rng.random() < fill_ratio:
+        count = rng.randint(0, min(max_selections, len(options)))
+        state.selections = rng.sample(options, count)
+    if rng.random() < note_ratio:
+        state.notes = ", ".join(rng.sample(NOTE_PARTS, rng.randint(1, 3))) + "."
+    if rng.random() < assignee_ratio:
+        state.assignee = rng.choice(ASSIGNEES)
+    return state
+
+
+def generate_project(room_count: int, seed: int = 0) -> Project:
+    rng = random.Random(seed)
+    global_topics = {t.key: random_state(rng, t.option_set, t.max_selections) for t in GLOBAL_TOPICS}
+    rooms = {}
+    for i in range(room_count):
+        name = f"Raum {i + 1:04d}"
+        rooms[name] = RoomData(
+            name=name,
+            floor=f"E{i // 20}",
+            topics={t.key: random_state(rng, t.option_set, t.max_selections) for t in ROOM_TOPICS},
+        )
+    return Project(metadata=ProjectMetadata(project_name=f"Synthetisch {room_count}"), global_topics=global_topics, rooms=rooms)
+
+
+def generate_realistic_project(
+    room_count: int,
+    seed: int = 0,
+    fill_ratio: float = 0.85,
+    note_ratio: float = 0.25,
+    assignee_ratio: float = 0.4,
+) -> Project:
+    # Wie generate_project, aber mit echten Raum-/Etagennamen, Lücken, Notizen und Zuständigen.
+    if not MIN_ROOMS <= room_count <= MAX_ROOMS:
+        raise ValueError(f"Raumanzahl muss zwischen {MIN_ROOMS} und {MAX_ROOMS} liegen.")
+    rng = random.Random(seed)
+
+    def state(topic) -> TopicState:
+        return random_state(rng, topic.option_set, topic.max_selections, fill_ratio, note_ratio, assignee_ratio)
+
+    global_topics = {t.key: state(t) for t in GLOBAL_TOPICS}
+    rooms = {}
+    per_floor = max(1, room_count // len(SYNTHETIC_FLOORS))
+    for i in range(room_count):
+        name = f"{rng.choice(ROOM_NAMES)} {i + 1:04d}"
+        floor = SYNTHETIC_FLOORS[min(i // per_floor, len(SYNTHETIC_FLOORS) - 1)]
+        rooms[name] = RoomData(name=name, floor=floor, topics={t.key: state(t) for t in ROOM_TOPICS})
+    metadata = ProjectMetadata(
+        project_name=f"Synthetisch realistisch {room_count}",
+        status=rng.choice(["Entwurf", "Prüfung", "Freigegeben"]),
+    )
+    return Project(metadata=metadata, global_topics=global_topics, rooms=rooms)
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import conflict_rules
+from app.services.storage import ensure_storage
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Datenpfade (data/...) sind relativ zum Arbeitsverzeichnis: jeder Test bekommt einen eigenen Datenordner.
+    # Indizes und Caches sind nach aufgelöstem Pfad gemerkt und bleiben damit ebenfalls getrennt.
+    monkeypatch.chdir(tmp_path)
+    ensure_storage()
+    conflict_rules.reload_rule_set()
+    yield tmp_path
+    conflict_rules.reload_rule_set()
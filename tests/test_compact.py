@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import pickle
+
+from app.models.compact import CompactProject, CompactTopicState, ProjectSnapshot
+from benchmarks.synthetic import generate_project
+
+
+def test_topic_state_pickles_to_shared_instance():
+    state = CompactTopicState.encode("room_network", ["LAN-Dose", "Freitext außerhalb"], "Notiz", "Elektriker")
+    copy = pickle.loads(pickle.dumps(state))
+    assert copy is state
+    assert copy.selections("room_network") == ["LAN-Dose", "Freitext außerhalb"]
+
+
+def test_compact_project_and_snapshot_pickle():
+    project = generate_project(5)
+    compact = pickle.loads(pickle.dumps(CompactProject.from_project(project)))
+    assert compact.to_project().to_dict() == project.to_dict()
+
+    snapshot = pickle.loads(pickle.dumps(ProjectSnapshot(project)))
+    assert snapshot.to_project().to_dict() == project.to_dict()
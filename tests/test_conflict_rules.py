@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List
+
+from app.models.definitions import OPTION_SETS, ROOM_TOPICS
+from app.models.project import Project
+from app.services.conflict_rules import get_rule_set
+from app.services.validation import detect_conflicts
+from benchmarks.synthetic import generate_project
+
+# Freitext außerhalb des Katalogs, teils mit Teilstrings, auf die die eingebauten Regeln reagieren.
+FREE_TEXT = {
+    "room_network": ["PoE-Switch im Schrank", "LAN-Kabel Cat7", "Glasfaser"],
+    "room_shade": ["Zeitgesteuert per Astro-Uhr", "Sonnenstand über Wetterstation", "Markise"],
+    "room_security": ["Kamera außen", "Rauchmelder"],
+    "room_sensor_general": ["Wassermelder"],
+    "room_climate_sensors": ["Radon"],
+}
+
+
+def _baseline_conflicts(project: Project) -> Dict[str, List[str]]:
+    # Fest verdrahtete Prüfung vor dem Regelkatalog (Vergleich über Teilstrings aller Werte).
+    conflicts: Dict[str, List[str]] = {}
+    for room_name, room in project.rooms.items():
+        room_conflicts: List[str] = []
+        net = room.topics["room_network"].selections
+        shade = room.topics["room_shade"].selections
+        sensor = room.topics["room_sensor_general"].selections + room.topics["room_climate_sensors"].selections
+        if any("PoE" in s for s in net) and not any("LAN-Dose" in s for s in net):
+            room_conflicts.append("PoE gewählt, aber keine LAN-Dose berücksichtigt.")
+        if any("Sonnenstand" in s or "Zeitgesteuert" in s for s in shade) and not sensor:
+            room_conflicts.append("Automatische Beschattung ohne Sensorik gewählt.")
+        if any("Kamera" in s for s in room.topics["room_security"].selections) and not any("PoE" in s or "LAN" in s for s in net):
+            room_conflicts.append("Kamera geplant, aber kein passendes Netzwerkprofil gewählt.")
+        if room_conflicts:
+            conflicts[room_name] = room_conflicts
+    return conflicts
+
+
+def _mixed_project(free_text: bool) -> Project:
+    rng = random.Random(7)
+    project = generate_project(300, seed=3)
+    options = {t.key: OPTION_SETS[t.option_set] for t in ROOM_TOPICS}
+    for room in project.rooms.values():
+        for key, extra in FREE_TEXT.items():
+            pool = options[key] + (extra if free_text else [])
+            room.topics[key].selections = rng.sample(pool, rng.randint(0, 2))
+    return project
+
+
+def test_rules_match_baseline_for_catalog_values():
+    project = _mixed_project(free_text=False)
+    assert detect_conflicts(project) == _baseline_conflicts(project)
+
+
+def test_rules_match_baseline_for_free_text_values():
+    project = _mixed_project(free_text=True)
+    expected = _baseline_conflicts(project)
+    assert expected, "Testdaten sollten Konflikte enthalten"
+    assert detect_conflicts(project) == expected
+
+
+def test_recheck_matches_full_evaluation_for_free_text():
+    rules = get_rule_set()
+    project = _mixed_project(free_text=True)
+    room = next(iter(project.rooms.values()))
+    fired = rules.evaluate(room)
+    room.topics["room_network"].selections = ["PoE-Switch im Schrank"]
+    assert rules.recheck(room, "room_network", fired) == rules.evaluate(room)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.services import evaluation, evaluation_np  # noqa: E402
+from app.services.conflict_rules import get_rule_set  # noqa: E402
+from benchmarks.synthetic import generate_project, generate_realistic_project  # noqa: E402
+
+PROJECTS = [
+    lambda: generate_project(200, seed=1),
+    lambda: generate_realistic_project(200, seed=2),
+]
+
+
+@pytest.mark.parametrize("make", PROJECTS)
+def test_numpy_matches_python(make):
+    project = make()
+    encoded = evaluation_np.encode_project(project)
+    assert encoded.exact
+    assert any(score["conflicts"] for score in evaluation.room_score(project).values())
+
+    assert evaluation_np.topic_metrics(project, encoded) == evaluation.topic_metrics(project)
+    assert evaluation_np.room_score(project, encoded) == evaluation.room_score(project)
+
+
+@pytest.mark.parametrize("make", PROJECTS)
+def test_fired_rules_match_rule_set(make):
+    project = make()
+    rules = get_rule_set()
+    fired = evaluation_np.fired_rules(evaluation_np.encode_project(project), rules)
+    for i, room in enumerate(project.rooms.values()):
+        assert set(fired[i].nonzero()[0].tolist()) == rules.evaluate(room)
+
+
+def test_free_text_falls_back_to_python():
+    project = generate_project(50, seed=3)
+    room = next(iter(project.rooms.values()))
+    room.topics["room_network"].selections = ["PoE-Switch im Schrank"]
+    encoded = evaluation_np.encode_project(project)
+    assert not encoded.exact
+    assert evaluation_np.topic_metrics(project, encoded) == evaluation.topic_metrics(project)
+    assert evaluation_np.room_score(project, encoded) == evaluation.room_score(project)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import replace
+from pathlib import Path
+
+from app.services import journal, storage
+from app.services.storage import compact_project, load_project, save_changes, save_project
+from benchmarks.synthetic import generate_project
+
+
+def _project_file():
+    path = Path("data/projects/p.json").resolve()
+    project = generate_project(3)
+    save_project(project, path)
+    room = next(iter(project.rooms))
+    return project, path, room
+
+
+def _edit(project, room, key, notes):
+    state = replace(project.rooms[room].topics[key], notes=notes)
+    project.rooms[room].topics[key] = state
+    return [(room, key, state)]
+
+
+def test_replay_skips_torn_last_line(workdir):
+    project, path, room = _project_file()
+    first, second = list(project.rooms[room].topics)[:2]
+    save_changes(project, path, _edit(project, room, first, "vor dem Absturz"))
+    # Absturz mitten im Anhängen: die letzte Zeile endet ohne Zeilenumbruch.
+    with journal.journal_path(path).open("ab") as fh:
+        fh.write(b'{"r":"' + room.encode() + b'","k":"' + first.encode() + b'","n":"halb')
+
+    assert load_project(path).rooms[room].topics[first].notes == "vor dem Absturz"
+
+    # Der nächste Eintrag schneidet die halbe Zeile ab, statt an ihr zu kleben.
+    save_changes(project, path, _edit(project, room, second, "nach dem Absturz"))
+    lines = journal.journal_path(path).read_bytes().splitlines()
+    assert all(json.loads(line) for line in lines)
+    loaded = load_project(path)
+    assert loaded.rooms[room].topics[first].notes == "vor dem Absturz"
+    assert loaded.rooms[room].topics[second].notes == "nach dem Absturz"
+
+
+def test_truncate_partial_line_without_newline(workdir):
+    target = Path("data/partial.journal")
+    target.write_bytes(b"ohne Zeilenumbruch")
+    journal.append_bytes(target, b"neu\n")
+    assert target.read_bytes() == b"neu\n"
+
+
+def test_replay_includes_compacting_segment(workdir):
+    project, path, room = _project_file()
+    key = next(iter(project.rooms[room].topics))
+    save_changes(project, path, _edit(project, room, key, "alt"))
+    # Kompaktierung hat das Journal beiseitegelegt, aber die Datei noch nicht geschrieben.
+    journal.rotate(path)
+    save_changes(project, path, _edit(project, room, key, "neu"))
+    assert journal.compacting_path(path).exists() and journal.journal_path(path).exists()
+
+    assert load_project(path).rooms[room].topics[key].notes == "neu"
+    compacting_only = storage._read_file(path)
+    journal.replay(compacting_only, path, include_current=False)
+    assert compacting_only.rooms[room].topics[key].notes == "alt"
+
+
+def test_save_during_compaction_is_kept(workdir, monkeypatch):
+    project, path, room = _project_file()
+    first, second = list(project.rooms[room].topics)[:2]
+    save_changes(project, path, _edit(project, room, first, "kompaktiert"))
+
+    writing, release = threading.Event(), threading.Event()
+    write = storage.write_project_file
+
+    def slow_write(project, target):
+        writing.set()
+        release.wait(5)
+        write(project, target)
+
+    monkeypatch.setattr(storage, "write_project_file", slow_write)
+    thread = compact_project(path)
+    assert writing.wait(5)
+    saver = threading.Thread(target=save_changes, args=(project, path, _edit(project, room, second, "währenddessen")))
+    saver.start()
+    release.set()
+    thread.join(5)
+    saver.join(5)
+    storage.wait_for_compaction(path)
+
+    assert not journal.compacting_path(path).exists()
+    on_disk = storage._read_file(path)
+    assert on_disk.rooms[room].topics[first].notes == "kompaktiert"
+    loaded = load_project(path)
+    assert loaded.rooms[room].topics[first].notes == "kompaktiert"
+    assert loaded.rooms[room].topics[second].notes == "währenddessen"
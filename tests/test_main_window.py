@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from app.services.storage import load_project, save_project  # noqa: E402
+from app.ui.main_window import MainWindow  # noqa: E402
+from benchmarks.synthetic import generate_project  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(app, monkeypatch):
+    monkeypatch.setattr(MainWindow, "AUTOSAVE_DELAY_MS", 0)
+    window = MainWindow()
+    yield window
+    window.pool.waitForDone()
+    window.deleteLater()
+    app.processEvents()
+
+
+def _wait_for_tasks(app, window) -> None:
+    window.pool.waitForDone()
+    while window.tasks:
+        app.processEvents()
+
+
+def test_save_reads_only_edited_rows(app, window):
+    path = Path("data/projects/p.json").resolve()
+    save_project(generate_project(5), path)
+    window._load_from_start(str(path))
+    edited, untouched = list(window.current_project.rooms)[:2]
+    window._room_page(edited)
+    window._room_page(untouched)
+
+    page = window.room_pages[edited]
+    key = next(iter(page.rows))
+    page.rows[key].notes.setPlainText("nur diese Zeile")
+    window._save_project()
+    _wait_for_tasks(app, window)
+
+    assert page.rows_read == 1
+    assert window.room_pages[untouched].rows_read == 0
+    assert window.global_page.rows_read == 0
+    assert load_project(path).rooms[edited].topics[key].notes == "nur diese Zeile"
+
+
+def test_export_checks_required_fields_before_file_dialog(app, window, monkeypatch):
+    from PySide6.QtWidgets import QFileDialog, QMessageBox
+
+    from app.models.definitions import ROOM_TOPICS
+
+    project = generate_project(20)
+    required = next(t.key for t in ROOM_TOPICS if t.required_for_export)
+    project.rooms["Raum 0007"].topics[required].selections = []
+    path = Path("data/projects/p.plan").resolve()
+    save_project(project, path)
+    window._load_from_start(str(path))
+
+    calls = []
+    monkeypatch.setattr(QMessageBox, "warning", lambda *args: calls.append(("warning", args[1])))
+    monkeypatch.setattr(QFileDialog, "getSaveFileName", lambda *args: calls.append(("dialog",)) or ("", ""))
+    window._export_excel()
+    window._export_pdf()
+
+    assert calls == [("warning", "Pflichtfelder fehlen"), ("warning", "Pflichtfelder fehlen")]
+    # Geprüft wurden alle Räume, geladen bleibt keiner.
+    assert window.current_project.loaded_rooms() == {}
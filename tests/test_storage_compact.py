@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.services import storage_compact
+from app.services.storage import compact_project, load_project, save_changes, save_project, write_project_file
+from benchmarks.synthetic import generate_project
+
+
+def test_lazy_rooms_are_read_on_access(monkeypatch):
+    path = Path("data/projects/p.plan")
+    project = generate_project(50, seed=1)
+    write_project_file(project, path)
+    monkeypatch.setattr(Path, "read_bytes", lambda self: (_ for _ in ()).throw(AssertionError("ganze Datei gelesen")))
+
+    lazy = storage_compact.load_project(path)
+    assert lazy.loaded_rooms() == {}
+    name = "Raum 0030"
+    assert lazy.rooms[name] == project.rooms[name]
+    assert set(lazy.loaded_rooms()) == {name}
+
+
+def test_lazy_rooms_follow_replaced_file():
+    path = Path("data/projects/p.plan").resolve()
+    save_project(generate_project(50, seed=2), path)
+    expected = load_project(path, recover=False).to_dict()
+
+    lazy = load_project(path)
+    # Ein früher Raum wird deutlich länger: alle späteren Offsets verschieben sich beim Speichern.
+    first = next(iter(lazy.rooms))
+    key = next(iter(lazy.rooms[first].topics))
+    lazy.rooms[first].topics[key].notes = "x" * 5000
+    expected["rooms"][first]["topics"][key]["notes"] = "x" * 5000
+    save_project(lazy, path)
+    assert set(lazy.loaded_rooms()) == {first}
+
+    # Vollständig gelesener Stand der neuen Datei als Vergleich.
+    saved = storage_compact.load_project(path, lazy=False)
+    assert lazy.rooms["Raum 0040"] == saved.rooms["Raum 0040"]
+    assert lazy.to_dict()["rooms"] == expected["rooms"]
+
+    # Journal-Modus mit Kompaktierung ersetzt die Datei ebenfalls.
+    again = load_project(path)
+    state = again.rooms[first].topics[key]
+    state.notes = "kurz"
+    expected["rooms"][first]["topics"][key]["notes"] = "kurz"
+    save_changes(again, path, [(first, key, state)])
+    compact_project(path, background=False)
+    assert again.rooms["Raum 0045"] == storage_compact.load_project(path, lazy=False).rooms["Raum 0045"]
+    assert load_project(path).to_dict()["rooms"] == expected["rooms"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.models.definitions import ROOM_TOPICS
+from app.models.project import RoomData, TopicState
+from app.services import storage_compact, storage_sqlite
+from app.services.storage import load_project, write_project_file
+from benchmarks.synthetic import generate_project
+
+FORMATS = [".json", ".sqlite", ".plan", ".planz"]
+
+
+def _tricky_project():
+    project = generate_project(6, seed=5)
+    rooms = list(project.rooms.values())
+    # Freitext außerhalb des Optionskatalogs, auch gemischt mit Katalogwerten.
+    network = rooms[0].topics["room_network"]
+    network.selections = [*network.selections, "Glasfaser bis ins Zimmer", "PoE-Switch im Schrank"]
+    project.global_topics[next(iter(project.global_topics))].selections.append("eigene Angabe ✓")
+    # Unicode, Zeilenumbrüche und Anführungszeichen in Notizen und Zuständigen.
+    rooms[1].topics["room_shade"] = TopicState(
+        selections=["Manuell"], notes='Rollladen „links“ – 50 % 🌞\nzweite Zeile\t"zitiert"', assignee="Zoë Ørsted-Müller"
+    )
+    # Leerer Raum: alle Topics ohne Auswahl, Notiz oder Zuständigen.
+    empty = RoomData(name="Abstellraum ß", floor="UG", topics={t.key: TopicState() for t in ROOM_TOPICS})
+    project.rooms[empty.name] = empty
+    project.metadata.project_name = "Haus „Süd“ 🏠"
+    return project
+
+
+def _snapshot(project) -> dict:
+    data = project.to_dict()
+    data["room_order"] = list(project.room_floors())
+    return data
+
+
+@pytest.mark.parametrize("suffix", FORMATS)
+def test_format_round_trip(suffix):
+    project = _tricky_project()
+    path = Path(f"data/projects/p{suffix}")
+    write_project_file(project, path)
+    assert _snapshot(load_project(path)) == _snapshot(project)
+
+
+def test_conversion_chain_is_lossless():
+    project = _tricky_project()
+    expected = _snapshot(project)
+    current = project
+    for suffix in [*FORMATS[1:], ".json"]:
+        path = Path(f"data/projects/kette{suffix}")
+        write_project_file(current, path)
+        current = load_project(path)
+        assert _snapshot(current) == expected, suffix
+
+
+def test_cli_conversions(tmp_path):
+    project = _tricky_project()
+    source = tmp_path / "quelle.json"
+    write_project_file(project, source)
+    storage_sqlite.main(["import", str(source), str(tmp_path / "p.sqlite")])
+    storage_sqlite.main(["export", str(tmp_path / "p.sqlite"), str(tmp_path / "zurueck.json")])
+    storage_compact.main([str(tmp_path / "zurueck.json"), str(tmp_path / "p.planz")])
+    storage_compact.main([str(tmp_path / "p.planz"), str(tmp_path / "ende.json")])
+    assert _snapshot(load_project(tmp_path / "ende.json")) == _snapshot(project)